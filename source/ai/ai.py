@@ -1,19 +1,21 @@
 from abc import ABCMeta, abstractmethod
-import random
 
 class AI(metaclass=ABCMeta):
 	"""
 	Artificial intelligence.
 	"""
 
-	def __init__(self, minesweeper=None):
+	def __init__(self, minesweeper=None, rng=None):
 		"""
 		Create an artificial intelligence.
 
 		:minesweeper: A minesweeper game.
+		:rng: The random number generator of the random turns (a random.Random object). If None, then the 'random'
+			module is used.
 		"""
 
 		self.minesweeper = minesweeper
+		self.rng = rng
 
 	@abstractmethod
 	def play_turn(self):
@@ -33,7 +35,7 @@ class AI(metaclass=ABCMeta):
 		:return: The played position and the list of tiles that have been unmasked during this turn.
 		"""
 
-		played_pos = random.choice(self.minesweeper.masked_tile_positions)
+		played_pos = self.minesweeper.random_masked_tile_position(self.rng)
 		unmasked_tiles = self.minesweeper.play_tile(played_pos[0], played_pos[1])
 
 		return played_pos, unmasked_tiles
@@ -1,6 +1,6 @@
 from ai.ai import AI
-from minesweeper.masked_grid import MaskedTile
-from ai.helpers import to_value_list, extract_subgrid
+from minesweeper.masked_grid import MASKED_VALUE
+from ai.helpers import to_value_list, extract_subgrid, canonicalize_subgrid
 
 from abc import ABCMeta, abstractmethod
 import numpy as np
@@ -10,18 +10,25 @@ class AINN(AI, metaclass=ABCMeta):
 	Artificial intelligence using a neural network.
 	"""
 
-	def __init__(self, model, minesweeper=None, subgrid_radius=2):
+	def __init__(self, model, minesweeper=None, subgrid_radius=2, rng=None, canonical=False):
 		"""
 		Create an artificial intelligence using a neural network.
 
 		:model: A model.
 		:minesweeper: A minesweeper game.
 		:subgrid_radius: The radius of subgrids with whom the neural network has trained.
+		:rng: The random number generator of the first turn (a random.Random object). If None, then the 'random' module
+			is used.
+		:canonical: If True, then the subgrids are replaced by their canonical forms before being evaluated (see the
+			'canonicalize_subgrid' function), so that the subgrids which are rotations or reflections of each other
+			share their evaluation in the cache. The model must have been trained with canonical subgrids (see the
+			'format_data_set' function).
 		"""
 
-		super().__init__(minesweeper=minesweeper)
+		super().__init__(minesweeper=minesweeper, rng=rng)
 		self.model = model
 		self.subgrid_radius = subgrid_radius
+		self.canonical = canonical
 		self._evaluated_subgrid_cache = {}
 
 	def _compute_subgrids(self):
@@ -31,14 +38,29 @@ class AINN(AI, metaclass=ABCMeta):
 		:return: The positions of the tile in the middle and the corresponding subgrids.
 		"""
 
+		# Only the masked tiles of the explored part of the grid (enlarged by one tile) are evaluated. It is the whole grid
+		# except for the grids whose explored part is smaller (see the 'explored_bounds' method of MaskedGrid), where the
+		# tiles far from the explored part all have the same subgrid (whose tiles are all masked).
+		min_i, max_i, min_j, max_j = self.minesweeper.explored_bounds(margin=1)
+		# The window contains the subgrids of these tiles. Its tiles outside the grid are also outside the window.
+		min_i_window, max_i_window, min_j_window, max_j_window = self.minesweeper.explored_bounds(
+			margin=(1 + self.subgrid_radius))
+
+		# The values of the tiles of the window (plain integers are faster to compare than the Tile and MaskedTile
+		# members).
 		grid = self.minesweeper.grid
+		window = []
+		for i in range(min_i_window, max_i_window):
+			row = grid[i]
+			window.append([int(row[j]) for j in range(min_j_window, max_j_window)])
 
 		subgrids = []
 		pos_list = []
-		for i, row in enumerate(grid):
-			for j, tile in enumerate(row):
-				if tile == MaskedTile.MASKED:
-					subgrids.append(to_value_list(extract_subgrid(grid, i, j, self.subgrid_radius)))
+		for i in range(min_i, max_i):
+			for j in range(min_j, max_j):
+				i_window, j_window = (i - min_i_window), (j - min_j_window)
+				if window[i_window][j_window] == MASKED_VALUE:
+					subgrids.append(to_value_list(extract_subgrid(window, i_window, j_window, self.subgrid_radius)))
 					pos_list.append((i, j))
 
 		return pos_list, subgrids
@@ -51,7 +73,10 @@ class AINN(AI, metaclass=ABCMeta):
 		:return: The evaluation of each subgrid, that is the predicted values by the neural network for theses subgrids.
 		"""
 
-		subgrids = [tuple(subgrid) for subgrid in subgrids] # It makes the subgrids hashable.
+		if self.canonical:
+			subgrids = [canonicalize_subgrid(subgrid) for subgrid in subgrids] # The canonical forms are tuples.
+		else:
+			subgrids = [tuple(subgrid) for subgrid in subgrids] # It makes the subgrids hashable.
 
 		# Add the subgrids that are not in the cache ('self._evaluated_subgrid_cache').
 		subgrids_to_evaluate = [
@@ -8,7 +8,8 @@ class AIWithFlags(AINN):
 	Artificial intelligence using a neural network and using flags.
 	"""
 
-	def __init__(self, model, minesweeper=None, subgrid_radius=2, playful_level=1, flag_threshold=0.9):
+	def __init__(self, model, minesweeper=None, subgrid_radius=2, playful_level=1, flag_threshold=0.9, rng=None,
+		canonical=False):
 		"""
 		Create an artificial intelligence using a neural network and using flags.
 
@@ -26,9 +27,12 @@ class AIWithFlags(AINN):
 			less than 'flag_threshold', then the artificial intelligence will not insert a flag on this tile. The
 			minimum value for this parameter is 0 (the artificial intelligence will always be allowed to insert flags)
 			and the maximum value is 1 (no flags will be used).
+		:rng: The random number generator of the first turn (a random.Random object). If None, then the 'random' module
+			is used.
+		:canonical: If True, then the subgrids are replaced by their canonical forms before being evaluated (see AINN).
 		"""
 
-		super().__init__(model, minesweeper=minesweeper, subgrid_radius=subgrid_radius)
+		super().__init__(model, minesweeper=minesweeper, subgrid_radius=subgrid_radius, rng=rng, canonical=canonical)
 		self.playful_level = playful_level
 		self.flag_threshold = flag_threshold
 
@@ -8,16 +8,19 @@ class AIWithFlags2(AINN):
 	Artificial intelligence using a neural network and using flags.
 	"""
 
-	def __init__(self, model, minesweeper=None, subgrid_radius=2):
+	def __init__(self, model, minesweeper=None, subgrid_radius=2, rng=None, canonical=False):
 		"""
 		Create an artificial intelligence using a neural network and using flags.
 
 		:model: A model (trained with flags).
 		:minesweeper: A minesweeper game.
 		:subgrid_radius: The radius of subgrids with whom the neural network has trained.
+		:rng: The random number generator of the first turn (a random.Random object). If None, then the 'random' module
+			is used.
+		:canonical: If True, then the subgrids are replaced by their canonical forms before being evaluated (see AINN).
 		"""
 
-		super().__init__(model, minesweeper=minesweeper, subgrid_radius=subgrid_radius)
+		super().__init__(model, minesweeper=minesweeper, subgrid_radius=subgrid_radius, rng=rng, canonical=canonical)
 
 	def play_turn(self):
 		"""
@@ -1,8 +1,11 @@
 from minesweeper.minesweeper import Minesweeper, State
+from minesweeper.masked_grid import MaskedGrid
+from minesweeper.random_streams import child_rng
 
 import random
 
-def scores(ai, num_games, num_rows_grid, num_columns_grid, num_bombs_grid):
+def scores(ai, num_games, num_rows_grid, num_columns_grid, num_bombs_grid, grid_class=MaskedGrid, replay_logs=None,
+	seed=None, safe_radius=0):
 	"""
 	Get the scores of an artificial intelligence. This function creates 'num_games' games and the artificial
 	intelligence plays on them.
@@ -12,24 +15,36 @@ def scores(ai, num_games, num_rows_grid, num_columns_grid, num_bombs_grid):
 	:num_rows_grid: The number of rows of the original grid.
 	:num_columns_grid: The number of columns of the original grid.
 	:num_bombs_grid: The number of bombs of the grid.
+	:grid_class: The class of the grids with mask of the games (MaskedGrid or a subclass, for example ArrayMaskedGrid).
+	:replay_logs: A list to which the replay logs of the games are appended (see the 'replay' module to re-simulate
+		them without the artificial intelligence). If None, then the moves are not recorded.
+	:seed: The root seed. If it is not None, then the game of index 'i' (its grid and the random turns of the
+		artificial intelligence) uses the child stream 'i' of the seed (see the 'random_streams' module), so that the
+		scores do not depend on the other games (and on how the games are split between workers). If None, then the
+		'random' module is used.
+	:safe_radius: The radius of the tiles without bombs around the first played tile (see the 'first_click_safe'
+		parameter of Minesweeper). With a radius of 0, only the first played tile is safe.
 	:return: The scores of the artificial intelligence.
 	"""
 
 	score_list = []
 	for i in range(num_games):
-		# It is not possible to lose to the first turn.
-		state = State.LOSS
-		while state == State.LOSS:
-			ms = Minesweeper(num_rows_grid, num_columns_grid, num_bombs_grid)
-			ai.minesweeper = ms
+		rng = None
+		if seed is not None:
+			rng = child_rng(seed, i)
+			ai.rng = rng
 
-			ai.play_turn()
-			state = ms.state
+		# It is not possible to lose to the first turn: the bombs are inserted after the first played tile, not on it.
+		ms = Minesweeper(num_rows_grid, num_columns_grid, num_bombs_grid, grid_class=grid_class,
+			record_replay=(replay_logs is not None), rng=rng, first_click_safe=True, safe_radius=safe_radius)
+		ai.minesweeper = ms
 
 		while ms.state == State.CONTINUE:
 			ai.play_turn()
 
 		score_list.append(ms.score)
+		if replay_logs is not None:
+			replay_logs.append(ms.replay_log)
 
 	return score_list
 
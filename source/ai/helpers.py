@@ -1,6 +1,9 @@
-from minesweeper.grid import Tile, Grid, get_positions
-from minesweeper.masked_grid import MaskedTile
+from minesweeper.grid import Grid, BOMB_VALUE, WALL_VALUE, get_positions
+from minesweeper.masked_grid import MaskedTile, MASKED_VALUE, FLAG_VALUE
+from minesweeper.random_streams import get_rng
 
+from functools import lru_cache
+import numpy as np
 import random
 import math
 import copy
@@ -13,17 +16,8 @@ def to_value_list(grid):
 	:return: The list of values of each tile.
 	"""
 
-	value_list = []
-	for row in grid:
-		for tile in row:
-			try: # If tile is an empty (and has 0 as value), a bomb, a wall or a masked tile.
-				tile = tile.value
-			except AttributeError: # If tile is an integer (empty tile).
-				pass
-
-			value_list.append(tile)
-
-	return value_list
+	# 'int' converts the Tile and MaskedTile members (and the NumPy integers) to their values.
+	return [int(tile) for row in grid for tile in row]
 
 def compute_walls(grid):
 	"""
@@ -44,25 +38,66 @@ def compute_walls(grid):
 
 	for i in range((radius * edge_size), ((radius * edge_size) + radius)):
 		# '(radius * edge_size)' is the position of the tile in the left middle.
-		if grid[i] == Tile.WALL:
+		if grid[i] == WALL_VALUE:
 			left_wall += 1
 
 	for i in range(((radius * edge_size) + radius + 1), ((radius + 1) * edge_size)):
-		if grid[i] == Tile.WALL:
+		if grid[i] == WALL_VALUE:
 			right_wall += 1
 
 	for i in range(radius, (radius * edge_size), edge_size): # 'radius' is the position of the tile in the top middle.
-		if grid[i] == Tile.WALL:
+		if grid[i] == WALL_VALUE:
 			top_wall += 1
 
 	for i in range(((radius + 1) * edge_size) + radius, num_tiles, edge_size):
-		if grid[i] == Tile.WALL:
+		if grid[i] == WALL_VALUE:
 			bottom_wall += 1
 
 	return (left_wall, right_wall, top_wall, bottom_wall)
 
+def canonicalize_subgrid(subgrid):
+	"""
+	Compute the canonical form of a subgrid. The subgrids are invariant under the 8 rotations and reflections of the
+	square (the dihedral group), which keep the tile in the middle. The canonical form is the smallest one (in the
+	lexicographic order) of the 8 transformed subgrids, so that two subgrids have the same canonical form if and only if
+	one is a rotation or a reflection of the other. The walls are tiles of the subgrid, so they are transformed with it
+	(the 'compute_walls' function gives the walls of the canonical form).
+
+	:subgrid: A subgrid (a list of tile values, that is an one-dimensional grid, see the 'to_value_list' function).
+	:return: The canonical form of the subgrid (a tuple of tile values).
+	"""
+
+	return min(tuple(subgrid[k] for k in permutation)
+		for permutation in _symmetry_permutations(int(math.sqrt(len(subgrid)))))
+
+def canonicalize_subgrids(subgrids):
+	"""
+	Compute the canonical forms of subgrids (see the 'canonicalize_subgrid' function), vectorized with NumPy.
+
+	:subgrids: The subgrids (a NumPy array of shape ('num_subgrids', 'num_tiles') or ('num_subgrids', 'edge_size',
+		'edge_size'), or a list of lists of tile values).
+	:return: The canonical forms of the subgrids (a NumPy array of shape ('num_subgrids', 'num_tiles')).
+	"""
+
+	subgrids = np.asarray(subgrids)
+	subgrids = subgrids.reshape(len(subgrids), int(np.prod(subgrids.shape[1:])))
+	if len(subgrids) == 0:
+		return subgrids
+
+	permutations = np.array(_symmetry_permutations(int(math.sqrt(subgrids.shape[1]))))
+	transformed_subgrids = subgrids[:, permutations] # Shape ('num_subgrids', 8, 'num_tiles').
+
+	# The smallest transformed subgrids are selected tile by tile, in the lexicographic order.
+	candidates = np.ones(transformed_subgrids.shape[:2], dtype=bool)
+	max_value = np.iinfo(subgrids.dtype).max if (subgrids.dtype.kind in 'iu') else np.inf
+	for k in range(subgrids.shape[1]):
+		values = np.where(candidates, transformed_subgrids[:, :, k], max_value)
+		candidates &= values == values.min(axis=1, keepdims=True)
+
+	return transformed_subgrids[np.arange(len(subgrids)), np.argmax(candidates, axis=1)]
+
 def generate_random_mask(subgrid, num_masked_tiles, mask_middle_tile=False, mask_bomb_tiles=False,
-	flag_bomb_tiles=False, walls=None):
+	flag_bomb_tiles=False, walls=None, rng=None):
 	"""
 	Generate a subgrid with a random mask with 'num_masked_tiles' masked tiles.
 	If 'num_masked_tiles' is greater than the number of "available" tiles (tiles that can be masked), then
@@ -84,6 +119,7 @@ def generate_random_mask(subgrid, num_masked_tiles, mask_middle_tile=False, mask
 	:walls: A tuple of four integers. The first one for the thickness of the left wall, the second for the right wall,
 		the third for the top wall and the fourth the bottom wall. If None, then the thicknesses will be computed
 		(lower performance).
+	:rng: The random number generator (a random.Random object). If None, then the 'random' module is used.
 	:return: A subgrid with a random mask (a list of tile values, that is an one-dimensional grid).
 	"""
 
@@ -116,7 +152,7 @@ def generate_random_mask(subgrid, num_masked_tiles, mask_middle_tile=False, mask
 		# Remove the positions containing a bomb.
 		bomb_tile_pos = []
 		for i, tile in enumerate(subgrid):
-			if tile == Tile.BOMB:
+			if tile == BOMB_VALUE:
 				if not((i == middle_tile_pos) and mask_middle_tile):
 					# Do nothing if 'i' is the position of the tile in the middle of the subgrid and 'mask_middle_tile'
 					# is True.
@@ -133,26 +169,27 @@ def generate_random_mask(subgrid, num_masked_tiles, mask_middle_tile=False, mask
 	if num_masked_tiles > len(pos_to_sample):
 		num_masked_tiles = len(pos_to_sample)
 
-	# Sample somes positions.
-	masked_tile_pos.extend(random.sample(pos_to_sample, num_masked_tiles))
+	# Sample somes positions. The positions are sorted since sets can not be sampled (and the order of a set is not
+	# deterministic in general).
+	masked_tile_pos.extend(get_rng(rng).sample(sorted(pos_to_sample), num_masked_tiles))
 
 	# Mask the tiles.
 	for i in masked_tile_pos:
-		masked_subgrid[i] = MaskedTile.MASKED.value
+		masked_subgrid[i] = MASKED_VALUE
 
 	# Insert the flags.
 	if flag_bomb_tiles:
 		for i, tile in enumerate(masked_subgrid):
-			if tile == Tile.BOMB: # 'tile' is not masked and contains a bomb.
+			if tile == BOMB_VALUE: # 'tile' is not masked and contains a bomb.
 				if not((i == middle_tile_pos) and mask_middle_tile):
 					# Do nothing if 'i' is the position of the tile in the middle of the subgrid and 'mask_middle_tile'
 					# is True.
-					masked_subgrid[i] = MaskedTile.FLAG.value
+					masked_subgrid[i] = FLAG_VALUE
 
 	return masked_subgrid
 
 def generate_random_masks(subgrid, num_masked_subgrids, mask_middle_tile=False, mask_bomb_tiles=False,
-	flag_bomb_tiles=False):
+	flag_bomb_tiles=False, rng=None):
 	"""
 	Generate a list of subgrids with a random mask. For each one, between 1 and ('num_available_tiles' - 1) tiles are
 	masked, where 'num_available_tiles' is the number of "available" tiles (tiles that can be masked).
@@ -164,8 +201,11 @@ def generate_random_masks(subgrid, num_masked_subgrids, mask_middle_tile=False,
 	:flag_bomb_tiles: If True, then the unmasked tiles that contain a bomb will be replaced by a flag tile
 		('mask_bomb_tiles' is therefore ignored). The tile in the middle of 'subgrid' will not be replaced if
 		'mask_middle_tile' is True.
+	:rng: The random number generator (a random.Random object). If None, then the 'random' module is used.
 	:return: A list of subgrids with a random mask (a list of tile values, that is an one-dimensional grid).
 	"""
+
+	rng = get_rng(rng)
  
  	# Compute the thickness of the walls.
 	walls = compute_walls(subgrid)
@@ -178,9 +218,9 @@ def generate_random_masks(subgrid, num_masked_subgrids, mask_middle_tile=False,
 
 	subgrids = []
 	for i in range(num_masked_subgrids):
-		num_masked_tiles = random.randint(1, (num_available_tiles - 1))
+		num_masked_tiles = rng.randint(1, (num_available_tiles - 1))
 		masked_grid = generate_random_mask(subgrid, num_masked_tiles, mask_middle_tile, mask_bomb_tiles,
-			flag_bomb_tiles, walls)
+			flag_bomb_tiles, walls, rng)
 		subgrids.append(masked_grid)
 
 	return subgrids
@@ -195,7 +235,7 @@ def count_num_masked_tiles(subgrid):
 
 	num_masked_tiles = 0
 	for tile in subgrid:
-		if (tile == MaskedTile.MASKED) or (tile == MaskedTile.FLAG):
+		if (tile == MASKED_VALUE) or (tile == FLAG_VALUE):
 			num_masked_tiles += 1
 
 	return num_masked_tiles
@@ -210,7 +250,7 @@ def count_num_empty_tiles_not_masked(subgrid):
 
 	num_empty_tiles_not_masked = 0
 	for tile in subgrid:
-		if tile == MaskedTile.EMPTY:
+		if 0 <= tile <= 8: # The tile is an empty tile (see MaskedTile.EMPTY).
 			num_empty_tiles_not_masked += 1
 
 	return num_empty_tiles_not_masked
@@ -219,7 +259,7 @@ def extract_subgrid(grid, i, j, subgrid_radius):
 	"""
 	Extrat a subgrid from a grid and a position. The tile at this position is the center of the subgrid.
 
-	:grid: The grid (a list of lists of tiles).
+	:grid: The grid (a list of lists of tiles or a read-only view of a grid, see the 'grid' property of Grid).
 	:i: The index of the row of the position.
 	:j: The index of the columns of the position.
 	:subgrid_radius: The radius of the subgrid. For example, with a radius of 2, this function will return a 5 by 5
@@ -250,6 +290,24 @@ def extract_subgrid(grid, i, j, subgrid_radius):
 
 	return subgrid
 
+@lru_cache(maxsize=None)
+def _symmetry_permutations(edge_size):
+	"""
+	Compute the permutations of the tiles of a subgrid of the 8 rotations and reflections of the square.
+
+	:edge_size: The number of rows (and of columns) of the subgrid.
+	:return: The permutations (a tuple of 8 tuples of indices of tiles). The tile at the position 'k' of a transformed
+		subgrid is the tile at the position 'permutation[k]' of the subgrid. The first permutation is the identity.
+	"""
+
+	positions = np.arange(edge_size ** 2).reshape(edge_size, edge_size)
+
+	return tuple(
+		tuple(np.rot90(reflected_positions, k).flatten().tolist())
+		for reflected_positions in (positions, positions.T)
+		for k in range(4)
+	)
+
 def print_grid(grid):
 	"""
 	Print a grid.
@@ -272,7 +330,7 @@ def print_grid(grid):
 			print('')
 
 def data_set_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius, bomb_middle_tile,
-	without_duplicates=False, folder_path="ai/nn/data_sets/"):
+	without_duplicates=False, folder_path="ai/nn/data_sets/", binary=False, compression=None):
 	"""
 	Get the path of the data set folling parameters.
 
@@ -284,13 +342,18 @@ def data_set_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_
 		does not contain a bomb.
 	:without_duplicates: If True, then the data set is without duplicates. If False, then it is with duplicates.
 	:folder_path: The path of the folder including the file.
+	:binary: If True, then the data set is in the binary format (see the 'write_binary_data_set' function). If False,
+		then it is in the CSV format.
+	:compression: If not None, the extension of the compressed format ("zlib" or "xz", see the
+		'write_compressed_data_set' function). It has priority over 'binary'.
 	:return: The path of the data set.
 	"""
 
 	without_duplicates_str = "_wod" if without_duplicates else ""
+	extension = compression if (compression is not None) else ("bin" if binary else "csv")
 
-	return folder_path + "data_set_{}ro_{}c_{}b_{}ra_{}bm{}.csv".format(num_rows_grid, num_columns_grid, num_bombs_grid,
-		subgrid_radius, bomb_middle_tile, without_duplicates_str)
+	return folder_path + "data_set_{}ro_{}c_{}b_{}ra_{}bm{}.{}".format(num_rows_grid, num_columns_grid, num_bombs_grid,
+		subgrid_radius, bomb_middle_tile, without_duplicates_str, extension)
 
 def model_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius, with_flags=False,
 	folder_path="ai/nn/models/"):
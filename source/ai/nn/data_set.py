@@ -1,15 +1,67 @@
-from minesweeper.grid_generation import generate_subgrid
-from ai.helpers import to_value_list, data_set_file_path
+from minesweeper.grid import Grid
+from minesweeper.grid_generation import generate_subgrid, generate_subgrids
+from minesweeper.random_streams import child_seed
+from ai.helpers import to_value_list, canonicalize_subgrids, data_set_file_path
+from ai.nn.deduplication import FingerprintSet, compute_fingerprints
 
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+import numpy as np
 import random
+import struct
+import json
+import math
+import lzma
+import zlib
 import csv
+import io
+import os
 
 # There are two data sets. The first one contains subgrids whose the middle tile contain a bomb while the second one
 # contains subgrids whose the middle tile does not contain a bomb. They both have a size of 'SIZE'.
 SIZE = 1000000 # Size of one data set.
 
+# Binary format of the data sets. A file starts with a header (the magic number, the version of the format, the radius
+# of the subgrids, the number of subgrids and the size of the metadata), followed by the metadata (a JSON object) and
+# padded to a multiple of 'RECORDS_ALIGNMENT' bytes. Then the subgrids are stored as fixed-width records of int8 (the
+# values of the tiles, row by row), so that the file can be mapped in memory (see the 'load_data_set' function) without
+# parsing it.
+MAGIC_NUMBER = b'MSDS'
+VERSION = 1
+RECORDS_ALIGNMENT = 64
+
+_HEADER = struct.Struct('<4sHHQI') # Magic number, version, radius, number of subgrids and size of the metadata.
+
+# Compressed format of the data sets. A file starts with a header (the magic number, the version of the format, the
+# codec, the radius of the subgrids, the number of subgrids, the number of subgrids per block, the size of the metadata
+# and the offset of the block index), followed by the metadata (a JSON object) and by the blocks. Each block contains a
+# fixed number of records (like the binary format) compressed independently, so that the blocks can be decompressed in
+# parallel and a subgrid can be read by decompressing only its block. The block index, at the end of the file, is the
+# offsets of the blocks (uint64, followed by the offset of the index). The codec (zlib or lzma) is chosen from the
+# extension of the file name (see 'COMPRESSED_EXTENSIONS').
+COMPRESSED_MAGIC_NUMBER = b'MSDZ'
+COMPRESSED_VERSION = 1
+COMPRESSED_EXTENSIONS = {".zlib": 'zlib', ".xz": 'lzma'} # Extensions of the file names and their codecs.
+
+_COMPRESSED_HEADER = struct.Struct('<4sHBBQIIQ') # Magic number, version, codec, radius, number of subgrids, number of
+# subgrids per block, size of the metadata and offset of the block index.
+_CODECS = ['zlib', 'lzma'] # The codecs, by their number in the header.
+_COMPRESSORS = {'zlib': (zlib.compress, zlib.decompress), 'lzma': (lzma.compress, lzma.decompress)}
+
+MANIFEST_FILE_NAME = "manifest.json" # Name of the manifest of a sharded data set (see 'generate_sharded_data_set').
+
+# Random access to the subgrids. The records of a binary data set have a fixed width, so any subgrid can be read
+# directly. A CSV data set has an index (a file named as the data set followed by 'INDEX_EXTENSION'), the offsets of the
+# rows in bytes (uint64, followed by the size of the file), which is built the first time it is needed. A split
+# manifest (a file named as the data set followed by 'SPLITS_EXTENSION') defines ranges of subgrids (for example the
+# training, validation and test sets), so that a split is read without reading the subgrids before it.
+INDEX_EXTENSION = ".idx"
+SPLITS_EXTENSION = ".splits.json"
+
+_INDEX_BLOCK_SIZE = 2 ** 24 # Number of bytes read at once to build an index.
+
 def generate_data_set(subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid, num_bombs_grid, size,
-	seed=None):
+	seed=None, rng=None):
 	"""
 	Generate a random data set of subgrids.
 
@@ -20,19 +72,27 @@ def generate_data_set(subgrid_radius, bomb_middle_tile, num_rows_grid, num_colum
 	:num_columns_grid: The number of columns of the original grid.
 	:num_bombs_grid: The number of bombs of the original grid.
 	:size: The size of data set (number of subgrids).
-	:seed: A seed.
+	:seed: A seed. It is used to create the random number generator if 'rng' is None (the global 'random' module is
+		not reseeded).
+	:rng: The random number generator (a random.Random object, see the 'random_streams' module).
 	:return: A generator of the data set of subgrids.
 	"""
 
-	random.seed(seed)
+	if rng is None:
+		rng = random.Random(seed)
 
-	return (generate_subgrid(subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid, num_bombs_grid)
+	return (generate_subgrid(subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid, num_bombs_grid, rng)
 		for i in range(size))
 
 def generate_data_set_without_duplicates(subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid,
-	num_bombs_grid, size, seed=None, verbose=True):
+	num_bombs_grid, size, seed=None, verbose=True, rng=None, memory_budget=(2 ** 30), up_to_symmetry=False,
+	block_size=(2 ** 12)):
 	"""
-	Generate a random data set of subgrids without duplicates.
+	Generate a random data set of subgrids without duplicates. Only the fingerprints of the subgrids are kept to detect
+	the duplicates (see the 'deduplication' module), with a bounded memory. The subgrids are generated one by one but
+	their fingerprints are computed and looked up by blocks, and the new subgrids of a block are yielded as soon as the
+	block is checked. A block never holds more subgrids than the number still missing, so the data set is the same
+	whatever the block size.
 
 	:subgrid_radius: The radius of the subgrids. For example, with a radius of 2, the subgrid is a 5 by 5 subgrid.
 	:bomb_middle_tile: If True, then the tile in the middle of the grid will contain a bomb. If False, then this tile
@@ -41,39 +101,95 @@ def generate_data_set_without_duplicates(subgrid_radius, bomb_middle_tile, num_r
 	:num_columns_grid: The number of columns of the original grid.
 	:num_bombs_grid: The number of bombs of the original grid.
 	:size: The size of data set (number of subgrids).
-	:seed: A seed.
+	:seed: A seed. It is used to create the random number generator if 'rng' is None (the global 'random' module is
+		not reseeded).
 	:log: If True, then this function will print the filling of the data set.
+	:rng: The random number generator (a random.Random object, see the 'random_streams' module).
+	:memory_budget: The maximum number of bytes of the fingerprints kept in memory (see FingerprintSet).
+	:up_to_symmetry: If True, then the subgrids are also duplicates when one is a rotation or a reflection of the other
+		(see the 'canonicalize_subgrid' function).
+	:block_size: The maximum number of subgrids checked at once.
 	:return: A generator of the data set of subgrids without duplicates.
 	"""
 
 	if verbose:
 		from datetime import datetime
 
-		previous_size = 0
+	if rng is None:
+		rng = random.Random(seed)
 
-	random.seed(seed)
+	fingerprint_set = FingerprintSet(memory_budget)
+	try:
+		num_subgrids = 0
+		while num_subgrids < size:
+			subgrids = [generate_subgrid(subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid,
+				num_bombs_grid, rng) for i in range(min(block_size, (size - num_subgrids)))]
 
-	data_set = set()
-	while len(data_set) < size:
-		data_set.add(generate_subgrid(subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid,
-			num_bombs_grid))
+			values = np.array([to_value_list(subgrid) for subgrid in subgrids], dtype=np.int8)
+			if up_to_symmetry:
+				values = canonicalize_subgrids(values)
 
-		if verbose:
-			if (previous_size != len(data_set)) and ((len(data_set) % 5000) == 0):
-				print("{}: size of {}.".format(datetime.now().strftime("%H:%M:%S"), len(data_set)))
+			for subgrid, added in zip(subgrids, fingerprint_set.add_many(compute_fingerprints(values)).tolist()):
+				if added:
+					yield subgrid
+					num_subgrids += 1
 
-			previous_size = len(data_set)
+					if verbose and ((num_subgrids % 5000) == 0):
+						print("{}: size of {}.".format(datetime.now().strftime("%H:%M:%S"), num_subgrids))
+	finally:
+		fingerprint_set.close()
 
-	return iter(data_set)
+def write_data_set_without_duplicates(subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid,
+	num_bombs_grid, size, file_name, seed=None, binary=True, memory_budget=(2 ** 30), block_size=(2 ** 20),
+	up_to_symmetry=False):
+	"""
+	Generate a random data set of subgrids without duplicates and write it. The subgrids are generated by blocks (see
+	the 'generate_subgrids' function), the duplicates are detected by their fingerprints (see the 'deduplication'
+	module), with a bounded memory, and the new subgrids are written as soon as they are generated.
+
+	:subgrid_radius: The radius of the subgrids. For example, with a radius of 2, the subgrid is a 5 by 5 subgrid.
+	:bomb_middle_tile: If True, then the tile in the middle of the grid will contain a bomb. If False, then this tile
+	will not contain a bomb.
+	:num_rows_grid: The number of rows of the original grid.
+	:num_columns_grid: The number of columns of the original grid.
+	:num_bombs_grid: The number of bombs of the original grid.
+	:size: The size of data set (number of subgrids).
+	:file_name: The file name.
+	:seed: A seed (of a NumPy Generator).
+	:binary: If True, then the data set is written in the binary format (see the 'write_binary_data_set' function).
+		If False, then it is written in the CSV format.
+	:memory_budget: The maximum number of bytes of the fingerprints kept in memory (see FingerprintSet).
+	:block_size: The number of subgrids generated at once.
+	:up_to_symmetry: If True, then the subgrids are also duplicates when one is a rotation or a reflection of the other
+		(see the 'canonicalize_subgrid' function).
+	"""
+
+	blocks = _generate_blocks_without_duplicates(subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid,
+		num_bombs_grid, size, np.random.default_rng(seed), memory_budget, block_size, up_to_symmetry)
+	data_set = (subgrid for block in blocks for subgrid in block)
+
+	if binary:
+		metadata = {'num_rows_grid': num_rows_grid, 'num_columns_grid': num_columns_grid,
+			'num_bombs_grid': num_bombs_grid, 'bomb_middle_tile': bomb_middle_tile, 'seed': seed,
+			'without_duplicates': True, 'up_to_symmetry': up_to_symmetry}
+		write_binary_data_set(data_set, file_name, subgrid_radius, metadata, block_size)
+	else:
+		write_data_set(data_set, file_name)
 
 def write_data_set(data_set, file_name):
 	"""
-	Write a subgrid data set.
+	Write a subgrid data set, in the CSV format, or in the compressed format if the extension of the file name is one
+	of 'COMPRESSED_EXTENSIONS' (see the 'write_compressed_data_set' function).
 
 	:data_set: A subgrid data set.
 	:file_name: The file name.
 	"""
 
+	if _compression_codec(file_name) is not None:
+		write_compressed_data_set(data_set, file_name)
+
+		return
+
 	with open(file_name, 'w', newline='') as file:
 		csv_writer = csv.writer(file, delimiter=';', quotechar='\"', quoting=csv.QUOTE_MINIMAL)
 
@@ -82,12 +198,27 @@ def write_data_set(data_set, file_name):
 
 def read_data_set(file_name):
 	"""
-	Read a data set of subgrids.
+	Read a data set of subgrids, in the CSV format, in the binary format (see the 'write_binary_data_set' function) or
+	in the compressed format (see the 'write_compressed_data_set' function).
 
 	:file_name: The file name.
 	:return: A generator of the data set of subgrids (a list of tile values, that is an one-dimensional grid).
 	"""
 
+	if is_binary_data_set(file_name):
+		subgrids, _ = load_data_set(file_name)
+		for subgrid in subgrids:
+			yield subgrid.tolist()
+
+		return
+
+	if is_compressed_data_set(file_name):
+		header, _, block_offsets = _read_compressed_header(file_name)
+		for block in _decompress_blocks(file_name, header, block_offsets, 0, (len(block_offsets) - 1)):
+			yield from block.tolist()
+
+		return
+
 	with open(file_name, newline='') as file:
 		csv_reader = csv.reader(file, delimiter=';', quotechar='\"')
 
@@ -96,6 +227,624 @@ def read_data_set(file_name):
 
 	return
 
+def write_binary_data_set(data_set, file_name, subgrid_radius, metadata=None, block_size=65536):
+	"""
+	Write a subgrid data set in the binary format (see 'MAGIC_NUMBER').
+
+	:data_set: A subgrid data set: an iterable of subgrids (Grid objects or lists of tile values) or a NumPy array of
+		shape ('num_subgrids', 'edge_size', 'edge_size') or ('num_subgrids', 'num_tiles') (see the 'generate_subgrids'
+		function).
+	:file_name: The file name.
+	:subgrid_radius: The radius of the subgrids.
+	:metadata: A dictionary of metadata (for example the parameters of the generation) to write in the header, or None.
+	:block_size: The number of subgrids written at once (if 'data_set' is not a NumPy array).
+	"""
+
+	num_tiles = ((2 * subgrid_radius) + 1) ** 2
+	encoded_metadata = json.dumps(metadata if (metadata is not None) else {}).encode('utf-8')
+	records_offset = _records_offset(len(encoded_metadata))
+
+	with open(file_name, 'wb') as file:
+		# The header is written at the end, when the number of subgrids is known.
+		file.write(bytes(records_offset))
+
+		if isinstance(data_set, np.ndarray):
+			records = data_set.reshape(len(data_set), num_tiles).astype(np.int8, copy=False)
+			file.write(records.tobytes())
+			num_subgrids = len(records)
+		else:
+			num_subgrids = 0
+			for records in _record_blocks(data_set, block_size):
+				file.write(records.reshape(len(records), num_tiles).tobytes())
+				num_subgrids += len(records)
+
+		file.seek(0)
+		file.write(_HEADER.pack(MAGIC_NUMBER, VERSION, subgrid_radius, num_subgrids, len(encoded_metadata)))
+		file.write(encoded_metadata)
+
+def write_compressed_data_set(data_set, file_name, subgrid_radius=None, metadata=None, block_size=65536, codec=None):
+	"""
+	Write a subgrid data set in the compressed format (see 'COMPRESSED_MAGIC_NUMBER').
+
+	:data_set: A subgrid data set: an iterable of subgrids (Grid objects or lists of tile values) or a NumPy array of
+		shape ('num_subgrids', 'edge_size', 'edge_size') or ('num_subgrids', 'num_tiles') (see the 'generate_subgrids'
+		function).
+	:file_name: The file name.
+	:subgrid_radius: The radius of the subgrids. If None, then it is computed from the number of tiles of the subgrids.
+	:metadata: A dictionary of metadata (for example the parameters of the generation) to write in the header, or None.
+	:block_size: The number of subgrids per block.
+	:codec: The codec ('zlib' or 'lzma'). If None, then it is chosen from the extension of the file name (see
+		'COMPRESSED_EXTENSIONS').
+	"""
+
+	if codec is None:
+		codec = _compression_codec(file_name)
+	if codec not in _COMPRESSORS:
+		raise ValueError("Error: the codec of the data set '{}' is unknown (codecs: {})!".format(file_name,
+			", ".join(_CODECS)))
+
+	compress, _ = _COMPRESSORS[codec]
+	encoded_metadata = json.dumps(metadata if (metadata is not None) else {}).encode('utf-8')
+
+	with open(file_name, 'wb') as file:
+		# The header is written at the end, when the number of subgrids is known.
+		file.write(bytes(_COMPRESSED_HEADER.size + len(encoded_metadata)))
+
+		num_subgrids = 0
+		num_tiles = ((2 * subgrid_radius) + 1) ** 2 if (subgrid_radius is not None) else 0
+		block_offsets = []
+		for records in _record_blocks(data_set, block_size):
+			block_offsets.append(file.tell())
+			file.write(compress(records.tobytes()))
+			num_subgrids += len(records)
+			num_tiles = records.shape[1]
+
+		index_offset = file.tell()
+		block_offsets.append(index_offset)
+		file.write(np.array(block_offsets, dtype='<u8').tobytes())
+
+		if subgrid_radius is None:
+			subgrid_radius = (math.isqrt(num_tiles) - 1) // 2 if (num_tiles > 0) else 0
+
+		file.seek(0)
+		file.write(_COMPRESSED_HEADER.pack(COMPRESSED_MAGIC_NUMBER, COMPRESSED_VERSION, _CODECS.index(codec),
+			subgrid_radius, num_subgrids, block_size, len(encoded_metadata), index_offset))
+		file.write(encoded_metadata)
+
+def load_compressed_data_set(file_name, start=0, stop=None, num_workers=None):
+	"""
+	Load subgrids of a compressed data set (see the 'write_compressed_data_set' function). Only the blocks including the
+	subgrids are decompressed, in parallel.
+
+	:file_name: The file name.
+	:start: The index of the first subgrid.
+	:stop: The index after the last subgrid. If None, then the subgrids are loaded until the end of the data set.
+	:num_workers: The number of threads decompressing the blocks. If None, then the number of processors is used.
+	:return: The subgrids (a NumPy array of int8 of shape ('num_subgrids', 'num_tiles'), see the 'load_data_set'
+		function) and the metadata (a dictionary, including the radius of the subgrids).
+	"""
+
+	header, metadata, block_offsets = _read_compressed_header(file_name)
+	_, _, _, subgrid_radius, num_subgrids, block_size, _, _ = header
+	num_tiles = ((2 * subgrid_radius) + 1) ** 2
+
+	stop = num_subgrids if (stop is None) else min(stop, num_subgrids)
+	start = min(max(0, start), stop)
+	first_block, last_block = (start // block_size), -(-stop // block_size)
+
+	blocks = list(_decompress_blocks(file_name, header, block_offsets, first_block, last_block, num_workers))
+	if not blocks:
+		return np.empty((0, num_tiles), dtype=np.int8), metadata
+
+	first_subgrid = first_block * block_size
+
+	return np.concatenate(blocks)[(start - first_subgrid):(stop - first_subgrid)], metadata
+
+def is_compressed_data_set(file_name):
+	"""
+	Test if a data set file is in the compressed format (see the 'write_compressed_data_set' function).
+
+	:file_name: The file name.
+	:return: True if the file is in the compressed format, False otherwise.
+	"""
+
+	with open(file_name, 'rb') as file:
+		return file.read(len(COMPRESSED_MAGIC_NUMBER)) == COMPRESSED_MAGIC_NUMBER
+
+def load_data_set(file_name):
+	"""
+	Load a subgrid data set. A binary data set (see the 'write_binary_data_set' function) is mapped in memory, so that
+	it is loaded in constant time and only the subgrids that are read are loaded from the disk. A compressed data set
+	(see the 'write_compressed_data_set' function) is decompressed in parallel. A CSV data set (see the
+	'write_data_set' function) is parsed.
+
+	:file_name: The file name.
+	:return: The subgrids (a read-only NumPy array of int8 of shape ('num_subgrids', 'num_tiles'), whose rows are the
+		lists of tile values of the subgrids) and the metadata (a dictionary, including the radius of the subgrids).
+	"""
+
+	if is_compressed_data_set(file_name):
+		return load_compressed_data_set(file_name)
+
+	if not is_binary_data_set(file_name):
+		subgrids = np.array(list(read_data_set(file_name)), dtype=np.int8)
+		subgrid_radius = int(np.sqrt(subgrids.shape[1])) // 2 if (len(subgrids) > 0) else 0
+
+		return subgrids, {'subgrid_radius': subgrid_radius}
+
+	with open(file_name, 'rb') as file:
+		header = file.read(_HEADER.size)
+		magic_number, version, subgrid_radius, num_subgrids, metadata_size = _HEADER.unpack(header)
+		if version != VERSION:
+			raise ValueError("Error: the version of the data set ({}) is not supported!".format(version))
+		metadata = json.loads(file.read(metadata_size).decode('utf-8'))
+	metadata['subgrid_radius'] = subgrid_radius
+
+	num_tiles = ((2 * subgrid_radius) + 1) ** 2
+	if num_subgrids == 0:
+		return np.empty((0, num_tiles), dtype=np.int8), metadata
+
+	subgrids = np.memmap(file_name, dtype=np.int8, mode='r', offset=_records_offset(metadata_size),
+		shape=(num_subgrids, num_tiles))
+
+	return subgrids, metadata
+
+def is_binary_data_set(file_name):
+	"""
+	Test if a data set file is in the binary format (see the 'write_binary_data_set' function).
+
+	:file_name: The file name.
+	:return: True if the file is in the binary format, False otherwise (CSV format).
+	"""
+
+	with open(file_name, 'rb') as file:
+		return file.read(len(MAGIC_NUMBER)) == MAGIC_NUMBER
+
+def write_data_set_index(file_name):
+	"""
+	Build the index of a CSV data set (see 'INDEX_EXTENSION'). A binary or compressed data set does not need an index.
+
+	:file_name: The file name of the data set.
+	:return: The offsets of the rows (a NumPy array of uint64, followed by the size of the file).
+	"""
+
+	if is_binary_data_set(file_name) or is_compressed_data_set(file_name):
+		raise ValueError("Error: the data set '{}' is not in the CSV format and does not need an index!".format(
+			file_name))
+
+	offset_blocks = [np.zeros(1, dtype=np.uint64)]
+	file_size = 0
+	with open(file_name, 'rb') as file:
+		while True:
+			block = file.read(_INDEX_BLOCK_SIZE)
+			if not block:
+				break
+
+			new_lines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord('\n'))
+			offset_blocks.append((new_lines + file_size + 1).astype(np.uint64))
+			file_size += len(block)
+
+	offsets = np.concatenate(offset_blocks)
+	if offsets[-1] != file_size: # The last row does not end with a new line.
+		offsets = np.append(offsets, np.uint64(file_size))
+
+	offsets.astype('<u8').tofile(file_name + INDEX_EXTENSION)
+
+	return offsets
+
+def read_data_set_rows(file_name, start, stop):
+	"""
+	Read a range of subgrids of a data set, without reading the subgrids before it. The index of a CSV data set is built
+	if it does not exist or if it is older than the data set (see the 'write_data_set_index' function).
+
+	:file_name: The file name of the data set.
+	:start: The index of the first subgrid.
+	:stop: The index after the last subgrid (it is clamped to the number of subgrids). It must not be smaller than
+		'start'.
+	:return: The subgrids (a NumPy array of int8 of shape ('stop' - 'start', 'num_tiles'), see the 'load_data_set'
+		function).
+	"""
+
+	if not (0 <= start <= stop):
+		raise ValueError("Error: the range of subgrids [{}, {}) is not valid, it must satisfy 0 <= start <= stop!"
+			.format(start, stop))
+
+	if is_binary_data_set(file_name):
+		subgrids, _ = load_data_set(file_name)
+
+		return np.array(subgrids[start:stop])
+
+	if is_compressed_data_set(file_name):
+		subgrids, _ = load_compressed_data_set(file_name, start, stop)
+
+		return subgrids
+
+	offsets = _read_data_set_index(file_name)
+	stop = min(stop, (len(offsets) - 1))
+	start = min(start, stop)
+	if start == stop:
+		# The number of tiles of an empty range is the one of the first subgrid (0 if the data set is empty).
+		first_rows = _read_csv_rows(file_name, offsets, 0, min(1, (len(offsets) - 1)))
+
+		return np.empty((0, (len(first_rows[0]) if first_rows else 0)), dtype=np.int8)
+
+	return np.array(_read_csv_rows(file_name, offsets, start, stop), dtype=np.int8)
+
+def count_subgrids(file_name):
+	"""
+	Count the subgrids of a data set, without reading them (the index of a CSV data set is used).
+
+	:file_name: The file name of the data set.
+	:return: The number of subgrids.
+	"""
+
+	if is_binary_data_set(file_name):
+		subgrids, _ = load_data_set(file_name)
+
+		return len(subgrids)
+
+	if is_compressed_data_set(file_name):
+		header, _, _ = _read_compressed_header(file_name)
+
+		return header[4]
+
+	return len(_read_data_set_index(file_name)) - 1
+
+def write_split_manifest(file_name, split_fractions):
+	"""
+	Write the split manifest of a data set (see 'SPLITS_EXTENSION'). The splits are consecutive ranges of subgrids, in
+	the order of 'split_fractions'.
+
+	:file_name: The file name of the data set.
+	:split_fractions: A dictionary of the names of the splits and of their fractions of the data set (for example
+		{'train': 0.8, 'validation': 0.1, 'test': 0.1}). The last split includes the remaining subgrids.
+	:return: The splits (a dictionary of the names of the splits and of their ranges [start, stop]).
+	"""
+
+	if abs(sum(split_fractions.values()) - 1) > 1e-9:
+		raise ValueError("Error: the sum of the fractions of the splits ({}) must be 1!".format(
+			sum(split_fractions.values())))
+
+	num_subgrids = count_subgrids(file_name)
+
+	splits = {}
+	start = 0
+	for k, (name, fraction) in enumerate(split_fractions.items()):
+		stop = num_subgrids if (k == (len(split_fractions) - 1)) else (start + int(fraction * num_subgrids))
+		splits[name] = [start, stop]
+		start = stop
+
+	with open(file_name + SPLITS_EXTENSION, 'w') as file:
+		json.dump({'num_subgrids': num_subgrids, 'splits': splits}, file, indent='\t')
+
+	return splits
+
+def split_range(file_name, split, size=None):
+	"""
+	Get the range of subgrids of a split of a data set (see the 'write_split_manifest' function).
+
+	:file_name: The file name of the data set.
+	:split: The name of the split.
+	:size: The maximum number of subgrids of the range (from the start of the split). If None, then the range is the
+		whole split.
+	:return: The index of the first subgrid and the index after the last subgrid.
+	"""
+
+	with open(file_name + SPLITS_EXTENSION) as file:
+		splits = json.load(file)['splits']
+
+	if split not in splits:
+		raise ValueError("Error: the split '{}' does not exist (splits: {})!".format(split, ", ".join(splits)))
+
+	start, stop = splits[split]
+	if size is not None:
+		stop = min(stop, (start + size))
+
+	return start, stop
+
+def read_split(file_name, split, size=None):
+	"""
+	Read a split of a data set (see the 'write_split_manifest' function), without reading the other splits.
+
+	:file_name: The file name of the data set.
+	:split: The name of the split.
+	:size: The maximum number of subgrids to read (from the start of the split). If None, then the whole split is read.
+	:return: The subgrids (a NumPy array of int8 of shape ('num_subgrids', 'num_tiles'), see the 'load_data_set'
+		function).
+	"""
+
+	start, stop = split_range(file_name, split, size)
+
+	return read_data_set_rows(file_name, start, stop)
+
+def generate_sharded_data_set(subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid, num_bombs_grid, size,
+	folder_path, num_shards, seed, num_processes=None, binary=True, block_size=(2 ** 16)):
+	"""
+	Generate a random data set of subgrids in parallel. The data set is split in 'num_shards' shards, generated by a pool
+	of processes. Each shard is generated from its own seed, derived from 'seed' and the index of the shard (see the
+	'random_streams' module), and written to its own part file, so that the data set only depends on 'seed',
+	'num_shards' and 'block_size' (and not on the number of processes or the order in which the shards are generated).
+	A manifest (a JSON file named 'MANIFEST_FILE_NAME') lists the part files and their numbers of subgrids.
+
+	:subgrid_radius: The radius of the subgrids. For example, with a radius of 2, the subgrid is a 5 by 5 subgrid.
+	:bomb_middle_tile: If True, then the tile in the middle of the grid will contain a bomb. If False, then this tile
+	will not contain a bomb.
+	:num_rows_grid: The number of rows of the original grid.
+	:num_columns_grid: The number of columns of the original grid.
+	:num_bombs_grid: The number of bombs of the original grid.
+	:size: The size of data set (number of subgrids).
+	:folder_path: The path of the folder of the part files and of the manifest (it is created if it does not exist).
+	:num_shards: The number of shards.
+	:seed: The root seed (a non-negative integer).
+	:num_processes: The number of processes. If None, then the number of processors is used.
+	:binary: If True, then the part files are in the binary format (see the 'write_binary_data_set' function). If
+		False, then they are in the CSV format.
+	:block_size: The number of subgrids generated and written at once by a process (it bounds the memory used).
+	:return: The path of the manifest.
+	"""
+
+	os.makedirs(folder_path, exist_ok=True)
+
+	extension = "bin" if binary else "csv"
+	shard_tasks = [
+		(os.path.join(folder_path, "part_{:05d}.{}".format(index, extension)), ((size // num_shards) +
+		(1 if (index < (size % num_shards)) else 0)), child_seed(seed, index), subgrid_radius, bomb_middle_tile,
+		num_rows_grid, num_columns_grid, num_bombs_grid, binary, block_size)
+		for index in range(num_shards)
+	]
+
+	with Pool(num_processes) as pool:
+		shard_sizes = pool.map(_generate_shard, shard_tasks)
+
+	manifest = {
+		'subgrid_radius': subgrid_radius, 'bomb_middle_tile': bomb_middle_tile, 'num_rows_grid': num_rows_grid,
+		'num_columns_grid': num_columns_grid, 'num_bombs_grid': num_bombs_grid, 'size': size, 'seed': seed,
+		'num_shards': num_shards, 'block_size': block_size, 'format': extension,
+		'shards': [
+			{'file_name': os.path.basename(task[0]), 'num_subgrids': shard_size}
+			for task, shard_size in zip(shard_tasks, shard_sizes)
+		]
+	}
+
+	manifest_file_name = os.path.join(folder_path, MANIFEST_FILE_NAME)
+	with open(manifest_file_name, 'w') as file:
+		json.dump(manifest, file, indent='\t')
+
+	return manifest_file_name
+
+def read_manifest(manifest_file_name):
+	"""
+	Read the manifest of a sharded data set (see the 'generate_sharded_data_set' function).
+
+	:manifest_file_name: The path of the manifest.
+	:return: The manifest (a dictionary) and the list of paths of the part files.
+	"""
+
+	with open(manifest_file_name) as file:
+		manifest = json.load(file)
+
+	folder_path = os.path.dirname(manifest_file_name)
+
+	return manifest, [os.path.join(folder_path, shard['file_name']) for shard in manifest['shards']]
+
+def read_sharded_data_set(manifest_file_name):
+	"""
+	Read a sharded data set (see the 'generate_sharded_data_set' function), shard by shard.
+
+	:manifest_file_name: The path of the manifest.
+	:return: A generator of the data set of subgrids (a list of tile values, that is an one-dimensional grid).
+	"""
+
+	_, file_names = read_manifest(manifest_file_name)
+	for file_name in file_names:
+		yield from read_data_set(file_name)
+
+def _read_csv_rows(file_name, offsets, start, stop):
+	"""
+	Read a range of rows of a CSV data set (see the 'read_data_set_rows' function).
+
+	:file_name: The file name of the data set.
+	:offsets: The index of the data set (see the 'write_data_set_index' function).
+	:start: The index of the first row.
+	:stop: The index after the last row.
+	:return: The rows (lists of tile values).
+	"""
+
+	with open(file_name, 'rb') as file:
+		file.seek(int(offsets[start]))
+		rows = file.read(int(offsets[stop] - offsets[start])).decode('utf-8')
+
+	csv_reader = csv.reader(io.StringIO(rows, newline=''), delimiter=';', quotechar='\"')
+
+	return [[int(tile) for tile in row] for row in csv_reader]
+
+def _generate_blocks_without_duplicates(subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid,
+	num_bombs_grid, size, rng, memory_budget, block_size, up_to_symmetry=False):
+	"""
+	Generate blocks of random subgrids without duplicates (see the 'write_data_set_without_duplicates' function).
+
+	:subgrid_radius: The radius of the subgrids.
+	:bomb_middle_tile: If True, then the tile in the middle of the grid will contain a bomb.
+	:num_rows_grid: The number of rows of the original grid.
+	:num_columns_grid: The number of columns of the original grid.
+	:num_bombs_grid: The number of bombs of the original grid.
+	:size: The size of data set (number of subgrids).
+	:rng: The random number generator (a NumPy Generator).
+	:memory_budget: The maximum number of bytes of the fingerprints kept in memory (see FingerprintSet).
+	:block_size: The number of subgrids generated at once.
+	:up_to_symmetry: If True, then the subgrids are also duplicates when one is a rotation or a reflection of the other.
+	:return: A generator of blocks of subgrids (NumPy arrays of int8 of shape ('block_size', 'edge_size',
+		'edge_size')).
+	"""
+
+	fingerprint_set = FingerprintSet(memory_budget)
+	try:
+		num_subgrids = 0
+		while num_subgrids < size:
+			subgrids = generate_subgrids(block_size, subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid,
+				num_bombs_grid, rng)
+			fingerprints = compute_fingerprints(canonicalize_subgrids(subgrids) if up_to_symmetry else subgrids)
+			new_subgrids = subgrids[fingerprint_set.add_many(fingerprints)][:(size - num_subgrids)]
+			num_subgrids += len(new_subgrids)
+
+			yield new_subgrids
+	finally:
+		fingerprint_set.close()
+
+def _generate_shard(shard_task):
+	"""
+	Generate a shard of a sharded data set and write it to its part file (see the 'generate_sharded_data_set'
+	function). The subgrids are generated and written by blocks, so that the memory used does not depend on the size of
+	the shard.
+
+	:shard_task: A tuple of the path of the part file, the number of subgrids, the seed of the shard, the parameters
+		of the subgrids, the format of the part file and the number of subgrids per block.
+	:return: The number of subgrids of the shard.
+	"""
+
+	(file_name, size, seed, subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid, num_bombs_grid,
+		binary, block_size) = shard_task
+
+	rng = np.random.default_rng(seed)
+	blocks = (
+		generate_subgrids(min(block_size, (size - start)), subgrid_radius, bomb_middle_tile, num_rows_grid,
+			num_columns_grid, num_bombs_grid, rng)
+		for start in range(0, size, block_size)
+	)
+	data_set = (subgrid for block in blocks for subgrid in block)
+
+	if binary:
+		write_binary_data_set(data_set, file_name, subgrid_radius, {'seed': seed}, block_size)
+	else:
+		write_data_set(data_set, file_name)
+
+	return size
+
+def _record_blocks(data_set, block_size):
+	"""
+	Split a subgrid data set in blocks of records.
+
+	:data_set: A subgrid data set: an iterable of subgrids (Grid objects or lists of tile values) or a NumPy array (see
+		the 'write_binary_data_set' function).
+	:block_size: The number of subgrids per block (the last block can be smaller).
+	:return: A generator of blocks (NumPy arrays of int8 of shape ('block_size', 'num_tiles')).
+	"""
+
+	if isinstance(data_set, np.ndarray):
+		records = data_set.reshape(len(data_set), -1).astype(np.int8, copy=False)
+		for start in range(0, len(records), block_size):
+			yield records[start:(start + block_size)]
+
+		return
+
+	block = []
+	for subgrid in data_set:
+		block.append(to_value_list(subgrid) if isinstance(subgrid, Grid) else subgrid)
+		if len(block) == block_size:
+			yield np.array(block, dtype=np.int8).reshape(len(block), -1)
+			block = []
+	if block:
+		yield np.array(block, dtype=np.int8).reshape(len(block), -1)
+
+def _compression_codec(file_name):
+	"""
+	Get the codec of a compressed data set from the extension of its file name (see 'COMPRESSED_EXTENSIONS').
+
+	:file_name: The file name.
+	:return: The codec, or None if the extension is not one of a compressed data set.
+	"""
+
+	return COMPRESSED_EXTENSIONS.get(os.path.splitext(file_name)[1])
+
+def _read_compressed_header(file_name):
+	"""
+	Read the header, the metadata and the block index of a compressed data set (see the 'write_compressed_data_set'
+	function).
+
+	:file_name: The file name.
+	:return: The header (a tuple, see '_COMPRESSED_HEADER'), the metadata (a dictionary, including the radius of the
+		subgrids) and the offsets of the blocks (a NumPy array of uint64, followed by the offset of the index).
+	"""
+
+	with open(file_name, 'rb') as file:
+		header = _COMPRESSED_HEADER.unpack(file.read(_COMPRESSED_HEADER.size))
+		_, version, codec, subgrid_radius, num_subgrids, block_size, metadata_size, index_offset = header
+		if version != COMPRESSED_VERSION:
+			raise ValueError("Error: the version of the data set ({}) is not supported!".format(version))
+		metadata = json.loads(file.read(metadata_size).decode('utf-8'))
+
+		num_blocks = -(-num_subgrids // block_size)
+		file.seek(index_offset)
+		block_offsets = np.frombuffer(file.read(8 * (num_blocks + 1)), dtype='<u8')
+
+	metadata['subgrid_radius'] = subgrid_radius
+
+	return header, metadata, block_offsets
+
+def _decompress_blocks(file_name, header, block_offsets, first_block, last_block, num_workers=None):
+	"""
+	Decompress blocks of a compressed data set in parallel, by a pool of threads (the codecs release the global
+	interpreter lock). The blocks are read and decompressed by groups, so that only a few blocks are in memory at once.
+
+	:file_name: The file name.
+	:header: The header of the data set (see the '_read_compressed_header' function).
+	:block_offsets: The offsets of the blocks.
+	:first_block: The index of the first block.
+	:last_block: The index after the last block.
+	:num_workers: The number of threads. If None, then the number of processors is used.
+	:return: A generator of blocks, in order (NumPy arrays of int8 of shape ('block_size', 'num_tiles')).
+	"""
+
+	_, _, codec, subgrid_radius, _, _, _, _ = header
+	_, decompress = _COMPRESSORS[_CODECS[codec]]
+	num_tiles = ((2 * subgrid_radius) + 1) ** 2
+
+	if num_workers is None:
+		num_workers = os.cpu_count() or 1
+	group_size = 2 * num_workers
+
+	with open(file_name, 'rb') as file, ThreadPoolExecutor(num_workers) as executor:
+		for group_start in range(first_block, last_block, group_size):
+			group_stop = min((group_start + group_size), last_block)
+			group_offset = int(block_offsets[group_start])
+			file.seek(group_offset)
+			data = memoryview(file.read(int(block_offsets[group_stop]) - group_offset))
+
+			compressed_blocks = [
+				data[(int(block_offsets[k]) - group_offset):(int(block_offsets[k + 1]) - group_offset)]
+				for k in range(group_start, group_stop)
+			]
+			for block in executor.map(decompress, compressed_blocks):
+				yield np.frombuffer(block, dtype=np.int8).reshape(-1, num_tiles)
+
+def _read_data_set_index(file_name):
+	"""
+	Read the index of a CSV data set, or build it if it does not exist or if it is older than the data set (see the
+	'write_data_set_index' function).
+
+	:file_name: The file name of the data set.
+	:return: The offsets of the rows (a NumPy array of uint64, followed by the size of the file). The index is mapped
+		in memory, so that reading a few rows does not read the whole index.
+	"""
+
+	index_file_name = file_name + INDEX_EXTENSION
+	if (not os.path.exists(index_file_name)) or (os.path.getmtime(index_file_name) < os.path.getmtime(file_name)):
+		return write_data_set_index(file_name)
+
+	return np.memmap(index_file_name, dtype='<u8', mode='r')
+
+def _records_offset(metadata_size):
+	"""
+	Compute the offset of the records in a binary data set file.
+
+	:metadata_size: The size of the encoded metadata.
+	:return: The offset of the records (a multiple of 'RECORDS_ALIGNMENT').
+	"""
+
+	size = _HEADER.size + metadata_size
+
+	return ((size + RECORDS_ALIGNMENT - 1) // RECORDS_ALIGNMENT) * RECORDS_ALIGNMENT
+
 if __name__ == "__main__":
 	seed = 42
 
@@ -118,13 +867,34 @@ if __name__ == "__main__":
 		#"""
 		# Without duplicates.
 		file_name = data_set_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius,
-			bomb_middle_tile, True)
+			bomb_middle_tile, True, binary=True)
 		
 		data_set = generate_data_set_without_duplicates(subgrid_radius, bomb_middle_tile, num_rows_grid,
 			num_columns_grid, num_bombs_grid, data_set_size, seed, True)
 		#"""
 
-		write_data_set(data_set, file_name)
+		metadata = {'num_rows_grid': num_rows_grid, 'num_columns_grid': num_columns_grid,
+			'num_bombs_grid': num_bombs_grid, 'bomb_middle_tile': bomb_middle_tile, 'seed': seed}
+		write_binary_data_set(data_set, file_name, subgrid_radius, metadata)
+
+		# The first half of the data set is used to train the neural networks and the second half to evaluate them.
+		write_split_manifest(file_name, {'train': 0.5, 'test': 0.5})
+
+		"""
+		# With duplicates, generated in parallel (in shards).
+		folder_path = data_set_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius,
+			bomb_middle_tile, binary=True)[:-len(".bin")]
+		generate_sharded_data_set(subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid, num_bombs_grid,
+			data_set_size, folder_path, num_shards=64, seed=seed)
+		"""
+
+		"""
+		# Without duplicates, generated by blocks (for large data sets).
+		file_name = data_set_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius,
+			bomb_middle_tile, True, binary=True)
+		write_data_set_without_duplicates(subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid,
+			num_bombs_grid, data_set_size, file_name, seed)
+		"""
 
 		"""
 		# Print the data set.
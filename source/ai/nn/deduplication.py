@@ -0,0 +1,278 @@
+from minesweeper.grid import MIN_TILE_VALUE
+
+import numpy as np
+import tempfile
+import hashlib
+import shutil
+import os
+
+# Deduplication of subgrids by fingerprint. The fingerprint of a subgrid is a 128-bit value (two uint64 words): for
+# the subgrids of at most 32 tiles (a radius of at most 2), the values of the tiles are packed in 4 bits each, so that
+# two subgrids have the same fingerprint if and only if they are equal. Larger subgrids are hashed (BLAKE2b). The
+# packed words are then mixed by a bijective function (a Feistel network), so that the first word is uniformly
+# distributed and can be used to partition and to sort the fingerprints.
+
+_MIX_CONSTANTS = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
+
+# A partition in memory is a sorted run plus a buffer of new fingerprints (a list of blocks, each sorted but not sorted
+# with each other). The buffer is merged into the run when it is as large as the run (and at least 'MIN_BUFFER_SIZE'
+# fingerprints), and the last block of the buffer is merged into the previous one when it is at least half as large,
+# so that the buffer has O(log(n)) blocks and each fingerprint is merged O(log(n)) times.
+MIN_BUFFER_SIZE = 2 ** 12
+
+def compute_fingerprints(subgrids):
+	"""
+	Compute the fingerprints of subgrids.
+
+	:subgrids: The values of the tiles of the subgrids (a NumPy array of shape ('num_subgrids', 'num_tiles') or
+		('num_subgrids', 'edge_size', 'edge_size')).
+	:return: The fingerprints (a NumPy array of uint64 of shape ('num_subgrids', 2)).
+	"""
+
+	subgrids = np.asarray(subgrids).reshape(len(subgrids), -1)
+	num_subgrids, num_tiles = subgrids.shape
+
+	if num_tiles <= 32:
+		nibbles = np.zeros((num_subgrids, 32), dtype=np.uint8)
+		nibbles[:, :num_tiles] = subgrids - MIN_TILE_VALUE
+		packed = (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+	else:
+		subgrids = np.ascontiguousarray(subgrids, dtype=np.int8)
+		packed = np.frombuffer(b''.join(
+			hashlib.blake2b(subgrid.tobytes(), digest_size=16).digest() for subgrid in subgrids
+		), dtype=np.uint8).reshape(num_subgrids, 16)
+
+	words = np.ascontiguousarray(packed).view('<u8').astype(np.uint64)
+	high_words, low_words = words[:, 0], words[:, 1]
+
+	# Two rounds of a Feistel network (bijective).
+	low_words = low_words ^ _mix(high_words)
+	high_words = high_words ^ _mix(low_words)
+
+	return np.stack([high_words, low_words], axis=1)
+
+class FingerprintSet:
+	"""
+	Set of fingerprints (see the 'compute_fingerprints' function) with a bounded memory. The fingerprints are split in
+	partitions (by their first bits). Each partition is stored as NumPy arrays sorted by the first word, plus a buffer
+	of the new fingerprints that is merged into these arrays from time to time. When the fingerprints in memory exceed
+	the memory budget, the largest partition in memory is merged into a sorted file on the disk (one per partition),
+	which is then searched through a memory map.
+	"""
+
+	__slots__ = ('_folder_path', '_own_folder', '_partition_shift', '_max_memory_size', '_memory_partitions',
+		'_buffers', '_buffer_sizes', '_memory_size', '_disk_sizes', '_size')
+
+	def __init__(self, memory_budget=(2 ** 30), num_partitions=256, folder_path=None):
+		"""
+		Create an empty set of fingerprints.
+
+		:memory_budget: The maximum number of bytes of the fingerprints kept in memory (16 bytes per fingerprint).
+		:num_partitions: The number of partitions (a power of 2).
+		:folder_path: The path of the folder of the files of the partitions written on the disk. If None, then a
+			temporary folder is created (and deleted by the 'close' method).
+		"""
+
+		partition_bits = num_partitions.bit_length() - 1
+		if num_partitions != (1 << partition_bits):
+			raise ValueError("Error: the number of partitions ({}) must be a power of 2!".format(num_partitions))
+
+		self._own_folder = folder_path is None
+		self._folder_path = tempfile.mkdtemp() if self._own_folder else folder_path
+		self._partition_shift = np.uint64(64 - partition_bits)
+		self._max_memory_size = max(1, (memory_budget // 16))
+
+		empty_words = np.empty(0, dtype=np.uint64)
+		self._memory_partitions = [(empty_words, empty_words) for p in range(num_partitions)]
+		self._buffers = [[] for p in range(num_partitions)]
+		self._buffer_sizes = [0] * num_partitions
+		self._memory_size = 0
+		self._disk_sizes = [0] * num_partitions
+		self._size = 0
+
+	def __len__(self):
+		return self._size
+
+	def add_many(self, fingerprints):
+		"""
+		Add fingerprints to the set.
+
+		:fingerprints: The fingerprints (a NumPy array of uint64 of shape ('num_fingerprints', 2)).
+		:return: A NumPy array of booleans, True for the fingerprints that were added (that were not in the set and that
+			are the first occurrence in 'fingerprints').
+		"""
+
+		high_words, low_words = fingerprints[:, 0], fingerprints[:, 1]
+		added = np.zeros(len(fingerprints), dtype=bool)
+		if len(fingerprints) == 0:
+			return added
+
+		# First occurrences in 'fingerprints' (the sort is stable).
+		order = np.lexsort((low_words, high_words))
+		sorted_high_words, sorted_low_words = high_words[order], low_words[order]
+		first_occurrences = np.ones(len(order), dtype=bool)
+		first_occurrences[1:] = ((sorted_high_words[1:] != sorted_high_words[:-1]) |
+			(sorted_low_words[1:] != sorted_low_words[:-1]))
+		candidates = order[first_occurrences]
+
+		partitions = high_words[candidates] >> self._partition_shift
+		partition_order = np.argsort(partitions, kind='stable')
+		candidates, partitions = candidates[partition_order], partitions[partition_order]
+		bounds = np.flatnonzero(np.diff(partitions)) + 1
+		for p, partition_candidates in zip(partitions[np.concatenate([[0], bounds])].tolist(),
+			np.split(candidates, bounds)):
+			candidate_high_words = high_words[partition_candidates]
+			candidate_low_words = low_words[partition_candidates]
+
+			known = self._contains(p, candidate_high_words, candidate_low_words)
+			new_candidates = partition_candidates[~known]
+			added[new_candidates] = True
+			self._insert(p, high_words[new_candidates], low_words[new_candidates])
+
+		while self._memory_size > self._max_memory_size:
+			self._spill()
+
+		return added
+
+	def close(self):
+		"""
+		Delete the files of the partitions written on the disk (and the folder if it was created by the set).
+		"""
+
+		if self._own_folder:
+			shutil.rmtree(self._folder_path, ignore_errors=True)
+		else:
+			for p, disk_size in enumerate(self._disk_sizes):
+				if disk_size > 0:
+					os.remove(self._partition_file_name(p))
+
+		self._disk_sizes = [0] * len(self._disk_sizes)
+
+	def _contains(self, p, high_words, low_words):
+		"""
+		Test if fingerprints of a partition are in the set.
+
+		:p: The index of the partition.
+		:high_words: The first words of the fingerprints.
+		:low_words: The second words of the fingerprints.
+		:return: A NumPy array of booleans, True for the fingerprints that are in the set.
+		"""
+
+		runs = [self._memory_partitions[p]] + self._buffers[p]
+		if self._disk_sizes[p] > 0:
+			words = np.memmap(self._partition_file_name(p), dtype=np.uint64, mode='r', shape=(self._disk_sizes[p], 2))
+			runs.append((words[:, 0], words[:, 1]))
+
+		known = np.zeros(len(high_words), dtype=bool)
+		for run_high_words, run_low_words in runs:
+			if len(run_high_words) == 0:
+				continue
+
+			lefts = np.searchsorted(run_high_words, high_words, side='left')
+			rights = np.searchsorted(run_high_words, high_words, side='right')
+			counts = rights - lefts
+
+			single = np.flatnonzero(counts == 1)
+			known[single] |= run_low_words[lefts[single]] == low_words[single]
+
+			# Fingerprints with the same first word are very rare.
+			for index in np.flatnonzero(counts > 1):
+				known[index] |= bool(np.any(run_low_words[lefts[index]:rights[index]] == low_words[index]))
+
+		return known
+
+	def _insert(self, p, high_words, low_words):
+		"""
+		Insert new fingerprints in the buffer of a partition (they must not be in the set). The buffer is merged when it
+		is full.
+
+		:p: The index of the partition.
+		:high_words: The first words of the fingerprints.
+		:low_words: The second words of the fingerprints.
+		"""
+
+		if len(high_words) == 0:
+			return
+
+		order = np.argsort(high_words, kind='stable')
+		self._buffers[p].append((high_words[order], low_words[order]))
+		self._buffer_sizes[p] += len(high_words)
+		self._memory_size += len(high_words)
+		self._size += len(high_words)
+
+		buffer = self._buffers[p]
+		if self._buffer_sizes[p] >= max(MIN_BUFFER_SIZE, len(self._memory_partitions[p][0])):
+			self._merge_buffer(p)
+		else:
+			while (len(buffer) > 1) and (len(buffer[-2][0]) <= (2 * len(buffer[-1][0]))):
+				buffer[-2:] = [_merge_runs(buffer[-2:])]
+
+	def _merge_buffer(self, p):
+		"""
+		Merge the buffer of a partition into its sorted arrays in memory.
+
+		:p: The index of the partition.
+		"""
+
+		self._memory_partitions[p] = _merge_runs([self._memory_partitions[p]] + self._buffers[p])
+		self._buffers[p] = []
+		self._buffer_sizes[p] = 0
+
+	def _spill(self):
+		"""
+		Merge the largest partition in memory into its file on the disk.
+		"""
+
+		p = max(range(len(self._memory_partitions)),
+			key=lambda p: len(self._memory_partitions[p][0]) + self._buffer_sizes[p])
+		self._merge_buffer(p)
+		memory_high_words, memory_low_words = self._memory_partitions[p]
+		words = np.stack([memory_high_words, memory_low_words], axis=1)
+
+		file_name = self._partition_file_name(p)
+		if self._disk_sizes[p] > 0:
+			words = np.concatenate([np.fromfile(file_name, dtype=np.uint64).reshape(-1, 2), words])
+			words = words[np.argsort(words[:, 0], kind='stable')]
+		words.tofile(file_name)
+
+		self._disk_sizes[p] = len(words)
+		self._memory_size -= len(memory_high_words)
+		empty_words = np.empty(0, dtype=np.uint64)
+		self._memory_partitions[p] = (empty_words, empty_words)
+
+	def _partition_file_name(self, p):
+		"""
+		Get the path of the file of a partition.
+
+		:p: The index of the partition.
+		:return: The path of the file.
+		"""
+
+		return os.path.join(self._folder_path, "partition_{}.bin".format(p))
+
+def _merge_runs(runs):
+	"""
+	Merge runs of fingerprints sorted by the first word.
+
+	:runs: The list of runs (pairs of NumPy arrays of the first words and of the second words).
+	:return: The merged run (a pair of NumPy arrays sorted by the first word).
+	"""
+
+	high_words = np.concatenate([run_high_words for run_high_words, run_low_words in runs])
+	low_words = np.concatenate([run_low_words for run_high_words, run_low_words in runs])
+	order = np.argsort(high_words, kind='stable')
+
+	return (high_words[order], low_words[order])
+
+def _mix(words):
+	"""
+	Mix 64-bit words (the finalizer of SplitMix64).
+
+	:words: The words (a NumPy array of uint64).
+	:return: The mixed words.
+	"""
+
+	words = (words ^ (words >> np.uint64(30))) * _MIX_CONSTANTS[0]
+	words = (words ^ (words >> np.uint64(27))) * _MIX_CONSTANTS[1]
+
+	return words ^ (words >> np.uint64(31))
@@ -251,22 +251,19 @@ if __name__ == "__main__":
 	num_masked_subgrids = 10
 	with_flags = True
 
-	ds_no_bm_file_name = data_set_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius, False)
-	ds_bm_file_name = data_set_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius, True)
+	ds_no_bm_file_name = data_set_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius, False,
+		binary=True)
+	ds_bm_file_name = data_set_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius, True,
+		binary=True)
 	# 'bm' means that the tile in the middle of the subgrids contains a bomb.
 	model_file_name = model_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius,
 		with_flags=with_flags)
 
 	random.seed(seed)
 
-	# Load the data set.
-	data_set_gen = ds.read_data_set(ds_no_bm_file_name)
-	for i in range(int(ds.SIZE / 2)): next(data_set_gen) # Skip the half of the data set.
-	data_set = [next(data_set_gen) for i in range(num_no_bm_subgrids)]
-
-	data_set_gen = ds.read_data_set(ds_bm_file_name)
-	for i in range(int(ds.SIZE / 2)): next(data_set_gen) # Skip the half of the data set.
-	data_set.extend([next(data_set_gen) for i in range(num_bm_subgrids)])
+	# Load the test split of the data set (see the 'write_split_manifest' function), without reading the training split.
+	data_set = ds.read_split(ds_no_bm_file_name, 'test', num_no_bm_subgrids).tolist()
+	data_set.extend(ds.read_split(ds_bm_file_name, 'test', num_bm_subgrids).tolist())
 	print("Data set loaded.")
 
 	# Format the data set.
@@ -1,12 +1,15 @@
-from minesweeper.masked_grid import Tile
+from minesweeper.grid import BOMB_VALUE, WALL_VALUE
+from minesweeper.masked_grid import MASKED_VALUE, FLAG_VALUE
+from minesweeper.random_streams import child_seed, child_numpy_rng
 import ai.nn.data_set as ds
-from ai.helpers import generate_random_masks, data_set_file_path, model_file_path
+from ai.helpers import (generate_random_masks, canonicalize_subgrid, canonicalize_subgrids, data_set_file_path,
+	model_file_path)
 
 from keras.models import Sequential
 from keras.layers import Dense
+from keras.utils import Sequence
 import keras.backend as K
 import tensorflow as tf
-import math
 import random
 import numpy as np
 
@@ -72,7 +75,7 @@ def create_model_2(num_tiles_subgrids):
 
 	return model
 
-def format_data_set(data_set, num_masked_subgrids, with_flags=False):
+def format_data_set(data_set, num_masked_subgrids, with_flags=False, rng=None, canonical=False):
 	"""
 	Format the data set for the neural network. For each subgrid of the data set, this function generates
 	'num_masked_subgrids' subgrids with a random mask.
@@ -80,27 +83,15 @@ def format_data_set(data_set, num_masked_subgrids, with_flags=False):
 	:data_set: The data set.
 	:num_masked_subgrids: The number of subgrids with a mask to generate for each subgrid of the data set.
 	:with_flags: If True, then some tiles of masked subgrids containing a bomb will contain a flag.
+	:rng: The random number generator of the masks (a random.Random object). If None, then the 'random' module is used.
+	:canonical: If True, then the subgrids with a mask are replaced by their canonical forms (see the
+		'canonicalize_subgrid' function), for a neural network used with canonical subgrids (see AINN).
 	:return: the formatted data set.
 	"""
 
-	if with_flags:
-		mask_bomb_tiles = False
-	else:
-		mask_bomb_tiles = True
-
-	num_tiles = len(data_set[0])
-	edge_size = int(math.sqrt(num_tiles))
-	radius = int(edge_size / 2)
-	mid_tile_pos = (radius * edge_size) + radius
-
 	formatted_data_set = []
 	for subgrid in data_set:
-		mid_tile = subgrid[mid_tile_pos]
-		y_true_subgrid = 1 if (mid_tile == Tile.BOMB) else 0
-
-		masked_subgrids = generate_random_masks(subgrid, num_masked_subgrids, mask_middle_tile=True,
-			mask_bomb_tiles=mask_bomb_tiles, flag_bomb_tiles=with_flags)
-		formatted_data_set.extend([(msg, y_true_subgrid) for msg in masked_subgrids])
+		formatted_data_set.extend(_format_subgrid(subgrid, num_masked_subgrids, with_flags, rng, canonical))
 
 	return formatted_data_set
 
@@ -118,6 +109,170 @@ def get_inputs_real_outputs(training_set):
 
 	return x, y_true
 
+class MaskedSubgridSequence(Sequence):
+	"""
+	Training set streamed to the neural network (see the 'fit_generator' method of the models), batch by batch. For each
+	batch, the subgrids are read from the data sets (only the subgrids of the batch, see the 'read_data_set_rows'
+	function) and masked with NumPy (see the '_mask_subgrids' function), so that the memory used does not depend on the
+	size of the data sets. The batches can be generated in parallel by worker processes of Keras, which keeps a bounded
+	queue of prepared batches ('max_queue_size').
+	Each batch contains subgrids of each data set, in proportion of their sizes (for example, as many subgrids whose the
+	tile in the middle contains a bomb as subgrids whose this tile does not contain a bomb), in a random order. Each data
+	set is split in blocks of contiguous subgrids ('num_blocks_batch' blocks per batch), and the blocks are shuffled at
+	each epoch, so that the subgrids of a batch change from an epoch to another.
+	"""
+
+	def __init__(self, data_sets, num_masked_subgrids, batch_size=2000, with_flags=False, seed=None, canonical=False,
+		dtype=np.float32, num_blocks_batch=8):
+		"""
+		Create a streamed training set.
+
+		:data_sets: A list of tuples (file name, start, stop), the ranges of subgrids of the data sets (see the
+			'split_range' function).
+		:num_masked_subgrids: The number of subgrids with a mask to generate for each subgrid of the data sets.
+		:batch_size: The number of subgrids with a mask of a batch (the number of subgrids read for a batch is
+			'batch_size' / 'num_masked_subgrids').
+		:with_flags: If True, then some tiles of masked subgrids containing a bomb will contain a flag.
+		:seed: The root seed of the blocks and of the masks. The blocks and the masks of a batch only depend on the
+			seed, the epoch and the index of the batch (see the 'random_streams' module), and not on the worker
+			generating it. If None, then the batches are not reproducible.
+		:canonical: If True, then the subgrids with a mask are replaced by their canonical forms (see the
+			'format_data_set' function).
+		:dtype: The type of the values of the inputs (for example np.float32 or np.int8).
+		:num_blocks_batch: The number of blocks of subgrids of each data set read for a batch.
+		"""
+
+		self.data_sets = data_sets
+		self.num_masked_subgrids = num_masked_subgrids
+		self.with_flags = with_flags
+		self.seed = seed
+		self.canonical = canonical
+		self.dtype = dtype
+		self.num_blocks_batch = num_blocks_batch
+		self.epoch = 0
+
+		num_subgrids = sum((stop - start) for _, start, stop in data_sets)
+		num_subgrids_batch = max(1, (batch_size // num_masked_subgrids))
+		self.num_batches = max(1, -(-num_subgrids // num_subgrids_batch))
+		self.block_orders = self._draw_block_orders()
+
+	def __len__(self):
+		return self.num_batches
+
+	def __getitem__(self, index):
+		"""
+		Generate a batch.
+
+		:index: The index of the batch.
+		:return: The inputs and the real outputs of the neural network for the batch ('x' and 'y_true', NumPy arrays).
+		"""
+
+		if self.seed is None:
+			rng = np.random.default_rng()
+		else:
+			rng = child_numpy_rng(child_seed(self.seed, self.epoch), index)
+
+		num_blocks = self.num_batches * self.num_blocks_batch
+		blocks = []
+		for (file_name, start, stop), block_order in zip(self.data_sets, self.block_orders):
+			# The blocks of the data set of the 'index'-th part of its order.
+			num_subgrids = stop - start
+			for block in block_order[(index * self.num_blocks_batch):((index + 1) * self.num_blocks_batch)].tolist():
+				blocks.append(ds.read_data_set_rows(file_name, (start + ((block * num_subgrids) // num_blocks)),
+					(start + (((block + 1) * num_subgrids) // num_blocks))))
+
+		x, y_true = _mask_subgrids(np.concatenate(blocks), self.num_masked_subgrids, self.with_flags, rng)
+		if self.canonical:
+			x = canonicalize_subgrids(x)
+
+		order = rng.permutation(len(x))
+
+		return x[order].astype(self.dtype, copy=False), y_true[order]
+
+	def on_epoch_end(self):
+		"""
+		Change the blocks of the batches and the masks for the next epoch.
+		"""
+
+		self.epoch += 1
+		self.block_orders = self._draw_block_orders()
+
+	def _draw_block_orders(self):
+		"""
+		Draw the orders of the blocks of the data sets for the current epoch.
+
+		:return: The list of the orders of the blocks of each data set (NumPy arrays of 'num_batches' *
+			'num_blocks_batch' indices of blocks).
+		"""
+
+		rng = np.random.default_rng(None if (self.seed is None) else child_seed(self.seed, self.epoch))
+
+		return [rng.permutation(self.num_batches * self.num_blocks_batch) for _ in self.data_sets]
+
+def _format_subgrid(subgrid, num_masked_subgrids, with_flags, rng, canonical):
+	"""
+	Format a subgrid for the neural network (see the 'format_data_set' function).
+
+	:subgrid: The subgrid (a list of tile values, that is an one-dimensional grid).
+	:num_masked_subgrids: The number of subgrids with a mask to generate.
+	:with_flags: If True, then some tiles of masked subgrids containing a bomb will contain a flag.
+	:rng: The random number generator of the masks (a random.Random object), or None.
+	:canonical: If True, then the subgrids with a mask are replaced by their canonical forms.
+	:return: The list of tuples (subgrid with a mask, real output).
+	"""
+
+	mid_tile = subgrid[len(subgrid) // 2]
+	y_true_subgrid = 1 if (mid_tile == BOMB_VALUE) else 0
+
+	masked_subgrids = generate_random_masks(subgrid, num_masked_subgrids, mask_middle_tile=True,
+		mask_bomb_tiles=(not with_flags), flag_bomb_tiles=with_flags, rng=rng)
+	if canonical:
+		masked_subgrids = [list(canonicalize_subgrid(msg)) for msg in masked_subgrids]
+
+	return [(msg, y_true_subgrid) for msg in masked_subgrids]
+
+def _mask_subgrids(subgrids, num_masked_subgrids, with_flags, rng):
+	"""
+	Format subgrids for the neural network with NumPy: the masks are drawn as by the 'generate_random_masks' function
+	(the tile in the middle is masked, and the tiles containing a bomb are either masked or flagged), without converting
+	the subgrids to lists.
+
+	:subgrids: The subgrids (a NumPy array of int8 of shape ('num_subgrids', 'num_tiles')).
+	:num_masked_subgrids: The number of subgrids with a mask to generate for each subgrid.
+	:with_flags: If True, then the unmasked tiles containing a bomb contain a flag. Otherwise, they are masked.
+	:rng: The random number generator of the masks (a NumPy Generator).
+	:return: The subgrids with a mask (a NumPy array of int8 of shape ('num_subgrids' * 'num_masked_subgrids',
+		'num_tiles')) and the real outputs (a NumPy array of float32).
+	"""
+
+	subgrids = np.repeat(subgrids, num_masked_subgrids, axis=0)
+	middle_tile = subgrids.shape[1] // 2
+	y_true = (subgrids[:, middle_tile] == BOMB_VALUE).astype(np.float32)
+
+	# Between 1 and ('num_available_tiles' - 1) tiles are masked, including the tiles that must be masked.
+	available_tiles = subgrids != WALL_VALUE
+	num_masked_tiles = rng.integers(1, np.count_nonzero(available_tiles, axis=1))
+	bomb_tiles = subgrids == BOMB_VALUE
+	bomb_tiles[:, middle_tile] = False
+	forced_tiles = np.zeros_like(available_tiles)
+	forced_tiles[:, middle_tile] = True
+	if not with_flags:
+		forced_tiles |= bomb_tiles
+
+	# The other masked tiles are sampled without replacement: the tiles with the smallest random keys.
+	candidate_tiles = available_tiles & ~forced_tiles
+	num_sampled_tiles = np.clip((num_masked_tiles - np.count_nonzero(forced_tiles, axis=1)), 0,
+		np.count_nonzero(candidate_tiles, axis=1))
+	keys = np.where(candidate_tiles, rng.random(subgrids.shape), 2.0)
+	ranks = np.argsort(np.argsort(keys, axis=1), axis=1)
+	masked_tiles = forced_tiles | (ranks < num_sampled_tiles[:, np.newaxis])
+
+	masked_subgrids = np.where(masked_tiles, MASKED_VALUE, subgrids).astype(np.int8, copy=False)
+	if with_flags:
+		masked_subgrids[bomb_tiles & ~masked_tiles] = FLAG_VALUE
+
+	return masked_subgrids, y_true
+
 if __name__ == "__main__":
 	seed = 42
 
@@ -133,8 +288,10 @@ if __name__ == "__main__":
 	num_masked_subgrids = 10
 	with_flags = True
 
-	ds_no_bm_file_name = data_set_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius, False)
-	ds_bm_file_name = data_set_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius, True)
+	ds_no_bm_file_name = data_set_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius, False,
+		binary=True)
+	ds_bm_file_name = data_set_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius, True,
+		binary=True)
 	# 'bm' means that the tile in the middle of the subgrids contains a bomb.
 	model_file_name = model_file_path(num_rows_grid, num_columns_grid, num_bombs_grid, subgrid_radius,
 		with_flags=with_flags)
@@ -143,31 +300,18 @@ if __name__ == "__main__":
 	np.random.seed(int(seed)) # Makes Keras deterministic.
 	tf.set_random_seed(seed) # Makes TensorFlow deterministic.
 
-	# Load the data set.
-	data_set_gen = ds.read_data_set(ds_no_bm_file_name)
-	data_set = [next(data_set_gen) for i in range(num_no_bm_subgrids)]
-
-	data_set_gen = ds.read_data_set(ds_bm_file_name)
-	data_set.extend([next(data_set_gen) for i in range(num_bm_subgrids)])
-	print("Data set loaded.")
-
-	# Format the data set.
-	training_set = format_data_set(data_set, num_masked_subgrids, with_flags=with_flags)
-	print("Data set formatted.")
-
-	# Shuffle the training set.
-	#random.shuffle(training_set)
-	#print("Training set shuffled.")
-
-	# Get the 'x' and 'y_true' vectors.
-	x, y_true = get_inputs_real_outputs(training_set)
-	print("Inputs and real outputs extracted.")
+	# Stream the training split of the data set (see the 'write_split_manifest' function), masked on the fly by worker
+	# processes.
+	training_sequence = MaskedSubgridSequence([
+		(ds_no_bm_file_name, *ds.split_range(ds_no_bm_file_name, 'train', num_no_bm_subgrids)),
+		(ds_bm_file_name, *ds.split_range(ds_bm_file_name, 'train', num_bm_subgrids))
+	], num_masked_subgrids, batch_size=2000, with_flags=with_flags, seed=seed)
 
 	# Create the model.
 	model = create_model_1(num_tiles_subgrids)
 
 	# Train the model.
-	model.fit(x, y_true, epochs=6, batch_size=2000)
+	model.fit_generator(training_sequence, epochs=6, workers=4, use_multiprocessing=True, max_queue_size=10)
 	print("Neural network trained.")
 
 	# Save the model.
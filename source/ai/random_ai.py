@@ -6,14 +6,16 @@ class RandomAI(AI):
 	Random artificial intelligence.
 	"""
 
-	def __init__(self, minesweeper=None):
+	def __init__(self, minesweeper=None, rng=None):
 		"""
 		Create an random artificial intelligence.
 
 		:minesweeper: A minesweeper game.
+		:rng: The random number generator (a random.Random object). If None, then the 'random' module is used.
 		"""
 
 		self.minesweeper = minesweeper
+		self.rng = rng
 
 	def play_turn(self):
 		"""
@@ -182,7 +182,7 @@ if __name__ == "__main__":
 	mode = select_mode()
 	print('')
 
-	ms = Minesweeper(NUM_ROWS_GRID, NUM_COLUMNS_GRID, NUM_BOMBS_GRID)
+	ms = Minesweeper(NUM_ROWS_GRID, NUM_COLUMNS_GRID, NUM_BOMBS_GRID, first_click_safe=True)
 	ai = create_ai(mode, ms)
 
 	print(ms, "\n\n")
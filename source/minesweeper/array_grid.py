@@ -0,0 +1,473 @@
+from minesweeper.grid import Tile, Grid, BOMB_VALUE, WALL_VALUE, compute_num_adjacent_bombs, \
+	get_neighbour_table, get_zobrist_table, get_positions, _TILES
+from minesweeper.masked_grid import MaskedTile, MaskedGrid, MASKED_VALUE, FLAG_VALUE, _MASKED_TILES
+
+import numpy as np
+
+class ArrayGrid(Grid):
+	"""
+	Grid of a minesweeper game with walls. The tiles are stored in a NumPy array of int8 (the values of the tiles)
+	instead of a list of lists of tiles.
+	"""
+
+	__slots__ = ()
+
+	@property
+	def grid(self):
+		"""
+		Grid (a read-only NumPy array of the values of the tiles). The tiles are not copied. Use the 'copy_grid' method
+		to get a mutable copy.
+		"""
+
+		return _read_only_view(self._grid)
+
+	def __eq__(self, other):
+		if self._grid_hash() != other._grid_hash():
+			return False
+
+		return np.array_equal(self._grid, other._grid)
+
+	def __hash__(self):
+		return self._grid_hash()
+
+	def copy_grid(self):
+		"""
+		Copy the grid.
+
+		:return: A copy of the grid (a NumPy array of the values of the tiles).
+		"""
+
+		return self._grid.copy()
+
+	def tile_at(self, i, j):
+		"""
+		Get tile at a position. The returned value is either Tile.WALL, Tile.BOMB or the number of adjacent bombs.
+		In this last case, the tile is a Tile.EMPTY.
+
+		:i: The index of the row of the position.
+		:j: The index of the column of the position.
+		:return: Tile.WALL if the tile contains a wall, Tile.BOMB if the tile contains a bomb, the number of adjacent
+			bombs otherwise.
+		"""
+
+		tile = int(self._grid[i, j])
+		if tile < 0:
+			return _TILES[tile]
+
+		return tile
+
+	def _tile_value(self, i, j):
+		"""
+		Get the value of a tile of the grid of numbers (a plain integer, see the 'tile_at' method).
+
+		:i: The index of the row of the position.
+		:j: The index of the column of the position.
+		:return: WALL_VALUE if the tile contains a wall, BOMB_VALUE if the tile contains a bomb, the number of adjacent
+			bombs otherwise.
+		"""
+
+		return int(self._grid[i, j])
+
+	def _tile_values(self):
+		"""
+		Get the values of the tiles of the grid of numbers, row by row.
+
+		:return: The values of the tiles (a list).
+		"""
+
+		return self._grid.ravel().tolist()
+
+	def _create_grid(self):
+		"""
+		Create the grid of numbers without walls and bombs (all tiles are empty and have no adjacent bombs).
+
+		:return: The grid of numbers (a NumPy array of int8).
+		"""
+
+		return np.zeros((self.num_rows, self.num_columns), dtype=np.int8)
+
+	def _insert_walls(self):
+		"""
+		Insert the walls in the grid of numbers.
+		"""
+
+		self._grid[:, :self.left_wall] = WALL_VALUE
+		self._grid[:, (self.num_columns - self.right_wall):] = WALL_VALUE
+		self._grid[:self.top_wall, :] = WALL_VALUE
+		self._grid[(self.num_rows - self.bottom_wall):, :] = WALL_VALUE
+
+	def _insert_bombs(self):
+		"""
+		Insert the bombs and compute the numbers of adjacent bombs in the grid of numbers. The numbers of adjacent bombs
+		of all tiles are computed in one pass (see the 'compute_num_adjacent_bombs' function).
+		"""
+
+		bomb_position_list = self._bomb_position_list
+		if not bomb_position_list:
+			return
+
+		bomb_rows, bomb_columns = (np.array(indices) for indices in zip(*bomb_position_list))
+
+		wall_bombs = np.flatnonzero(self._grid[bomb_rows, bomb_columns] == WALL_VALUE)
+		if wall_bombs.size > 0:
+			i, j = bomb_position_list[wall_bombs[0]]
+			raise ValueError("Error: can not insert a bomb (at {}, {}) on a wall!".format(i, j))
+
+		num_adjacent_bombs = compute_num_adjacent_bombs(self.num_rows, self.num_columns, bomb_position_list)
+		not_walls = self._grid != WALL_VALUE
+		self._grid[not_walls] = num_adjacent_bombs[not_walls]
+		self._grid[bomb_rows, bomb_columns] = BOMB_VALUE
+
+class ArrayMaskedGrid(MaskedGrid, ArrayGrid):
+	"""
+	Grid with walls and mask (including the visibilities). The tiles are stored in a NumPy array of int8 and the mask in
+	a NumPy array of booleans. The grid with mask (what the user see) is also stored in a NumPy array of int8, which is
+	updated when tiles are unmasked and when flags are inserted or removed.
+	"""
+
+	__slots__ = ('_visible_grid',)
+
+	def __init__(self, num_rows, num_columns, bomb_position_list, left_wall=0, right_wall=0, top_wall=0,
+		bottom_wall=0):
+		"""
+		Create a grid with mask.
+
+		:num_rows: The number of rows of the grid.
+		:num_columns: The number of columns of the grid.
+		:bomb_position_list: A list of positions of bombs.
+		:left_wall: The thickness of the left wall.
+		:right_wall: The thickness of the right wall.
+		:top_wall: The thickness of the top wall.
+		:bottom_wall: The thickness of the bottom wall.
+		"""
+
+		super().__init__(num_rows, num_columns, bomb_position_list, left_wall, right_wall, top_wall, bottom_wall)
+
+		# '_visible_grid' is the grid with mask (what the user see).
+		self._visible_grid = np.where(self._masked_grid, np.int8(MASKED_VALUE),
+			self._grid).astype(np.int8, copy=False)
+
+	@classmethod
+	def _from_tiles(cls, tiles, tile_hash, visible_hash, tile_positions):
+		"""
+		Create a grid with mask without walls from the values of its tiles, without inserting the bombs and computing
+		the numbers of adjacent bombs again (see MaskedGridBatch). All tiles are masked.
+
+		:tiles: The values of the tiles (a NumPy array of int8). They are not copied, so that the grid is a view of
+			'tiles' (they must not be changed).
+		:tile_hash: The Zobrist hash of the grid of numbers, or None to compute it the first time it is needed.
+		:visible_hash: The Zobrist hash of the grid with mask.
+		:tile_positions: The positions of all tiles (a set or a frozenset, which is copied).
+		:return: The grid with mask.
+		"""
+
+		num_rows, num_columns = tiles.shape
+
+		grid = cls.__new__(cls)
+		grid._num_rows = num_rows
+		grid._num_columns = num_columns
+		grid._bomb_position_list = [tuple(position) for position in np.argwhere(tiles == BOMB_VALUE).tolist()]
+		grid._left_wall = grid._right_wall = grid._top_wall = grid._bottom_wall = 0
+		grid._neighbour_table = get_neighbour_table(num_rows, num_columns)
+		grid._grid = tiles
+		grid._zobrist_table = get_zobrist_table(num_rows, num_columns)
+		grid._hash = tile_hash
+		grid._empty_regions = None
+		grid._empty_region_labels = None
+
+		grid._masked_grid = np.ones((num_rows, num_columns), dtype=bool)
+		grid._masked_tile_positions = set(tile_positions)
+		grid._flag_tile_positions = set()
+		grid._visible_hash = visible_hash
+		grid._visible_grid = np.full((num_rows, num_columns), MASKED_VALUE, dtype=np.int8)
+
+		return grid
+
+	@property
+	def grid(self):
+		"""
+		Grid with mask (what the user see), as a read-only NumPy array of the values of the tiles. The tiles are not
+		copied. Use the 'copy_grid' method to get a mutable copy.
+		"""
+
+		return _read_only_view(self._visible_grid)
+
+	def __eq__(self, other):
+		if self._visible_hash != other._visible_hash:
+			return False
+
+		return np.array_equal(self._visible_grid, other.grid)
+
+	def __hash__(self):
+		return self._visible_hash
+
+	def copy_grid(self):
+		"""
+		Copy the grid with mask.
+
+		:return: A copy of the grid with mask (a NumPy array of the values of the tiles).
+		"""
+
+		return self._visible_grid.copy()
+
+	def tile_at(self, i, j):
+		"""
+		Get tile at a position. The returned value is either Tile.MASKED, Tile.WALL, Tile.BOMB or the number of
+		adjacent bombs.
+		In this last case, the tile is a Tile.EMPTY.
+
+		:i: The index of the row of the position.
+		:j: The index of the column of the position.
+		:return: Tile.MASKED if the tile is masked, Tile.WALL if the tile contains a wall,
+			Tile.BOMB if the tile contains a bomb, the number of adjacent bombs otherwise.
+		"""
+
+		tile = int(self._visible_grid[i, j])
+		if tile < 0:
+			return _MASKED_TILES[tile]
+
+		return tile
+
+	def insert_flag(self, i, j):
+		"""
+		Insert a flag at position 'i' and 'j'.
+		The tile at this position must be masked. If it is not, then this function returns False.
+
+		:i: The index of the row of the tile.
+		:j: The index of the column of the tile.
+		:return: True if the flag was added, False otherwise.
+		"""
+
+		flag_added = super().insert_flag(i, j)
+		if flag_added:
+			self._visible_grid[i, j] = FLAG_VALUE
+
+		return flag_added
+
+	def remove_flag(self, i, j):
+		"""
+		Remove a flag at position 'i' and 'j'.
+		The tile at this position must contain a flag. If it is not, then this function returns False.
+
+		:i: The index of the row of the tile.
+		:j: The index of the column of the tile.
+		:return: True if the flag was removed, False otherwise.
+		"""
+
+		flag_removed = super().remove_flag(i, j)
+		if flag_removed:
+			self._visible_grid[i, j] = MASKED_VALUE
+
+		return flag_removed
+
+	def remove_all_flags(self):
+		"""
+		Remove all flags.
+		"""
+
+		for i, j in self._flag_tile_positions:
+			self._visible_grid[i, j] = MASKED_VALUE
+
+		super().remove_all_flags()
+
+	def _mask_state(self):
+		"""
+		Get the state of the mask (the attributes that change when tiles are unmasked and when flags are inserted or
+		removed). The attributes are not copied.
+
+		:return: The state of the mask (a tuple).
+		"""
+
+		return super()._mask_state() + (self._visible_grid,)
+
+	def _set_mask_state(self, mask_state):
+		"""
+		Set the state of the mask (see the '_mask_state' method). The attributes are not copied.
+
+		:mask_state: The state of the mask.
+		"""
+
+		super()._set_mask_state(mask_state[:-1])
+		self._visible_grid = mask_state[-1]
+
+	def _copy_mask_state(self, mask_state):
+		"""
+		Copy a state of the mask (see the '_mask_state' method).
+
+		:mask_state: The state of the mask.
+		:return: The copy of the state of the mask.
+		"""
+
+		masked_grid, masked_tile_positions, flag_tile_positions, visible_hash, visible_grid = mask_state
+
+		return (masked_grid.copy(), set(masked_tile_positions), set(flag_tile_positions), visible_hash,
+			visible_grid.copy())
+
+	def _create_mask(self):
+		"""
+		Create the mask of the grid. All tiles are masked except the walls.
+
+		:return: The mask of the grid (a NumPy array of booleans).
+		"""
+
+		return self._grid != WALL_VALUE
+
+	def _count_masked_tiles_without_flag(self, position_list):
+		"""
+		Count the number of tiles that are masked and that do not contain a flag among a list of positions.
+
+		:position_list: The list of positions.
+		:return: The number of tiles that are masked and that do not contain a flag.
+		"""
+
+		rows, columns = zip(*position_list)
+
+		return int(np.count_nonzero(self._visible_grid[rows, columns] == MASKED_VALUE))
+
+	def _unmask_tiles(self, position_list):
+		"""
+		Unmask the tiles at the positions of a list. The tiles that are already unmasked or that contain a flag are not
+		unmasked (see the '_unmask_tile' method).
+
+		:position_list: The list of positions.
+		"""
+
+		if not position_list:
+			return
+
+		rows, columns = (np.array(indices) for indices in zip(*position_list))
+		to_unmask = self._visible_grid[rows, columns] == MASKED_VALUE
+		rows = rows[to_unmask]
+		columns = columns[to_unmask]
+
+		self._masked_grid[rows, columns] = False
+		self._visible_grid[rows, columns] = self._grid[rows, columns]
+		self._masked_tile_positions.difference_update(zip(rows.tolist(), columns.tolist()))
+
+		key_change = self._zobrist_table.key_change
+		for index, tile in zip(((rows * self.num_columns) + columns).tolist(), self._grid[rows, columns].tolist()):
+			self._visible_hash ^= key_change(index, MASKED_VALUE, tile)
+
+	def _unmask_tile(self, i, j):
+		"""
+		Unmask one tile at position 'i' and 'j'. It reveals the tile in this position and decrements by one the
+		variable 'num_masked_tiles'.
+		The tile at this position must be masked and it does must not contain a flag. If it is not, then this function
+		returns False.
+
+		:i: The index of the row of the tile.
+		:j: The index of the column of the tile.
+		:return: True if the tile was unmasked, False otherwise.
+		"""
+
+		if not(self._masked_grid[i, j]) or ((i, j) in self._flag_tile_positions):
+			return False
+
+		self._masked_grid[i, j] = False
+		self._masked_tile_positions.remove((i, j))
+		self._visible_grid[i, j] = self._grid[i, j]
+		self._visible_hash ^= self._zobrist_table.key_change((i * self.num_columns) + j, MASKED_VALUE,
+			int(self._grid[i, j]))
+
+		return True
+
+class MaskedGridBatch:
+	"""
+	Many grids with mask of the same shape, without walls, whose tiles are stored in one stacked NumPy array (see the
+	'generate_masked_grids' function). The grids with mask (ArrayMaskedGrid objects) are only created when they are
+	read, and their grids of numbers are views of the stacked array.
+	"""
+
+	__slots__ = ('_tiles', '_tile_positions')
+
+	def __init__(self, tiles):
+		"""
+		Create a batch of grids with mask. All tiles are masked.
+
+		:tiles: The values of the tiles of the grids (a NumPy array of int8 of shape ('num_grids', 'num_rows',
+			'num_columns')). They are not copied.
+		"""
+
+		num_rows, num_columns = tiles.shape[1:]
+
+		self._tiles = tiles
+		self._tile_positions = frozenset(get_positions(num_rows, num_columns))
+
+	@property
+	def tiles(self):
+		"""
+		Values of the tiles of the grids (a read-only NumPy array of shape ('num_grids', 'num_rows', 'num_columns')).
+		"""
+
+		return _read_only_view(self._tiles)
+
+	@property
+	def num_rows(self):
+		"""
+		Number of rows of the grids.
+		"""
+
+		return self._tiles.shape[1]
+
+	@property
+	def num_columns(self):
+		"""
+		Number of columns of the grids.
+		"""
+
+		return self._tiles.shape[2]
+
+	def __len__(self):
+		return len(self._tiles)
+
+	def __getitem__(self, index):
+		"""
+		Get a grid with mask of the batch. A new grid is created at each call (its grid of numbers is a view of the
+		stacked array, but its mask is not shared).
+
+		:index: The index of the grid.
+		:return: The grid with mask (an ArrayMaskedGrid object).
+		"""
+
+		# The hash of the grid of numbers is computed by the grid, the first time it is needed. All tiles are masked, so
+		# that the hash of the grid with mask is the one of the initial grid with mask (0, see MaskedGrid).
+		return ArrayMaskedGrid._from_tiles(self._tiles[index], None, 0, self._tile_positions)
+
+	def __iter__(self):
+		for index in range(len(self)):
+			yield self[index]
+
+def _read_only_view(array):
+	"""
+	Get a read-only view of a NumPy array (the values are not copied).
+
+	:array: The NumPy array.
+	:return: The read-only view.
+	"""
+
+	view = array.view()
+	view.flags.writeable = False
+
+	return view
+
+if __name__ == "__main__":
+	from minesweeper.grid_generation import generate_masked_grid
+
+	bomb_position_list = [(5, 4), (4, 2), (2, 1), (4, 4)]
+	g = ArrayGrid(10, 5, bomb_position_list, 1, 0, 2, 3)
+	print(g)
+	print(g == Grid(10, 5, bomb_position_list, 1, 0, 2, 3))
+
+	print("\n\n\n")
+
+	g = ArrayMaskedGrid(10, 5, bomb_position_list, 1, 0, 2, 3)
+	g.insert_flag(4, 2)
+	unmasked_tiles = g.unmask_tile(2, 4)
+	print("{}{}\n".format(g, unmasked_tiles))
+	print(g.grid)
+
+	print("\n\n\n")
+
+	g = generate_masked_grid(10, 10, 10, grid_class=ArrayMaskedGrid)
+	g.unmask_all_tiles()
+	print(g)
@@ -0,0 +1,325 @@
+from minesweeper.grid import BOMB_VALUE
+from minesweeper.masked_grid import MASKED_VALUE, FLAG_VALUE
+from minesweeper.minesweeper import State
+from minesweeper.array_grid import _read_only_view
+from minesweeper.grid_generation import generate_bombs, adjacent_views, count_adjacent
+
+import numpy as np
+
+class BatchMinesweeper:
+	"""
+	Many minesweeper games of the same shape played in lock-step. The games are stored in stacked NumPy arrays (the
+	tiles, the masks, the flags, the states and the scores) instead of one Minesweeper object per game, and one move
+	per game is played in a single call (see the 'play_tiles' method). The rules are the same as in Minesweeper.
+	"""
+
+	__slots__ = ('_num_rows', '_num_columns', '_num_bombs', '_tiles', '_masks', '_flags', '_visible_grids',
+		'_num_masked_tiles', '_states', '_scores')
+
+	def __init__(self, num_games, num_rows, num_columns, num_bombs, rng=None):
+		"""
+		Create minesweeper games.
+
+		:num_games: The number of games.
+		:num_rows: The number of rows of the grids.
+		:num_columns: The number of columns of the grids.
+		:num_bombs: The number of bombs of each grid.
+		:rng: The random number generator of the bombs (a NumPy Generator). If None, then the 'numpy.random' module is
+			used.
+		"""
+
+		if not(0 <= num_bombs <= (num_rows * num_columns)):
+			raise ValueError("Error: the number of bombs must be between 0 and the number of tiles!")
+
+		self._num_rows = num_rows
+		self._num_columns = num_columns
+		self._num_bombs = num_bombs
+
+		bombs = generate_bombs(num_games, num_rows, num_columns, num_bombs, rng)
+		self._tiles = np.where(bombs, np.int8(BOMB_VALUE), count_adjacent(bombs)).astype(np.int8, copy=False)
+		self._masks = np.ones((num_games, num_rows, num_columns), dtype=bool) # True if the tile is masked.
+		self._flags = np.zeros((num_games, num_rows, num_columns), dtype=bool) # True if the tile contains a flag.
+		# '_visible_grids' are the grids with mask (what the user see).
+		self._visible_grids = np.full((num_games, num_rows, num_columns), MASKED_VALUE, dtype=np.int8)
+		self._num_masked_tiles = np.full(num_games, (num_rows * num_columns), dtype=np.int64)
+
+		self._states = np.full(num_games, State.CONTINUE.value, dtype=np.int8)
+		self._scores = np.zeros(num_games, dtype=np.int64)
+
+	@property
+	def num_games(self):
+		"""
+		Number of games.
+		"""
+
+		return len(self._states)
+
+	@property
+	def num_rows(self):
+		"""
+		Number of rows of the grids.
+		"""
+
+		return self._num_rows
+
+	@property
+	def num_columns(self):
+		"""
+		Number of columns of the grids.
+		"""
+
+		return self._num_columns
+
+	@property
+	def num_bombs(self):
+		"""
+		Number of bombs of each grid.
+		"""
+
+		return self._num_bombs
+
+	@property
+	def num_masked_tiles(self):
+		"""
+		Number of masked tiles of each game (a read-only NumPy array).
+		"""
+
+		return _read_only_view(self._num_masked_tiles)
+
+	@property
+	def grids(self):
+		"""
+		Grids with mask (what the user see) of the games, as a read-only NumPy array of the values of the tiles of
+		shape ('num_games', 'num_rows', 'num_columns').
+		"""
+
+		return _read_only_view(self._visible_grids)
+
+	@property
+	def flags(self):
+		"""
+		Flags of the games (a read-only NumPy array of booleans, True if the tile contains a flag).
+		"""
+
+		return _read_only_view(self._flags)
+
+	@property
+	def states(self):
+		"""
+		States of the games (a read-only NumPy array of the values of the states, see State).
+		"""
+
+		return _read_only_view(self._states)
+
+	@property
+	def scores(self):
+		"""
+		Scores of the games (a read-only NumPy array).
+		"""
+
+		return _read_only_view(self._scores)
+
+	@property
+	def max_score(self):
+		"""
+		Max score (highest possible score for each game).
+		"""
+
+		return (self.num_rows * self.num_columns) - self.num_bombs
+
+	def __len__(self):
+		return self.num_games
+
+	def unfinished_games(self):
+		"""
+		Get the games that are not finished.
+
+		:return: The indices of the games that are not finished (a NumPy array).
+		"""
+
+		return np.flatnonzero(self._states == State.CONTINUE.value)
+
+	def play_tiles(self, actions):
+		"""
+		Play on one tile per game and update the states and the scores, as the 'play_tile' method of Minesweeper does
+		for one game. When an empty tile without adjacent bombs is played, the empty tiles around are also unmasked (the
+		flags and the unmasked tiles stop the exploration). The finished games are not played (their actions are
+		ignored).
+
+		:actions: The positions of the tiles to play, one per game (a sequence or a NumPy array of shape
+			('num_games', 2)).
+		:return: The tiles unmasked by this call (a NumPy array of booleans of shape ('num_games', 'num_rows',
+			'num_columns')).
+		"""
+
+		games, rows, columns = self._check_actions(actions)
+		unmasked = np.zeros(self._masks.shape, dtype=bool)
+
+		flags = np.flatnonzero(self._flags[games, rows, columns])
+		if flags.size > 0:
+			k = flags[0]
+			raise ValueError("Error: the tile (at {}, {}) of the game {} contains a flag!".format(rows[k], columns[k],
+				games[k]))
+		unmasked_tiles = np.flatnonzero(~self._masks[games, rows, columns])
+		if unmasked_tiles.size > 0:
+			k = unmasked_tiles[0]
+			raise ValueError("Error: the tile (at {}, {}) of the game {} is already unmasked!".format(rows[k],
+				columns[k], games[k]))
+
+		played = np.zeros((len(games), self.num_rows, self.num_columns), dtype=bool)
+		played[np.arange(len(games)), rows, columns] = True
+		unmasked[games] = self._explore(games, played)
+
+		# Unmasking of the tiles.
+		self._masks &= ~unmasked
+		np.copyto(self._visible_grids, self._tiles, where=unmasked)
+		num_unmasked_tiles = np.count_nonzero(unmasked[games], axis=(1, 2))
+		self._num_masked_tiles[games] -= num_unmasked_tiles
+
+		# Updating of the states.
+		lost = self._tiles[games, rows, columns] == BOMB_VALUE
+		won = ~lost & ((self._num_masked_tiles[games] - self.num_bombs) == 0)
+		self._states[games[lost]] = State.LOSS.value
+		self._states[games[won]] = State.WIN.value
+
+		# Updating of the scores.
+		self._scores[games[~lost]] += num_unmasked_tiles[~lost]
+
+		return unmasked
+
+	def reveal_all_tiles(self):
+		"""
+		Reveal all tiles of all games. The unfinished games are lost after calling this function.
+		"""
+
+		self._masks[:] = False
+		self._flags[:] = False
+		self._visible_grids[:] = self._tiles
+		self._num_masked_tiles[:] = 0
+		self._states[self._states == State.CONTINUE.value] = State.LOSS.value
+
+	def insert_flags(self, actions):
+		"""
+		Insert one flag per game. The tile at the position of a flag must be masked. If it is not, then the flag is not
+		inserted.
+
+		:actions: The positions of the flags, one per game (a sequence or a NumPy array of shape ('num_games', 2)).
+		:return: True for the games where the flag was added, False otherwise (a NumPy array of booleans).
+		"""
+
+		games, rows, columns = self._check_actions(actions, all_games=True)
+		added = self._masks[games, rows, columns] & ~self._flags[games, rows, columns]
+		games, rows, columns = games[added], rows[added], columns[added]
+
+		self._flags[games, rows, columns] = True
+		self._visible_grids[games, rows, columns] = FLAG_VALUE
+
+		return added
+
+	def remove_flags(self, actions):
+		"""
+		Remove one flag per game. The tile at the position of a flag must contain a flag. If it is not, then nothing is
+		removed.
+
+		:actions: The positions of the flags, one per game (a sequence or a NumPy array of shape ('num_games', 2)).
+		:return: True for the games where the flag was removed, False otherwise (a NumPy array of booleans).
+		"""
+
+		games, rows, columns = self._check_actions(actions, all_games=True)
+		removed = self._flags[games, rows, columns].copy()
+		games, rows, columns = games[removed], rows[removed], columns[removed]
+
+		self._flags[games, rows, columns] = False
+		self._visible_grids[games, rows, columns] = MASKED_VALUE
+
+		return removed
+
+	def remove_all_flags(self):
+		"""
+		Remove all flags of all games.
+		"""
+
+		self._visible_grids[self._flags] = MASKED_VALUE
+		self._flags[:] = False
+
+	def _check_actions(self, actions, all_games=False):
+		"""
+		Check the actions (one position per game) and select the games to update.
+
+		:actions: The positions, one per game (a sequence or a NumPy array of shape ('num_games', 2)).
+		:all_games: If True, then all games are selected. Otherwise, only the unfinished games are selected.
+		:return: The indices of the selected games, and the indices of the rows and of the columns of their positions
+			(three NumPy arrays).
+		"""
+
+		actions = np.asarray(actions, dtype=np.int64).reshape(-1, 2)
+		if len(actions) != self.num_games:
+			raise ValueError("Error: there must be one action per game ({} actions for {} games)!".format(
+				len(actions), self.num_games))
+
+		games = np.arange(self.num_games) if all_games else self.unfinished_games()
+		rows, columns = actions[games, 0], actions[games, 1]
+
+		outside = np.flatnonzero((rows < 0) | (rows >= self.num_rows) | (columns < 0) | (columns >= self.num_columns))
+		if outside.size > 0:
+			k = outside[0]
+			raise ValueError("Error: the position ({}, {}) of the game {} is outside the grid!".format(rows[k],
+				columns[k], games[k]))
+
+		return games, rows, columns
+
+	def _explore(self, games, played):
+		"""
+		Explore the tiles to unmask from the played tiles. The empty tiles around the played tiles that have no adjacent
+		bombs are explored by growing all regions at the same time, one ring of adjacent tiles per step, as the flood
+		fill of the 'unmask_tile' method of MaskedGrid does for one grid.
+
+		:games: The indices of the played games.
+		:played: The played tiles of these games (a NumPy array of booleans with one played tile per game).
+		:return: The tiles to unmask of these games (a NumPy array of booleans).
+		"""
+
+		unmasked = played.copy()
+		unmaskable = self._masks[games] & ~self._flags[games] & ~played # Masked tiles that do not contain a flag.
+		no_adjacent_bombs = self._tiles[games] == 0
+
+		frontier = played & no_adjacent_bombs
+		while frontier.any():
+			frontier = _dilate(frontier) & unmaskable
+			unmaskable &= ~frontier
+			unmasked |= frontier
+			frontier &= no_adjacent_bombs
+
+		return unmasked
+
+def _dilate(tiles):
+	"""
+	Get the tiles adjacent to some tiles of many grids.
+
+	:tiles: The tiles (a NumPy array of booleans).
+	:return: The tiles that are adjacent to at least one tile of 'tiles' (a NumPy array of booleans).
+	"""
+
+	adjacent_tiles = np.zeros(tiles.shape, dtype=bool)
+	for view in adjacent_views(tiles):
+		adjacent_tiles |= view
+
+	return adjacent_tiles
+
+if __name__ == "__main__":
+	import time
+
+	num_games = 10000
+	games = BatchMinesweeper(num_games, 10, 10, 10)
+
+	start = time.time()
+	while len(games.unfinished_games()) > 0:
+		# Play a random masked tile without flag of each game.
+		keys = np.random.random(games.grids.shape) * (games.grids == MASKED_VALUE)
+		positions = keys.reshape(num_games, -1).argmax(axis=1)
+		games.play_tiles(np.stack(np.divmod(positions, games.num_columns), axis=1))
+	duration = time.time() - start
+
+	print("{} games played in {:.2f} seconds.".format(num_games, duration))
+	print("Wins: {}".format(np.count_nonzero(games.states == State.WIN.value)))
+	print("Mean score: {:.2f} / {}".format(games.scores.mean(), games.max_score))
@@ -0,0 +1,369 @@
+from minesweeper.grid import Grid
+from minesweeper.masked_grid import MaskedTile, MaskedGrid, MASKED_VALUE, FLAG_VALUE
+
+import itertools
+import numpy as np
+
+class BitMaskedGrid(MaskedGrid):
+	"""
+	Grid with walls and mask (including the visibilities). The mask and the flags are stored in two bitsets (bytearrays,
+	one bit per tile) instead of a list of lists of booleans and two sets of positions. The bit of the tile at position
+	(i, j) is the bit (index % 8) of the byte (index // 8), where index = (i * 'num_columns') + j, so that a tile is read
+	or changed in constant time, and the tiles of a list of positions are read or changed at once with NumPy.
+	"""
+
+	__slots__ = ('_mask', '_flags', '_num_masked_tiles', '_num_flag_tiles')
+
+	def __init__(self, num_rows, num_columns, bomb_position_list, left_wall=0, right_wall=0, top_wall=0,
+		bottom_wall=0):
+		"""
+		Create a grid with mask.
+
+		:num_rows: The number of rows of the grid.
+		:num_columns: The number of columns of the grid.
+		:bomb_position_list: A list of positions of bombs.
+		:left_wall: The thickness of the left wall.
+		:right_wall: The thickness of the right wall.
+		:top_wall: The thickness of the top wall.
+		:bottom_wall: The thickness of the bottom wall.
+		"""
+
+		Grid.__init__(self, num_rows, num_columns, bomb_position_list, left_wall, right_wall, top_wall, bottom_wall)
+
+		# '_mask' is the mask of the grid: the bit of a tile is set if this tile is masked. By default, all tiles is
+		# masked except the walls.
+		# '_flags' is the set of flag tiles: the bit of a tile is set if this tile contains a flag.
+		self._mask = self._create_mask()
+		self._flags = bytearray(len(self._mask))
+		self._num_masked_tiles = self.num_tiles
+		self._num_flag_tiles = 0
+
+		# '_visible_hash' is the Zobrist hash of the grid with mask (what the user see), relative to the initial grid with
+		# mask (see the '_initial_visible_hash' method).
+		self._visible_hash = self._initial_visible_hash()
+
+	@property
+	def num_masked_tiles(self):
+		"""
+		Number of masked tiles.
+		"""
+
+		return self._num_masked_tiles
+
+	@property
+	def masked_tile_positions(self):
+		"""
+		Positions of masked tiles.
+		"""
+
+		return self._to_positions(_bit_indices(self._mask))
+
+	@property
+	def num_flag_tiles(self):
+		"""
+		Number of flag tiles.
+		"""
+
+		return self._num_flag_tiles
+
+	@property
+	def flag_tile_positions(self):
+		"""
+		Positions of flag tiles.
+		"""
+
+		return self._to_positions(_bit_indices(self._flags))
+
+	def tile_at(self, i, j):
+		"""
+		Get tile at a position. The returned value is either Tile.MASKED, Tile.WALL, Tile.BOMB or the number of
+		adjacent bombs.
+		In this last case, the tile is a Tile.EMPTY.
+
+		:i: The index of the row of the position.
+		:j: The index of the column of the position.
+		:return: Tile.MASKED if the tile is masked, Tile.WALL if the tile contains a wall,
+			Tile.BOMB if the tile contains a bomb, the number of adjacent bombs otherwise.
+		"""
+
+		index = (i * self.num_columns) + j
+		byte, bit = (index >> 3), (1 << (index & 7))
+		if self._mask[byte] & bit:
+			if self._flags[byte] & bit:
+				return MaskedTile.FLAG
+			return MaskedTile.MASKED
+
+		return Grid.tile_at(self, i, j)
+
+	def unmask_all_tiles(self):
+		"""
+		Unmask all tiles. The 'num_masked_tiles' counter is equal to 0 after calling this function.
+		"""
+
+		self.remove_all_flags()
+		self._update_visible_hash(_bit_indices(self._mask), MASKED_VALUE, None)
+		self._mask = bytearray(len(self._mask))
+		self._num_masked_tiles = 0
+
+	def insert_flag(self, i, j):
+		"""
+		Insert a flag at position 'i' and 'j'.
+		The tile at this position must be masked. If it is not, then this function returns False.
+
+		:i: The index of the row of the tile.
+		:j: The index of the column of the tile.
+		:return: True if the flag was added, False otherwise.
+		"""
+
+		index = (i * self.num_columns) + j
+		byte, bit = (index >> 3), (1 << (index & 7))
+		if (self._mask[byte] & bit) and not (self._flags[byte] & bit):
+			self._flags[byte] |= bit
+			self._num_flag_tiles += 1
+			self._visible_hash ^= self._zobrist_table.key_change(index, MASKED_VALUE, FLAG_VALUE)
+
+			return True
+
+		return False
+
+	def insert_flags(self, position_list):
+		"""
+		Insert a flag for position 'i' and 'j' of 'position_list'.
+		The tiles at these positions must be masked. If it is not, then this function returns False.
+
+		:position_list: The list of positions of flags.
+		:return: True if the all flags were added, False otherwise (some flags were not added).
+		"""
+
+		indices = self._to_indices(position_list)
+		added_indices = indices[_test_bits(self._mask, indices) & ~_test_bits(self._flags, indices)]
+		_set_bits(self._flags, added_indices)
+		self._num_flag_tiles += len(added_indices)
+		self._update_visible_hash(added_indices, MASKED_VALUE, FLAG_VALUE)
+
+		# A position appearing twice in 'position_list' is not added the second time.
+		return len(added_indices) == len(position_list)
+
+	def remove_flag(self, i, j):
+		"""
+		Remove a flag at position 'i' and 'j'.
+		The tile at this position must contain a flag. If it is not, then this function returns False.
+
+		:i: The index of the row of the tile.
+		:j: The index of the column of the tile.
+		:return: True if the flag was removed, False otherwise.
+		"""
+
+		index = (i * self.num_columns) + j
+		byte, bit = (index >> 3), (1 << (index & 7))
+		if not (self._flags[byte] & bit):
+			return False
+
+		self._flags[byte] &= ~bit
+		self._num_flag_tiles -= 1
+		self._visible_hash ^= self._zobrist_table.key_change(index, FLAG_VALUE, MASKED_VALUE)
+
+		return True
+
+	def remove_all_flags(self):
+		"""
+		Remove all flags.
+		"""
+
+		self._update_visible_hash(_bit_indices(self._flags), FLAG_VALUE, MASKED_VALUE)
+		self._flags = bytearray(len(self._flags))
+		self._num_flag_tiles = 0
+
+	def _mask_state(self):
+		"""
+		Get the state of the mask (the bitsets of the mask and of the flags, their numbers of set bits and the Zobrist
+		hash of the grid with mask). The bitsets are not copied.
+
+		:return: The state of the mask (a tuple).
+		"""
+
+		return (self._mask, self._flags, self._num_masked_tiles, self._num_flag_tiles, self._visible_hash)
+
+	def _set_mask_state(self, mask_state):
+		"""
+		Set the state of the mask (see the '_mask_state' method). The bitsets are not copied.
+
+		:mask_state: The state of the mask.
+		"""
+
+		self._mask, self._flags, self._num_masked_tiles, self._num_flag_tiles, self._visible_hash = mask_state
+
+	def _copy_mask_state(self, mask_state):
+		"""
+		Copy a state of the mask (see the '_mask_state' method).
+
+		:mask_state: The state of the mask.
+		:return: The copy of the state of the mask.
+		"""
+
+		mask, flags, num_masked_tiles, num_flag_tiles, visible_hash = mask_state
+
+		return (bytearray(mask), bytearray(flags), num_masked_tiles, num_flag_tiles, visible_hash)
+
+	def _create_mask(self):
+		"""
+		Create the mask of the grid. All tiles are masked except the walls.
+
+		:return: The mask of the grid (a bitset).
+		"""
+
+		rows, columns = np.arange(self.num_rows), np.arange(self.num_columns)
+		not_wall_rows = (self.top_wall <= rows) & (rows < (self.num_rows - self.bottom_wall))
+		not_wall_columns = (self.left_wall <= columns) & (columns < (self.num_columns - self.right_wall))
+		not_walls = not_wall_rows[:, np.newaxis] & not_wall_columns[np.newaxis, :]
+
+		return bytearray(np.packbits(not_walls, bitorder='little').tobytes())
+
+	def _count_masked_tiles_without_flag(self, position_list):
+		"""
+		Count the number of tiles that are masked and that do not contain a flag among a list of positions.
+
+		:position_list: The list of positions.
+		:return: The number of tiles that are masked and that do not contain a flag.
+		"""
+
+		indices = self._to_indices(position_list)
+
+		return int(np.count_nonzero(_test_bits(self._mask, indices) & ~_test_bits(self._flags, indices)))
+
+	def _unmask_tiles(self, position_list):
+		"""
+		Unmask the tiles at the positions of a list. The tiles that are already unmasked or that contain a flag are not
+		unmasked (see the '_unmask_tile' method).
+
+		:position_list: The list of positions.
+		"""
+
+		indices = self._to_indices(position_list)
+		unmasked_indices = indices[_test_bits(self._mask, indices) & ~_test_bits(self._flags, indices)]
+		_clear_bits(self._mask, unmasked_indices)
+		self._num_masked_tiles -= len(unmasked_indices)
+		self._update_visible_hash(unmasked_indices, MASKED_VALUE, None)
+
+	def _unmask_tile(self, i, j):
+		"""
+		Unmask one tile at position 'i' and 'j'. It reveals the tile in this position and decrements by one the
+		variable 'num_masked_tiles'.
+		The tile at this position must be masked and it does must not contain a flag. If it is not, then this function
+		returns False.
+
+		:i: The index of the row of the tile.
+		:j: The index of the column of the tile.
+		:return: True if the tile was unmasked, False otherwise.
+		"""
+
+		index = (i * self.num_columns) + j
+		byte, bit = (index >> 3), (1 << (index & 7))
+		if not (self._mask[byte] & bit) or (self._flags[byte] & bit):
+			return False
+
+		self._mask[byte] &= ~bit
+		self._num_masked_tiles -= 1
+		self._visible_hash ^= self._zobrist_table.key_change(index, MASKED_VALUE, self._tile_value(i, j))
+
+		return True
+
+	def _update_visible_hash(self, indices, old_tile, new_tile):
+		"""
+		Update the Zobrist hash of the grid with mask when tiles change.
+
+		:indices: The flat indices of the tiles that change (a NumPy array).
+		:old_tile: The old value of the tiles.
+		:new_tile: The new value of the tiles. If None, then the new value of each tile is its value in the grid of
+			numbers (the tiles are unmasked).
+		"""
+
+		if new_tile is None:
+			new_tiles = [self._tile_value(i, j) for i, j in self._to_positions(indices)]
+		else:
+			new_tiles = np.full(len(indices), new_tile)
+
+		self._visible_hash ^= self._zobrist_table.keys_change(indices, old_tile, new_tiles)
+
+	def _to_indices(self, position_list):
+		"""
+		Convert a list of positions to flat indices.
+
+		:position_list: The list of positions.
+		:return: The flat indices of the positions, without duplicates (a sorted NumPy array of int64).
+		"""
+
+		positions = np.fromiter(itertools.chain.from_iterable(position_list), dtype=np.int64).reshape(-1, 2)
+
+		return np.unique((positions[:, 0] * self.num_columns) + positions[:, 1])
+
+	def _to_positions(self, indices):
+		"""
+		Convert flat indices to a list of positions.
+
+		:indices: The flat indices (a NumPy array).
+		:return: The list of positions.
+		"""
+
+		return [divmod(index, self.num_columns) for index in indices.tolist()]
+
+def _test_bits(bits, indices):
+	"""
+	Test the bits of a bitset.
+
+	:bits: The bitset (a bytearray).
+	:indices: The indices of the bits (a NumPy array of int64).
+	:return: True for the indices whose bit is set (a NumPy array of booleans).
+	"""
+
+	return ((np.frombuffer(bits, dtype=np.uint8)[indices >> 3] >> (indices & 7)) & 1).astype(bool)
+
+def _set_bits(bits, indices):
+	"""
+	Set bits of a bitset.
+
+	:bits: The bitset (a bytearray, changed in place).
+	:indices: The indices of the bits (a NumPy array of int64).
+	"""
+
+	np.bitwise_or.at(np.frombuffer(bits, dtype=np.uint8), (indices >> 3), (1 << (indices & 7)).astype(np.uint8))
+
+def _clear_bits(bits, indices):
+	"""
+	Clear bits of a bitset.
+
+	:bits: The bitset (a bytearray, changed in place).
+	:indices: The indices of the bits (a NumPy array of int64).
+	"""
+
+	np.bitwise_and.at(np.frombuffer(bits, dtype=np.uint8), (indices >> 3), ~(1 << (indices & 7)).astype(np.uint8))
+
+def _bit_indices(bits):
+	"""
+	Get the indices of the set bits of a bitset. Only the non-zero bytes are unpacked.
+
+	:bits: The bitset (a bytearray).
+	:return: The indices of the set bits (a sorted NumPy array of int64).
+	"""
+
+	bytes_ = np.frombuffer(bits, dtype=np.uint8)
+	byte_indices = np.flatnonzero(bytes_)
+	byte_bits = np.unpackbits(bytes_[byte_indices, np.newaxis], axis=1, bitorder='little').astype(bool)
+
+	return ((byte_indices[:, np.newaxis] * 8) + np.arange(8))[byte_bits]
+
+if __name__ == "__main__":
+	import sys
+
+	bomb_position_list = [(0, 1), (5, 4), (4, 2), (9, 4), (2, 1), (4, 4), (9, 0), (9, 1), (7, 1), (0, 3), (7, 2),
+		(3, 0)]
+	g = BitMaskedGrid(10, 5, bomb_position_list)
+	g.insert_flag(0, 1)
+	unmasked_tiles = g.unmask_tile(0, 0)
+	print("{}{}\n".format(g, unmasked_tiles))
+	unmasked_tiles = g.unmask_tile(2, 4)
+	print("{}{}\n".format(g, unmasked_tiles))
+	print("Number of masked tiles: {}.\nNumber of flag tiles: {}.".format(g.num_masked_tiles, g.num_flag_tiles))
+
+	# Size of the mask and the flags.
+	print("Size of the mask and the flags: {} bytes.".format(sys.getsizeof(g._mask) + sys.getsizeof(g._flags)))
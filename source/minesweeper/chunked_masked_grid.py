@@ -0,0 +1,613 @@
+from minesweeper.grid import Tile, BOMB_VALUE, WALL_VALUE, ADJACENT_OFFSETS, check_dimensions, \
+	get_zobrist_table, _TILES
+from minesweeper.masked_grid import MaskedTile, MaskedGrid, MASKED_VALUE
+from minesweeper.random_streams import get_rng
+
+from collections import OrderedDict
+import numpy as np
+import random
+
+CHUNK_SIZE = 64 # Default number of rows and columns of the chunks.
+
+# Maximal number of grids of numbers of chunks kept in cache by a grid (the grids of numbers of the least recently read
+# chunks are removed, and computed again if they are read again).
+NUMBER_CHUNK_CACHE_SIZE = 256
+
+# Maximal number of masked tiles whose positions can be listed (see the 'masked_tile_positions' property).
+MAX_LISTED_MASKED_TILES = 10 ** 7
+
+class ChunkedMaskedGrid(MaskedGrid):
+	"""
+	Grid with walls and mask (including the visibilities) for very large grids. The grid is split into square chunks of
+	'chunk_size' x 'chunk_size' tiles and nothing is allocated for the whole grid:
+	- the bombs are stored per chunk (only the chunks containing bombs are allocated),
+	- the grid of numbers of a chunk is computed the first time one of its tiles is read,
+	- the mask is stored as the unmasked tiles of the chunks (only the chunks containing unmasked tiles are allocated).
+	The 'tile_at', 'unmask_tile' and flag methods behave like those of MaskedGrid.
+	"""
+
+	__slots__ = ('_chunk_size', '_num_bombs', '_bomb_chunks', '_number_chunks', '_unmasked_chunks',
+		'_num_unmasked_tiles')
+
+	def __init__(self, num_rows, num_columns, bomb_position_list, left_wall=0, right_wall=0, top_wall=0,
+		bottom_wall=0, chunk_size=CHUNK_SIZE):
+		"""
+		Create a grid with mask.
+
+		:num_rows: The number of rows of the grid.
+		:num_columns: The number of columns of the grid.
+		:bomb_position_list: A list of positions of bombs.
+		:left_wall: The thickness of the left wall.
+		:right_wall: The thickness of the right wall.
+		:top_wall: The thickness of the top wall.
+		:bottom_wall: The thickness of the bottom wall.
+		:chunk_size: The number of rows and columns of the chunks.
+		"""
+
+		check_dimensions(num_rows, num_columns, len(bomb_position_list), left_wall, right_wall, top_wall, bottom_wall)
+
+		self._num_rows = num_rows
+		self._num_columns = num_columns
+		self._left_wall = left_wall
+		self._right_wall = right_wall
+		self._top_wall = top_wall
+		self._bottom_wall = bottom_wall
+		self._chunk_size = chunk_size
+
+		# '_bomb_chunks' contains, for each chunk containing bombs, the bombs of this chunk (a NumPy array of booleans).
+		# '_number_chunks' contains the grids of numbers of the 'NUMBER_CHUNK_CACHE_SIZE' chunks most recently read (see
+		# the '_number_chunk' method), from the least recently read to the most recently read.
+		self._bomb_chunks = {}
+		self._number_chunks = OrderedDict()
+		self._insert_bomb_chunks(bomb_position_list)
+
+		# '_unmasked_chunks' contains, for each chunk containing unmasked tiles, the unmasked tiles of this chunk (a
+		# NumPy array of booleans). The walls are never masked.
+		self._unmasked_chunks = {}
+		self._num_unmasked_tiles = 0
+		self._flag_tile_positions = set()
+
+		# '_visible_hash' is the Zobrist hash of the grid with mask (what the user see), relative to the initial grid with
+		# mask (see the '_initial_visible_hash' method).
+		self._zobrist_table = get_zobrist_table(num_rows, num_columns)
+		self._visible_hash = self._initial_visible_hash()
+
+	@property
+	def chunk_size(self):
+		"""
+		Number of rows and columns of the chunks.
+		"""
+
+		return self._chunk_size
+
+	@property
+	def num_bombs(self):
+		"""
+		Number of bombs of the grid.
+		"""
+
+		return self._num_bombs
+
+	@property
+	def bomb_position_list(self):
+		"""
+		List of positions of bombs (computed from the chunks on each call).
+		"""
+
+		return [
+			((ci * self._chunk_size) + int(i), (cj * self._chunk_size) + int(j))
+			for (ci, cj), bombs in self._bomb_chunks.items() for i, j in zip(*np.nonzero(bombs))
+		]
+
+	@property
+	def num_masked_tiles(self):
+		"""
+		Number of masked tiles.
+		"""
+
+		return self.num_tiles - self._num_unmasked_tiles
+
+	@property
+	def masked_tile_positions(self):
+		"""
+		Positions of masked tiles (computed from the chunks on each call). The masked tiles of a chunk are found at once
+		from its unmasked tiles, and all tiles of the chunks without unmasked tiles are masked (except the walls). The
+		number of masked tiles must not exceed 'MAX_LISTED_MASKED_TILES' (the list would not fit in memory on the
+		largest grids).
+		"""
+
+		num_masked_tiles = self.num_masked_tiles
+		if num_masked_tiles > MAX_LISTED_MASKED_TILES:
+			raise ValueError("Error: the grid has {} masked tiles, too many to list their positions (at most {})!"
+				.format(num_masked_tiles, MAX_LISTED_MASKED_TILES))
+
+		chunk_size = self._chunk_size
+		masked_tile_positions = []
+		for ci in range(-(-self.num_rows // chunk_size)):
+			for cj in range(-(-self.num_columns // chunk_size)):
+				masked_tiles = ~self._walls_of_chunk(ci, cj)
+				unmasked_tiles = self._unmasked_chunks.get((ci, cj))
+				if unmasked_tiles is not None:
+					masked_tiles &= ~unmasked_tiles
+
+				i, j = np.nonzero(masked_tiles)
+				masked_tile_positions.extend(zip(((ci * chunk_size) + i).tolist(), ((cj * chunk_size) + j).tolist()))
+
+		return masked_tile_positions
+
+	def __eq__(self, other):
+		# The chunked grids only compare the chunks of other chunked grids. The comparison with a grid of another class
+		# is left to this class (the hashes are computed with the same keys, see ZobristTable).
+		if not isinstance(other, ChunkedMaskedGrid):
+			return NotImplemented
+
+		if (self.num_rows != other.num_rows) or (self.num_columns != other.num_columns):
+			return False
+
+		if (self._visible_hash != other._visible_hash) or (self._chunk_size != other._chunk_size) or \
+			(self._num_unmasked_tiles != other._num_unmasked_tiles) or \
+			(self._flag_tile_positions != other._flag_tile_positions) or \
+			((self.left_wall, self.right_wall, self.top_wall, self.bottom_wall) !=
+			(other.left_wall, other.right_wall, other.top_wall, other.bottom_wall)):
+
+			return False
+
+		# Both grids have the same number of unmasked tiles, so it is enough to check that the unmasked tiles of this
+		# grid are unmasked in the other grid and have the same values.
+		for chunk, unmasked_tiles in self._unmasked_chunks.items():
+			other_unmasked_tiles = other._unmasked_chunks.get(chunk)
+			if other_unmasked_tiles is None:
+				if unmasked_tiles.any():
+					return False
+				continue
+
+			if not(np.array_equal(unmasked_tiles, other_unmasked_tiles)) or \
+				not(np.array_equal(self._number_chunk(*chunk)[unmasked_tiles],
+				other._number_chunk(*chunk)[unmasked_tiles])):
+
+				return False
+
+		return True
+
+	def __hash__(self):
+		return self._visible_hash
+
+	def tile_at(self, i, j):
+		"""
+		Get tile at a position. The returned value is either Tile.MASKED, Tile.WALL, Tile.BOMB or the number of
+		adjacent bombs.
+		In this last case, the tile is a Tile.EMPTY.
+
+		:i: The index of the row of the position.
+		:j: The index of the column of the position.
+		:return: Tile.MASKED if the tile is masked, Tile.WALL if the tile contains a wall,
+			Tile.BOMB if the tile contains a bomb, the number of adjacent bombs otherwise.
+		"""
+
+		if not self.within_boundaries(i, j, include_walls=True):
+			raise IndexError("Error: the position ({}, {}) is outside the grid!".format(i, j))
+
+		if self._is_masked(i, j):
+			if (i, j) in self._flag_tile_positions:
+				return MaskedTile.FLAG
+			return MaskedTile.MASKED
+
+		tile = self._tile_value(i, j)
+		if tile < 0:
+			return _TILES[tile]
+
+		return tile
+
+	def adjacent_tiles(self, i, j):
+		"""
+		Get a list of the adjacent tiles from a position. It does not contain the position outside the grid and
+		the position of tiles which contains a wall. It therefore contains positions of the empty and bomb tiles.
+
+		:i: The index of the row of the position.
+		:j: The index of the column of the position.
+		:return: A list of the adjacent tiles of the position.
+		"""
+
+		return [(i + o1, j + o2) for o1, o2 in ADJACENT_OFFSETS if self.within_boundaries((i + o1), (j + o2))]
+
+	def empty_region(self, i, j):
+		"""
+		Get the empty region containing a tile (see the 'empty_region' method of Grid). The empty region is explored on
+		each call, the empty regions of the whole grid are not labelled.
+
+		:i: The index of the row of the tile.
+		:j: The index of the column of the tile.
+		:return: The positions of the tiles of the empty region and the positions of the tiles of its border (two
+			tuples of positions), or None if the tile has adjacent bombs or contains a bomb or a wall.
+		"""
+
+		if not(self.within_boundaries(i, j)) or (self._tile_value(i, j) != 0):
+			return None
+
+		empty_tiles = [(i, j)]
+		empty_tile_set = {(i, j)}
+		border_tiles = set()
+
+		k = 0
+		while k < len(empty_tiles): # Breadth-first search of the empty region.
+			for adj_pos in self.adjacent_tiles(*empty_tiles[k]):
+				if self._tile_value(*adj_pos) != 0:
+					border_tiles.add(adj_pos)
+				elif adj_pos not in empty_tile_set:
+					empty_tile_set.add(adj_pos)
+					empty_tiles.append(adj_pos)
+			k += 1
+
+		return (tuple(empty_tiles), tuple(sorted(border_tiles)))
+
+	def explored_bounds(self, margin=0):
+		"""
+		Get the bounds of the explored part of the grid, that is the smallest rectangle containing the chunks with
+		unmasked tiles, enlarged by 'margin' tiles on each side (and limited to the grid). If no tile is unmasked, then
+		the explored part is the top left corner of the grid.
+
+		:margin: The number of tiles to add on each side.
+		:return: The index of the first row, the index of the row after the last row, the index of the first column and
+			the index of the column after the last column of the explored part.
+		"""
+
+		chunk_size = self._chunk_size
+		chunks = [chunk for chunk, unmasked_tiles in self._unmasked_chunks.items() if unmasked_tiles.any()]
+		if chunks:
+			chunk_rows, chunk_columns = zip(*chunks)
+			min_i, max_i = min(chunk_rows) * chunk_size, (max(chunk_rows) + 1) * chunk_size
+			min_j, max_j = min(chunk_columns) * chunk_size, (max(chunk_columns) + 1) * chunk_size
+		else:
+			min_i, max_i = self.top_wall, self.top_wall + 1
+			min_j, max_j = self.left_wall, self.left_wall + 1
+
+		return (max(0, (min_i - margin)), min(self.num_rows, (max_i + margin)), max(0, (min_j - margin)),
+			min(self.num_columns, (max_j + margin)))
+
+	def random_masked_tile_position(self, rng=None):
+		"""
+		Get the position of a random masked tile. Random positions are drawn until a masked tile is found, so that the
+		masked tiles are not listed (see the 'masked_tile_positions' property), unless most of the tiles are unmasked.
+
+		:rng: The random number generator (a random.Random object). If None, then the 'random' module is used.
+		:return: The position of a random masked tile.
+		"""
+
+		if self.num_masked_tiles > (self.num_tiles // 2):
+			randrange = get_rng(rng).randrange
+			while True:
+				i = randrange(self.top_wall, (self.num_rows - self.bottom_wall))
+				j = randrange(self.left_wall, (self.num_columns - self.right_wall))
+				if self._is_masked(i, j):
+					return (i, j)
+
+		return super().random_masked_tile_position(rng)
+
+	def unmask_tile(self, i, j):
+		"""
+		Unmask on a tile and all the empty tiles around.
+
+		:i: The index of the row of the tile.
+		:j: The index of the column of the tile.
+		:return: A set of the position of unmasked tiles.
+		"""
+
+		unmasked_tiles = set()
+		tile = self._tile_value(i, j)
+
+		was_unmasked = self._unmask_tile(i, j)
+		if not was_unmasked:
+			if (i, j) in self._flag_tile_positions:
+				raise ValueError("Error: the tile (at {}, {}) contains a flag!".format(i, j))
+
+			raise ValueError("Error: the tile (at {}, {}) is already unmasked or is a wall!".format(i, j))
+
+		unmasked_tiles.add((i, j))
+
+		if tile != 0: # If 'tile' has adjacent bombs or contains a bomb.
+			return unmasked_tiles
+
+		# Explore and unmask the empty tiles around 'tile' (some flags or unmasked tiles stop the exploration).
+		tiles_to_explore = set(self.adjacent_tiles(i, j))
+		while tiles_to_explore: # While 'tiles_to_explore' contains positions.
+			i_temp, j_temp = tiles_to_explore.pop()
+			tile_temp = self._tile_value(i_temp, j_temp)
+
+			was_unmasked = self._unmask_tile(i_temp, j_temp)
+			unmasked_tiles.add((i_temp, j_temp))
+			if was_unmasked and (tile_temp == 0):
+				tiles_to_explore.update(self.adjacent_tiles(i_temp, j_temp))
+
+		return unmasked_tiles
+
+	def unmask_all_tiles(self):
+		"""
+		Unmask all tiles. The 'num_masked_tiles' counter is equal to 0 after calling this function.
+		"""
+
+		self.remove_all_flags()
+
+		chunk_size = self._chunk_size
+		num_chunk_rows = -(-self.num_rows // chunk_size)
+		num_chunk_columns = -(-self.num_columns // chunk_size)
+		for ci in range(num_chunk_rows):
+			for cj in range(num_chunk_columns):
+				# Indices of the masked tiles of the chunk.
+				not_walls = ~self._walls_of_chunk(ci, cj)
+				masked_tiles = not_walls & ~self._unmasked_chunks.get((ci, cj), False)
+				i, j = np.nonzero(masked_tiles)
+
+				tiles = self._number_chunk(ci, cj)[i, j]
+				indices = (((ci * chunk_size) + i) * self.num_columns) + (cj * chunk_size) + j
+				self._visible_hash ^= self._zobrist_table.keys_change(indices, MASKED_VALUE, tiles)
+
+				self._unmasked_chunks[(ci, cj)] = not_walls # The walls are never masked (nor unmasked).
+
+		self._num_unmasked_tiles = self.num_tiles
+
+	def _mask_state(self):
+		"""
+		Get the state of the mask (the attributes that change when tiles are unmasked and when flags are inserted or
+		removed). The attributes are not copied.
+
+		:return: The state of the mask (a tuple).
+		"""
+
+		return (self._unmasked_chunks, self._num_unmasked_tiles, self._flag_tile_positions, self._visible_hash)
+
+	def _set_mask_state(self, mask_state):
+		"""
+		Set the state of the mask (see the '_mask_state' method). The attributes are not copied.
+
+		:mask_state: The state of the mask.
+		"""
+
+		(self._unmasked_chunks, self._num_unmasked_tiles, self._flag_tile_positions, self._visible_hash) = mask_state
+
+	def _copy_mask_state(self, mask_state):
+		"""
+		Copy a state of the mask (see the '_mask_state' method).
+
+		:mask_state: The state of the mask.
+		:return: The copy of the state of the mask.
+		"""
+
+		unmasked_chunks, num_unmasked_tiles, flag_tile_positions, visible_hash = mask_state
+		unmasked_chunks = {chunk: unmasked_tiles.copy() for chunk, unmasked_tiles in unmasked_chunks.items()}
+
+		return (unmasked_chunks, num_unmasked_tiles, set(flag_tile_positions), visible_hash)
+
+	def _initial_visible_hash(self):
+		"""
+		Compute the Zobrist hash of the initial grid with mask (all tiles are masked except the walls).
+
+		:return: The Zobrist hash of the initial grid with mask (0, see MaskedGrid).
+		"""
+
+		return 0
+
+	def _count_masked_tiles_without_flag(self, position_list):
+		"""
+		Count the number of tiles that are masked and that do not contain a flag among a list of positions.
+
+		:position_list: The list of positions.
+		:return: The number of tiles that are masked and that do not contain a flag.
+		"""
+
+		return sum(
+			1 for i, j in position_list
+			if self._is_masked(i, j) and ((i, j) not in self._flag_tile_positions)
+		)
+
+	def _unmask_tile(self, i, j):
+		"""
+		Unmask one tile at position 'i' and 'j'. It reveals the tile in this position and decrements by one the
+		variable 'num_masked_tiles'.
+		The tile at this position must be masked and it does must not contain a flag. If it is not, then this function
+		returns False.
+
+		:i: The index of the row of the tile.
+		:j: The index of the column of the tile.
+		:return: True if the tile was unmasked, False otherwise.
+		"""
+
+		if not(self.within_boundaries(i, j)) or ((i, j) in self._flag_tile_positions):
+			return False
+
+		(ci, i_chunk), (cj, j_chunk) = divmod(i, self._chunk_size), divmod(j, self._chunk_size)
+		unmasked_tiles = self._unmasked_chunks.get((ci, cj))
+		if unmasked_tiles is None:
+			unmasked_tiles = np.zeros((self._chunk_size, self._chunk_size), dtype=bool)
+			self._unmasked_chunks[(ci, cj)] = unmasked_tiles
+		elif unmasked_tiles[i_chunk, j_chunk]:
+			return False
+
+		unmasked_tiles[i_chunk, j_chunk] = True
+		self._num_unmasked_tiles += 1
+		self._visible_hash ^= self._zobrist_table.key_change((i * self.num_columns) + j, MASKED_VALUE,
+			self._tile_value(i, j))
+
+		return True
+
+	def _is_masked(self, i, j):
+		"""
+		Test if a tile is masked (the walls are never masked).
+
+		:i: The index of the row of the tile.
+		:j: The index of the column of the tile.
+		:return: True if the tile is masked, False otherwise.
+		"""
+
+		if not self.within_boundaries(i, j):
+			return False
+
+		unmasked_tiles = self._unmasked_chunks.get((i // self._chunk_size, j // self._chunk_size))
+
+		return (unmasked_tiles is None) or not(unmasked_tiles[(i % self._chunk_size), (j % self._chunk_size)])
+
+	def _tile_value(self, i, j):
+		"""
+		Get the value of a tile of the grid of numbers (a plain integer, see the 'tile_at' method).
+
+		:i: The index of the row of the position.
+		:j: The index of the column of the position.
+		:return: WALL_VALUE if the tile contains a wall (or if it is outside the grid), BOMB_VALUE if the tile contains a
+			bomb, the number of adjacent bombs otherwise.
+		"""
+
+		if not self.within_boundaries(i, j):
+			return WALL_VALUE # The chunks of the walls and outside the grid are not read.
+
+		chunk_size = self._chunk_size
+
+		return int(self._number_chunk((i // chunk_size), (j // chunk_size))[(i % chunk_size), (j % chunk_size)])
+
+	def _tile_values(self):
+		"""
+		Get the values of the tiles of the grid of numbers, row by row.
+
+		:return: The values of the tiles (a list).
+		"""
+
+		return [self._tile_value(i, j) for i in range(self.num_rows) for j in range(self.num_columns)]
+
+	def _number_chunk(self, ci, cj):
+		"""
+		Get the grid of numbers of a chunk. It is computed when it is read and it is not in cache: the numbers of
+		adjacent bombs are computed from the bombs of the chunk and of its adjacent chunks.
+
+		:ci: The index of the row of the chunk.
+		:cj: The index of the column of the chunk.
+		:return: The grid of numbers of the chunk (a NumPy array of int8). The tiles outside the grid are walls.
+		"""
+
+		number_chunks = self._number_chunks
+		number_chunk = number_chunks.get((ci, cj))
+		if number_chunk is not None:
+			number_chunks.move_to_end((ci, cj))
+
+			return number_chunk
+
+		chunk_size = self._chunk_size
+
+		# The bombs of the chunk are surrounded by a border of one tile, which contains the bombs of the adjacent chunks.
+		source_slices = {-1: slice((chunk_size - 1), chunk_size), 0: slice(0, chunk_size), 1: slice(0, 1)}
+		target_slices = {-1: slice(0, 1), 0: slice(1, (chunk_size + 1)), 1: slice((chunk_size + 1), (chunk_size + 2))}
+		bombs = np.zeros(((chunk_size + 2), (chunk_size + 2)), dtype=np.int8)
+		for o1, o2 in ADJACENT_OFFSETS + [(0, 0)]:
+			adjacent_bombs = self._bombs_of_chunk((ci + o1), (cj + o2))
+			if adjacent_bombs is not None:
+				bombs[target_slices[o1], target_slices[o2]] = adjacent_bombs[source_slices[o1], source_slices[o2]]
+
+		number_chunk = np.zeros((chunk_size, chunk_size), dtype=np.int8)
+		for o1, o2 in ADJACENT_OFFSETS:
+			number_chunk += bombs[(1 + o1):(1 + o1 + chunk_size), (1 + o2):(1 + o2 + chunk_size)]
+		number_chunk[bombs[1:-1, 1:-1] == 1] = BOMB_VALUE
+		number_chunk[self._walls_of_chunk(ci, cj)] = WALL_VALUE
+
+		number_chunks[(ci, cj)] = number_chunk
+		if len(number_chunks) > NUMBER_CHUNK_CACHE_SIZE:
+			number_chunks.popitem(last=False)
+
+		return number_chunk
+
+	def _bombs_of_chunk(self, ci, cj):
+		"""
+		Get the bombs of a chunk.
+
+		:ci: The index of the row of the chunk.
+		:cj: The index of the column of the chunk.
+		:return: The bombs of the chunk (a NumPy array of int8, 1 if the tile contains a bomb), or None if the chunk does
+			not contain bombs.
+		"""
+
+		return self._bomb_chunks.get((ci, cj))
+
+	def _walls_of_chunk(self, ci, cj):
+		"""
+		Get the walls of a chunk.
+
+		:ci: The index of the row of the chunk.
+		:cj: The index of the column of the chunk.
+		:return: The walls of the chunk (a NumPy array of booleans). The tiles outside the grid are walls.
+		"""
+
+		rows = np.arange(ci * self._chunk_size, (ci + 1) * self._chunk_size)
+		columns = np.arange(cj * self._chunk_size, (cj + 1) * self._chunk_size)
+		wall_rows = (rows < self.top_wall) | (rows >= (self.num_rows - self.bottom_wall))
+		wall_columns = (columns < self.left_wall) | (columns >= (self.num_columns - self.right_wall))
+
+		return wall_rows[:, np.newaxis] | wall_columns[np.newaxis, :]
+
+	def _insert_bomb_chunks(self, bomb_position_list):
+		"""
+		Insert the bombs in the chunks.
+
+		:bomb_position_list: A list of positions of bombs.
+		"""
+
+		self._num_bombs = 0
+		if not bomb_position_list:
+			return
+
+		bomb_rows, bomb_columns = np.array(bomb_position_list, dtype=np.int64).reshape(-1, 2).T
+		if np.any((bomb_rows < 0) | (bomb_rows >= self.num_rows) | (bomb_columns < 0) |
+			(bomb_columns >= self.num_columns)):
+
+			raise ValueError("Error: can not insert a bomb outside the grid!")
+
+		# Remove the duplicates (the flat indices of the bombs are sorted, so that the duplicates are consecutive).
+		bomb_indices = np.sort((bomb_rows * self.num_columns) + bomb_columns)
+		bomb_indices = bomb_indices[np.diff(bomb_indices, prepend=-1) != 0]
+		bomb_rows, bomb_columns = np.divmod(bomb_indices, self.num_columns)
+		self._num_bombs = len(bomb_rows)
+
+		on_walls = np.flatnonzero(
+			(bomb_rows < self.top_wall) | (bomb_rows >= (self.num_rows - self.bottom_wall)) |
+			(bomb_columns < self.left_wall) | (bomb_columns >= (self.num_columns - self.right_wall))
+		)
+		if on_walls.size > 0:
+			i, j = bomb_rows[on_walls[0]], bomb_columns[on_walls[0]]
+			raise ValueError("Error: can not insert a bomb (at {}, {}) on a wall!".format(i, j))
+
+		# The bombs are grouped by chunk (sorted by index of chunk), and each chunk is filled at once.
+		chunk_size = self._chunk_size
+		chunk_rows, bomb_rows = np.divmod(bomb_rows, chunk_size)
+		chunk_columns, bomb_columns = np.divmod(bomb_columns, chunk_size)
+		chunk_indices = (chunk_rows * (-(-self.num_columns // chunk_size))) + chunk_columns
+		order = np.argsort(chunk_indices, kind='stable')
+		chunk_starts = np.flatnonzero(np.diff(chunk_indices[order], prepend=-1))
+		for bomb_indices in np.split(order, chunk_starts[1:]):
+			bombs = np.zeros((chunk_size, chunk_size), dtype=np.int8)
+			bombs[bomb_rows[bomb_indices], bomb_columns[bomb_indices]] = 1
+			self._bomb_chunks[(int(chunk_rows[bomb_indices[0]]), int(chunk_columns[bomb_indices[0]]))] = bombs
+
+if __name__ == "__main__":
+	import random
+	import time
+
+	bomb_position_list = [(5, 4), (4, 2), (2, 1), (4, 4)]
+	g = ChunkedMaskedGrid(10, 5, bomb_position_list, 1, 0, 2, 3, chunk_size=4)
+	g.insert_flag(4, 2)
+	unmasked_tiles = g.unmask_tile(2, 4)
+	print("{}{}\n".format(g, unmasked_tiles))
+
+	masked_grid = MaskedGrid(10, 5, bomb_position_list, 1, 0, 2, 3)
+	masked_grid.insert_flag(4, 2)
+	masked_grid.unmask_tile(2, 4)
+	print(g == masked_grid)
+
+	print("\n\n\n")
+
+	start = time.time()
+	num_rows, num_columns, num_bombs = 5000, 5000, 3750000
+	bomb_indices = random.sample(range(num_rows * num_columns), num_bombs)
+	g = ChunkedMaskedGrid(num_rows, num_columns, [divmod(index, num_columns) for index in bomb_indices])
+	print("{} x {} grid created in {:.2f} seconds.".format(num_rows, num_columns, time.time() - start))
+
+	start = time.time()
+	for k in range(1000):
+		i, j = random.randrange(num_rows), random.randrange(num_columns)
+		if g.tile_at(i, j) is MaskedTile.MASKED:
+			g.unmask_tile(i, j)
+	print("{} masked tiles after 1000 moves ({:.2f} seconds).".format(g.num_masked_tiles, time.time() - start))
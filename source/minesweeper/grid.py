@@ -1,6 +1,7 @@
 from enum import IntEnum
+from functools import lru_cache
 import itertools
-import copy
+import numpy as np
 
 class Tile(IntEnum):
 	"""
@@ -33,11 +34,42 @@ class Tile(IntEnum):
 	def __hash__(self):
 		return hash(self.value)
 
+# Values of the bomb and wall tiles. The grids store and compare these plain integers instead of the Tile members
+# (comparing Tile members is slower, see 'Tile.__eq__'), and convert them to Tile members only when a tile is returned.
+BOMB_VALUE = Tile.BOMB.value
+WALL_VALUE = Tile.WALL.value
+
+_TILES = {BOMB_VALUE: Tile.BOMB, WALL_VALUE: Tile.WALL} # Tile members by value.
+
+# Offsets of the adjacent tiles of a tile.
+ADJACENT_OFFSETS = [(o1, o2) for o1, o2 in itertools.product([-1, 0, 1], repeat=2) if (o1, o2) != (0, 0)]
+
+# Smallest and greatest values of a tile (including the masked and flag tiles of the grids with mask, see MaskedTile).
+MIN_TILE_VALUE = -4
+MAX_TILE_VALUE = 8
+
+_NUM_TILE_VALUES = MAX_TILE_VALUE - MIN_TILE_VALUE + 1
+_MASK_64 = (2 ** 64) - 1
+
+# Maximal number of tables of neighbours and of Zobrist tables kept in cache (the tables of the least recently used grid
+# shapes are removed). The tables of the small grid shapes (at most 'SMALL_TABLE_MAX_TILES' tiles, for example the
+# subgrids, whose walls give many shapes) are small, so more of them are kept in a cache of their own.
+TABLE_CACHE_SIZE = 16
+SMALL_TABLE_CACHE_SIZE = 1024
+SMALL_TABLE_MAX_TILES = 256
+
+# Maximal number of tiles of the grid shapes whose table of neighbours also contains lists of Python integers (faster
+# to read than the NumPy arrays, but much larger, see NeighbourTable).
+_PYTHON_NEIGHBOUR_TABLE_MAX_TILES = 10000
+
 class Grid:
 	"""
 	Grid of a minesweeper game with walls.
 	"""
 
+	__slots__ = ('_num_rows', '_num_columns', '_bomb_position_list', '_left_wall', '_right_wall', '_top_wall',
+		'_bottom_wall', '_neighbour_table', '_grid', '_zobrist_table', '_hash', '_empty_regions', '_empty_region_labels')
+
 	def __init__(self, num_rows, num_columns, bomb_position_list, left_wall=0, right_wall=0,
 			top_wall=0, bottom_wall=0):
 		"""
@@ -52,17 +84,7 @@ class Grid:
 		:bottom_wall: The thickness of the bottom wall.
 		"""
 
-		num_bombs = len(bomb_position_list)
-		if num_bombs > (num_rows * num_columns):
-			raise ValueError("Error: the number of bombs ({}) can not be greater than 'num_rows' * 'num_columns' " \
-				"({} * {})!".format(num_bombs, num_rows, num_columns))
-
-		if (left_wall + right_wall) >= num_columns:
-			raise ValueError("Error: the sum the thickness of the left wall ({}) and the right wall ({}) can not be " \
-				"greater than or equal to the number of columns ({})!".format(left_wall, right_wall, num_columns))
-		if (top_wall + bottom_wall) >= num_rows:
-			raise ValueError("Error: the sum the thickness of the top wall ({}) and the bottom wall ({}) can not be " \
-				"greater than or equal to the number of rows ({})!".format(top_wall, bottom_wall, num_rows))
+		check_dimensions(num_rows, num_columns, len(bomb_position_list), left_wall, right_wall, top_wall, bottom_wall)
 
 		self._num_rows = num_rows
 		self._num_columns = num_columns
@@ -71,20 +93,32 @@ class Grid:
 		self._right_wall = right_wall
 		self._top_wall = top_wall
 		self._bottom_wall = bottom_wall
+		self._neighbour_table = get_neighbour_table(num_rows, num_columns, left_wall, right_wall, top_wall,
+			bottom_wall) # Shared by all grids of the same shape.
 
-		# '_grid' is a grid of numbers whose each tile contains the number of adjacent bombs or 'Tile.BOMB' if this
-		# tile contains a bomb or 'Tile.WALL' if this tile contains a wall.
-		self._grid = [[0 for j in range(self.num_columns)] for i in range(self.num_rows)]
+		# '_grid' is a grid of numbers whose each tile contains the number of adjacent bombs or 'BOMB_VALUE' if this
+		# tile contains a bomb or 'WALL_VALUE' if this tile contains a wall.
+		self._grid = self._create_grid()
 		self._insert_walls()
 		self._insert_bombs()
 
+		# '_hash' is the Zobrist hash of the grid of numbers (see ZobristTable). It is computed the first time it is
+		# needed (see the '_grid_hash' method).
+		self._zobrist_table = get_zobrist_table(num_rows, num_columns) # Shared by all grids of the same shape.
+		self._hash = None
+
+		# '_empty_regions' and '_empty_region_labels' are computed the first time the 'empty_region' method is called.
+		self._empty_regions = None
+		self._empty_region_labels = None
+
 	@property
 	def grid(self):
 		"""
-		Grid.
+		Grid (a read-only view of the grid, see GridView). The tiles are not copied. Use the 'copy_grid' method to get a
+		mutable copy.
 		"""
 
-		return copy.deepcopy(self._grid)
+		return GridView(self)
 	
 	@property
 	def num_rows(self):
@@ -182,17 +216,38 @@ class Grid:
 		return ''.join(str_grid)
 
 	def __eq__(self, other):
+		if self._grid_hash() != other._grid_hash():
+			return False
+
 		return self._grid == other._grid
 
 	def __hash__(self):
-		return hash(tuple(map(tuple, self._grid)))
+		return self._grid_hash()
 
 	def __iter__(self):
 		"""
 		Iterate on rows of the grid.
 		"""
 
-		return (row for row in self.grid)
+		return iter(self.grid)
+
+	def copy_grid(self):
+		"""
+		Copy the grid.
+
+		:return: A copy of the grid (a list of lists of tiles).
+		"""
+
+		return [list(row) for row in self.grid]
+
+	def tile_values(self):
+		"""
+		Get the values of the tiles of the grid of numbers, row by row (plain integers, see BOMB_VALUE and WALL_VALUE).
+
+		:return: The values of the tiles (a list of integers).
+		"""
+
+		return self._tile_values()
 
 	def tile_at(self, i, j):
 		"""
@@ -205,7 +260,11 @@ class Grid:
 			bombs otherwise.
 		"""
 
-		return self._grid[i][j]
+		tile = self._grid[i][j]
+		if tile < 0:
+			return _TILES[tile]
+
+		return tile
 
 	def within_boundaries(self, i, j, include_walls=False):
 		"""
@@ -240,13 +299,116 @@ class Grid:
 		:return: A list of the adjacent tiles of the position.
 		"""
 
-		adjacent_tile_list = list(itertools.product([-1, 0, 1], repeat=2))
-		adjacent_tile_list.remove((0, 0))
-		adjacent_tile_list = [(i + o1, j + o2) for o1, o2 in adjacent_tile_list]
+		if self.within_boundaries(i, j, include_walls=True):
+			return list(self._neighbour_table.positions[(i * self.num_columns) + j])
+
+		# The position is outside the grid (it is not in the table of neighbours).
+		adjacent_tile_list = [(i + o1, j + o2) for o1, o2 in ADJACENT_OFFSETS]
 		adjacent_tile_list = list(filter(lambda pos: self.within_boundaries(pos[0], pos[1]), adjacent_tile_list))
 
 		return adjacent_tile_list
 
+	def empty_region(self, i, j):
+		"""
+		Get the empty region containing a tile. An empty region is a maximal set of connected tiles which have no
+		adjacent bombs (the tiles whose value is 0). Its border is the set of the adjacent tiles of the empty region
+		which are not in the empty region (they have adjacent bombs).
+		The empty regions of the grid are labelled once, the first time this method is called.
+
+		:i: The index of the row of the tile.
+		:j: The index of the column of the tile.
+		:return: The positions of the tiles of the empty region and the positions of the tiles of its border (two
+			tuples of positions), or None if the tile has adjacent bombs or contains a bomb or a wall.
+		"""
+
+		if self._empty_regions is None:
+			self._label_empty_regions()
+
+		label = self._empty_region_labels[(i * self.num_columns) + j]
+		if label < 0:
+			return None
+
+		return self._empty_regions[label]
+
+	def _label_empty_regions(self):
+		"""
+		Label the empty regions of the grid and compute their border (see the 'empty_region' method).
+		"""
+
+		tiles = self._tile_values()
+		adjacent_indices = self._neighbour_table.index_lists
+		to_position = lambda index: divmod(index, self.num_columns)
+
+		# 'labels' contains, for each tile, the index of its empty region in 'regions' (-1 if the tile is not in an
+		# empty region).
+		labels = [-1] * len(tiles)
+		regions = []
+		for start_index, tile in enumerate(tiles):
+			if (tile != 0) or (labels[start_index] >= 0):
+				continue
+
+			label = len(regions)
+			labels[start_index] = label
+			empty_indices = [start_index]
+			border_indices = set()
+
+			k = 0
+			while k < len(empty_indices): # Breadth-first search of the empty region.
+				for adj_index in adjacent_indices[empty_indices[k]]:
+					if tiles[adj_index] != 0:
+						border_indices.add(adj_index)
+					elif labels[adj_index] < 0:
+						labels[adj_index] = label
+						empty_indices.append(adj_index)
+				k += 1
+
+			regions.append((tuple(map(to_position, empty_indices)), tuple(map(to_position, sorted(border_indices)))))
+
+		self._empty_regions = regions
+		self._empty_region_labels = labels
+
+	def _tile_value(self, i, j):
+		"""
+		Get the value of a tile of the grid of numbers (a plain integer, see the 'tile_at' method).
+
+		:i: The index of the row of the position.
+		:j: The index of the column of the position.
+		:return: WALL_VALUE if the tile contains a wall, BOMB_VALUE if the tile contains a bomb, the number of adjacent
+			bombs otherwise.
+		"""
+
+		return self._grid[i][j]
+
+	def _tile_values(self):
+		"""
+		Get the values of the tiles of the grid of numbers, row by row.
+
+		:return: The values of the tiles (a list).
+		"""
+
+		return [tile for row in self._grid for tile in row]
+
+	def _grid_hash(self):
+		"""
+		Get the Zobrist hash of the grid of numbers. It is computed the first time this method is called.
+
+		:return: The Zobrist hash of the grid of numbers.
+		"""
+
+		if self._hash is None:
+			self._hash = self._zobrist_table.hash_values(self._tile_values())
+
+		return self._hash
+
+	def _create_grid(self):
+		"""
+		Create the grid of numbers without walls and bombs (all tiles are empty and have no adjacent bombs).
+
+		:return: The grid of numbers (a list of lists of tiles).
+		"""
+
+		return [[0 for j in range(self.num_columns)] for i in range(self.num_rows)]
+
 	def _insert_walls(self):
 		"""
 		Insert the walls in the grid of numbers.
@@ -258,57 +420,408 @@ class Grid:
 		# Left wall.
 		for j in range(self.left_wall):
 			for i in range(self.num_rows):
-				self._grid[i][j] = Tile.WALL
+				self._grid[i][j] = WALL_VALUE
 
 		# Right wall.
 		for j in range(self.num_columns - self.right_wall, self.num_columns):
 			for i in range(self.num_rows):
-				self._grid[i][j] = Tile.WALL
+				self._grid[i][j] = WALL_VALUE
 
 		# Top wall.
 		for i in range(self.top_wall):
 			for j in range(self.num_columns):
-				self._grid[i][j] = Tile.WALL
+				self._grid[i][j] = WALL_VALUE
 
 		# Bottom wall.
 		for i in range(self.num_rows - self.bottom_wall, self.num_rows):
 			for j in range(self.num_columns):
-				self._grid[i][j] = Tile.WALL
+				self._grid[i][j] = WALL_VALUE
 	
 	def _insert_bombs(self):
 		"""
-		Insert the bombs and compute the numbers of adjacent bombs in the grid of numbers.
+		Insert the bombs and compute the numbers of adjacent bombs in the grid of numbers. The numbers of adjacent bombs
+		of all tiles are computed in one pass (see the 'compute_num_adjacent_bombs' function).
 		"""
 
-		for i, j in self.bomb_position_list:
-
-			if self._grid[i][j] == Tile.WALL:
+		for i, j in self._bomb_position_list:
+			if self._grid[i][j] == WALL_VALUE:
 				raise ValueError("Error: can not insert a bomb (at {}, {}) on a wall!".format(i, j))
 
-			self._grid[i][j] = Tile.BOMB
-			adjacent_tile_list = self.adjacent_tiles(i, j)
-			is_empty_tile = lambda adj_pos: self._grid[adj_pos[0]][adj_pos[1]] == Tile.EMPTY
-			# Remove the tiles containing a bomb. 'adjacent_tile_list' therefore contains the adjacent empty tiles.
-			for adj_tile in filter(is_empty_tile, adjacent_tile_list):
-				self._increment_adjacent_bomb(adj_tile[0], adj_tile[1])
+		num_adjacent_bombs = compute_num_adjacent_bombs(self.num_rows, self.num_columns,
+			self._bomb_position_list).tolist()
+		for i, j in self._bomb_position_list:
+			num_adjacent_bombs[i][j] = BOMB_VALUE
+
+		# Copy the numbers of adjacent bombs of the tiles that are not walls.
+		min_column_index = self.left_wall
+		max_column_index = self.num_columns - self.right_wall
+		for i in range(self.top_wall, (self.num_rows - self.bottom_wall)):
+			self._grid[i][min_column_index:max_column_index] = \
+				num_adjacent_bombs[i][min_column_index:max_column_index]
 
-	def _increment_adjacent_bomb(self, i, j, n=1):
+class NeighbourTable:
+	"""
+	Table of the adjacent tiles of each tile of a grid shape (a number of rows, a number of columns and thicknesses of
+	walls). As in the 'adjacent_tiles' method of Grid, the adjacent tiles do not contain the walls.
+	The tiles are identified by their flat index, that is (i * 'num_columns') + j for the position (i, j).
+	For the small grid shapes (at most '_PYTHON_NEIGHBOUR_TABLE_MAX_TILES' tiles), 'index_lists' and 'positions' are
+	lists of Python integers and tuples computed once. For the larger ones, they are views reading the NumPy arrays,
+	since the Python lists would take about a kilobyte per tile.
+	"""
+
+	__slots__ = ('indices', 'counts', 'index_lists', 'positions')
+
+	def __init__(self, num_rows, num_columns, left_wall=0, right_wall=0, top_wall=0, bottom_wall=0):
 		"""
-		Increment by 'n' the number of adjacent bombs of a position. The tile of this position must be an empty tile.
+		Compute the table of neighbours of a grid shape.
 
-		:i: The index of the row of the position.
-		:j: The index of the column of the position.
-		:n: The number of adjacent bombs to add (increment).
+		:num_rows: The number of rows of the grid.
+		:num_columns: The number of columns of the grid.
+		:left_wall: The thickness of the left wall.
+		:right_wall: The thickness of the right wall.
+		:top_wall: The thickness of the top wall.
+		:bottom_wall: The thickness of the bottom wall.
 		"""
 
-		num_tile = self._grid[i][j]
-		assert num_tile == Tile.EMPTY, "Error: only empty tiles (that does not contain a bomb or a wall) can be " \
-			"incremented!"
+		num_tiles = num_rows * num_columns
+		row_indices, column_indices = np.divmod(np.arange(num_tiles), num_columns)
+
+		# 'indices' contains, for each tile, the flat indices of its adjacent tiles (padded with -1) and 'counts'
+		# contains, for each tile, its number of adjacent tiles.
+		self.indices = np.full((num_tiles, len(ADJACENT_OFFSETS)), -1, dtype=np.int32)
+		self.counts = np.zeros(num_tiles, dtype=np.int32)
+		for o1, o2 in ADJACENT_OFFSETS:
+			adj_row_indices = row_indices + o1
+			adj_column_indices = column_indices + o2
+			within_boundaries = ((top_wall <= adj_row_indices) & (adj_row_indices < (num_rows - bottom_wall)) &
+				(left_wall <= adj_column_indices) & (adj_column_indices < (num_columns - right_wall)))
+
+			tile_indices = np.flatnonzero(within_boundaries)
+			self.indices[tile_indices, self.counts[tile_indices]] = ((adj_row_indices[tile_indices] * num_columns) +
+				adj_column_indices[tile_indices])
+			self.counts[tile_indices] += 1
+
+		# 'index_lists' contains, for each tile, a list of the flat indices of its adjacent tiles and 'positions'
+		# contains, for each tile, a tuple of the positions of its adjacent tiles.
+		if num_tiles <= _PYTHON_NEIGHBOUR_TABLE_MAX_TILES:
+			self.index_lists = [
+				adj_indices[:count] for adj_indices, count in zip(self.indices.tolist(), self.counts.tolist())
+			]
+			self.positions = [
+				tuple(divmod(index, num_columns) for index in adj_indices) for adj_indices in self.index_lists
+			]
+		else:
+			self.index_lists = _AdjacentIndexView(self.indices, self.counts)
+			self.positions = _AdjacentPositionView(self.index_lists, num_columns)
+
+class _AdjacentIndexView:
+	"""
+	Read-only view of the adjacent tiles of a table of neighbours (see NeighbourTable): the list of the flat indices of
+	the adjacent tiles of a tile is read from the NumPy arrays when it is accessed.
+	"""
+
+	__slots__ = ('_indices', '_counts')
+
+	def __init__(self, indices, counts):
+		self._indices = indices
+		self._counts = counts
+
+	def __len__(self):
+		return len(self._counts)
+
+	def __getitem__(self, index):
+		return self._indices[index, :self._counts[index]].tolist()
+
+class _AdjacentPositionView:
+	"""
+	Read-only view of the positions of the adjacent tiles of a table of neighbours (see NeighbourTable).
+	"""
+
+	__slots__ = ('_index_lists', '_num_columns')
+
+	def __init__(self, index_lists, num_columns):
+		self._index_lists = index_lists
+		self._num_columns = num_columns
+
+	def __len__(self):
+		return len(self._index_lists)
+
+	def __getitem__(self, index):
+		return tuple(divmod(adj_index, self._num_columns) for adj_index in self._index_lists[index])
+
+def get_neighbour_table(num_rows, num_columns, left_wall=0, right_wall=0, top_wall=0, bottom_wall=0):
+	"""
+	Get the table of neighbours of a grid shape. The table is computed once per shape and then shared by all grids of
+	this shape (the tables of the 'TABLE_CACHE_SIZE' most recently used shapes are kept, and those of the
+	'SMALL_TABLE_CACHE_SIZE' most recently used small shapes).
+
+	:num_rows: The number of rows of the grid.
+	:num_columns: The number of columns of the grid.
+	:left_wall: The thickness of the left wall.
+	:right_wall: The thickness of the right wall.
+	:top_wall: The thickness of the top wall.
+	:bottom_wall: The thickness of the bottom wall.
+	:return: The table of neighbours (a NeighbourTable object).
+	"""
+
+	if (num_rows * num_columns) <= SMALL_TABLE_MAX_TILES:
+		return _get_small_neighbour_table(num_rows, num_columns, left_wall, right_wall, top_wall, bottom_wall)
+
+	return _get_large_neighbour_table(num_rows, num_columns, left_wall, right_wall, top_wall, bottom_wall)
+
+@lru_cache(maxsize=SMALL_TABLE_CACHE_SIZE)
+def _get_small_neighbour_table(num_rows, num_columns, left_wall, right_wall, top_wall, bottom_wall):
+	"""
+	Get the table of neighbours of a small grid shape (see the 'get_neighbour_table' function).
+	"""
+
+	return NeighbourTable(num_rows, num_columns, left_wall, right_wall, top_wall, bottom_wall)
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _get_large_neighbour_table(num_rows, num_columns, left_wall, right_wall, top_wall, bottom_wall):
+	"""
+	Get the table of neighbours of a large grid shape (see the 'get_neighbour_table' function).
+	"""
+
+	return NeighbourTable(num_rows, num_columns, left_wall, right_wall, top_wall, bottom_wall)
+
+class ZobristTable:
+	"""
+	Zobrist keys of a grid shape (a number of rows and a number of columns). There is a 64-bit key for each tile and
+	each value of tile. The Zobrist hash of a grid is the exclusive or (XOR) of the keys of its tiles (with their value),
+	so that it can be updated in constant time when the value of a tile changes.
+	The key of a tile and a value of tile is computed on demand by mixing the flat index of the tile and the value (see
+	the '_zobrist_key' function) instead of being drawn at random and stored, so that the table takes a constant memory
+	whatever the size of the grid. The keys only depend on the tiles and their values, so that equal grids have equal
+	hashes.
+	"""
+
+	__slots__ = ('_num_tiles',)
+
+	def __init__(self, num_rows, num_columns):
+		"""
+		Create the Zobrist keys of a grid shape.
+
+		:num_rows: The number of rows of the grid.
+		:num_columns: The number of columns of the grid.
+		"""
+
+		self._num_tiles = num_rows * num_columns
+
+	def hash_values(self, tile_values):
+		"""
+		Compute the Zobrist hash of the values of the tiles of a grid.
+
+		:tile_values: The values of the tiles, row by row (an iterable of integers).
+		:return: The Zobrist hash.
+		"""
+
+		return self.hash_arrays(np.fromiter(tile_values, dtype=np.int64, count=self._num_tiles)[np.newaxis])[0]
+
+	def key_change(self, index, old_tile, new_tile):
+		"""
+		Get the value to XOR with a Zobrist hash when the value of a tile changes.
+
+		:index: The flat index of the tile, that is (i * 'num_columns') + j for the position (i, j).
+		:old_tile: The old value of the tile.
+		:new_tile: The new value of the tile.
+		:return: The value to XOR with the Zobrist hash.
+		"""
+
+		code = index * _NUM_TILE_VALUES
+
+		return _zobrist_key(code + (old_tile - MIN_TILE_VALUE)) ^ _zobrist_key(code + (new_tile - MIN_TILE_VALUE))
+
+	def keys_change(self, indices, old_tile, new_tiles):
+		"""
+		Get the value to XOR with a Zobrist hash when the values of many tiles change.
+
+		:indices: The flat indices of the tiles (a NumPy array).
+		:old_tile: The old value of the tiles.
+		:new_tiles: The new values of the tiles (a NumPy array).
+		:return: The value to XOR with the Zobrist hash.
+		"""
+
+		if len(indices) == 0:
+			return 0
+
+		codes = np.asarray(indices, dtype=np.uint64) * np.uint64(_NUM_TILE_VALUES)
+		old_keys = _zobrist_key(codes + np.uint64(old_tile - MIN_TILE_VALUE))
+		new_keys = _zobrist_key(codes + (np.asarray(new_tiles, dtype=np.int64) - MIN_TILE_VALUE).astype(np.uint64))
+
+		return int(np.bitwise_xor.reduce(old_keys ^ new_keys))
+
+	def hash_arrays(self, tile_arrays, block_size=(2 ** 20)):
+		"""
+		Compute the Zobrist hashes of many grids at once (see the 'hash_values' method).
+
+		:tile_arrays: The values of the tiles of the grids (a NumPy array of shape ('num_grids', 'num_rows',
+			'num_columns') or ('num_grids', 'num_tiles')).
+		:block_size: The number of tiles whose keys are computed at once (it bounds the memory used).
+		:return: The Zobrist hashes (a list of integers).
+		"""
+
+		tile_arrays = tile_arrays.reshape(len(tile_arrays), -1)
+		codes = np.arange(self._num_tiles, dtype=np.uint64) * np.uint64(_NUM_TILE_VALUES)
+		num_grids_per_block = max(1, (block_size // max(1, self._num_tiles)))
+
+		hashes = []
+		for start in range(0, len(tile_arrays), num_grids_per_block):
+			values = tile_arrays[start:(start + num_grids_per_block)].astype(np.int64) - MIN_TILE_VALUE
+			hashes.extend(np.bitwise_xor.reduce(_zobrist_key(codes + values.astype(np.uint64)), axis=1).tolist())
+
+		return hashes
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def get_zobrist_table(num_rows, num_columns):
+	"""
+	Get the Zobrist table of a grid shape. The table is created once per shape and then shared by all grids of this
+	shape (the tables of the 'TABLE_CACHE_SIZE' most recently used shapes are kept).
+
+	:num_rows: The number of rows of the grid.
+	:num_columns: The number of columns of the grid.
+	:return: The Zobrist table (a ZobristTable object).
+	"""
+
+	return ZobristTable(num_rows, num_columns)
+
+def _zobrist_key(code):
+	"""
+	Compute the Zobrist key of a tile and a value of tile with the SplitMix64 finalizer. This function works with Python
+	integers and with NumPy arrays of uint64.
+
+	:code: The code of the tile and of the value of the tile, that is ('index' * '_NUM_TILE_VALUES') + 'tile' -
+		'MIN_TILE_VALUE' where 'index' is the flat index of the tile and 'tile' is the value of the tile.
+	:return: The Zobrist key (a 64-bit integer).
+	"""
+
+	x = ((code + 1) * 0x9E3779B97F4A7C15) & _MASK_64
+	x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+	x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK_64
+
+	return x ^ (x >> 31)
+
+class GridView:
+	"""
+	Read-only view of a grid. It behaves like a list of lists of tiles, but it reads the tiles of the grid (with its
+	'tile_at' method) without copying them. The view therefore reflects the changes of the grid.
+	"""
+
+	__slots__ = ('_grid',)
+
+	def __init__(self, grid):
+		"""
+		Create a read-only view of a grid.
+
+		:grid: The grid (a Grid object).
+		"""
+
+		self._grid = grid
+
+	def __len__(self):
+		return self._grid.num_rows
+
+	def __getitem__(self, i):
+		if not (-self._grid.num_rows <= i < self._grid.num_rows):
+			raise IndexError("Error: the index of the row ({}) is out of range!".format(i))
+
+		return GridRowView(self._grid, (i % self._grid.num_rows))
+
+	def __iter__(self):
+		"""
+		Iterate on rows of the grid.
+		"""
+
+		return (GridRowView(self._grid, i) for i in range(self._grid.num_rows))
+
+class GridRowView:
+	"""
+	Read-only view of a row of a grid. It behaves like a list of tiles, but it reads the tiles of the grid (with its
+	'tile_at' method) without copying them.
+	"""
+
+	__slots__ = ('_grid', '_i')
+
+	def __init__(self, grid, i):
+		"""
+		Create a read-only view of a row of a grid.
+
+		:grid: The grid (a Grid object).
+		:i: The index of the row.
+		"""
+
+		self._grid = grid
+		self._i = i
+
+	def __len__(self):
+		return self._grid.num_columns
+
+	def __getitem__(self, j):
+		if not (-self._grid.num_columns <= j < self._grid.num_columns):
+			raise IndexError("Error: the index of the column ({}) is out of range!".format(j))
+
+		return self._grid.tile_at(self._i, (j % self._grid.num_columns))
+
+	def __iter__(self):
+		"""
+		Iterate on tiles of the row.
+		"""
+
+		tile_at = self._grid.tile_at
+		i = self._i
+
+		return (tile_at(i, j) for j in range(self._grid.num_columns))
+
+def compute_num_adjacent_bombs(num_rows, num_columns, bomb_position_list):
+	"""
+	Compute the number of adjacent bombs of each tile of a grid. This function computes all numbers in one pass: it sums
+	the eight shifted copies of the mask of bombs (the positions of bombs).
+	The walls are not handled by this function: since the walls can not contain bombs, the numbers of the tiles that
+	are not walls are correct and the numbers of the walls must be ignored.
+
+	:num_rows: The number of rows of the grid.
+	:num_columns: The number of columns of the grid.
+	:bomb_position_list: A list of positions of bombs (without duplicates).
+	:return: The number of adjacent bombs of each tile (a NumPy array of int8). The tiles containing a bomb also have a
+		number of adjacent bombs.
+	"""
+
+	# The mask of bombs is surrounded by a border of one tile so that the shifted copies have the size of the grid.
+	bomb_mask = np.zeros(((num_rows + 2), (num_columns + 2)), dtype=np.int8)
+	if bomb_position_list:
+		bomb_rows, bomb_columns = zip(*bomb_position_list)
+		bomb_mask[(np.array(bomb_rows) + 1), (np.array(bomb_columns) + 1)] = 1
+
+	num_adjacent_bombs = np.zeros((num_rows, num_columns), dtype=np.int8)
+	for o1, o2 in itertools.product([0, 1, 2], repeat=2):
+		if (o1, o2) != (1, 1):
+			num_adjacent_bombs += bomb_mask[o1:(o1 + num_rows), o2:(o2 + num_columns)]
+
+	return num_adjacent_bombs
+
+def check_dimensions(num_rows, num_columns, num_bombs, left_wall=0, right_wall=0, top_wall=0, bottom_wall=0):
+	"""
+	Check the dimensions of a grid. This function raises a ValueError if they are not valid.
+
+	:num_rows: The number of rows of the grid.
+	:num_columns: The number of columns of the grid.
+	:num_bombs: The number of bombs of the grid.
+	:left_wall: The thickness of the left wall.
+	:right_wall: The thickness of the right wall.
+	:top_wall: The thickness of the top wall.
+	:bottom_wall: The thickness of the bottom wall.
+	"""
 
-		new_value = num_tile + n
-		assert 0 <= new_value <= 8, "Error: the number of adjacent bombs can not be greater than 8!"
+	if num_bombs > (num_rows * num_columns):
+		raise ValueError("Error: the number of bombs ({}) can not be greater than 'num_rows' * 'num_columns' " \
+			"({} * {})!".format(num_bombs, num_rows, num_columns))
 
-		self._grid[i][j] = new_value
+	if (left_wall + right_wall) >= num_columns:
+		raise ValueError("Error: the sum the thickness of the left wall ({}) and the right wall ({}) can not be " \
+			"greater than or equal to the number of columns ({})!".format(left_wall, right_wall, num_columns))
+	if (top_wall + bottom_wall) >= num_rows:
+		raise ValueError("Error: the sum the thickness of the top wall ({}) and the bottom wall ({}) can not be " \
+			"greater than or equal to the number of rows ({})!".format(top_wall, bottom_wall, num_rows))
 
 def get_positions(num_rows, num_columns, left_wall=0, right_wall=0, top_wall=0, bottom_wall=0):
 	"""
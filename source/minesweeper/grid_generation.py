@@ -1,25 +1,78 @@
-from minesweeper.grid import Grid, get_positions
+from minesweeper.grid import Grid, BOMB_VALUE, WALL_VALUE, ADJACENT_OFFSETS, get_positions
 from minesweeper.masked_grid import MaskedGrid
+from minesweeper.array_grid import MaskedGridBatch
+from minesweeper.random_streams import get_rng
 
-import random
-import numpy.random
+import numpy as np
 
-def generate_masked_grid(num_rows, num_columns, num_bombs):
+def generate_masked_grid(num_rows, num_columns, num_bombs, grid_class=MaskedGrid, rng=None, safe_position=None,
+	safe_radius=0):
 	"""
-	Generate a random grid with mask. This function inserts 'num_bombs' at random positions.
+	Generate a random grid with mask. This function inserts 'num_bombs' at random positions. If 'safe_position' is not
+	None, then the bombs are not inserted around this position (for example the first played tile), so that the first
+	turn can not be lost without generating grids until it is not.
 
 	:num_rows: The number of rows of the grid.
 	:num_columns: The number of columns of the grid.
 	:num_bombs: The number of bombs.
+	:grid_class: The class of the grid with mask to create (MaskedGrid or a subclass, for example ArrayMaskedGrid to
+		store the grid in NumPy arrays).
+	:rng: The random number generator (a random.Random object). If None, then the 'random' module is used.
+	:safe_position: The position (a tuple (i, j)) around which there is no bomb, or None.
+	:safe_radius: The radius of the safe tiles around 'safe_position'. With a radius of 0, only the tile at
+		'safe_position' is safe, and with a radius of 1, the 3 by 3 tiles centered on it are safe.
 	:return: A random grid with mask.
 	"""
 
-	pos_list = get_positions(num_rows, num_columns)
-	bomb_position_list = random.sample(pos_list, num_bombs)
+	safe_indices = []
+	if safe_position is not None:
+		i, j = safe_position
+		safe_indices = [
+			(i_safe * num_columns) + j_safe
+			for i_safe in range(max(0, (i - safe_radius)), min(num_rows, (i + safe_radius + 1)))
+			for j_safe in range(max(0, (j - safe_radius)), min(num_columns, (j + safe_radius + 1)))
+		]
+
+	num_available_tiles = (num_rows * num_columns) - len(safe_indices)
+	if not(0 <= num_bombs <= num_available_tiles):
+		raise ValueError("Error: the number of bombs ({}) must be between 0 and the number of tiles that can contain a "
+			"bomb ({})!".format(num_bombs, num_available_tiles))
+
+	# Sampling the flat indices of the tiles (a range) instead of the list of positions avoids allocating all the
+	# positions of large grids, and selects the same positions.
+	bomb_indices = get_rng(rng).sample(range(num_available_tiles), num_bombs)
+	if safe_indices:
+		# The indices are sampled among the tiles that are not safe, so they are shifted after each (sorted) safe index.
+		bomb_indices = [_skip_indices(index, safe_indices) for index in bomb_indices]
+	bomb_position_list = [divmod(index, num_columns) for index in bomb_indices]
+
+	return grid_class(num_rows, num_columns, bomb_position_list)
+
+def generate_masked_grids(num_grids, num_rows, num_columns, num_bombs, rng=None):
+	"""
+	Generate many random grids with mask at once. Each grid has 'num_bombs' bombs at random positions. The bombs of all
+	grids are drawn in one call and the numbers of adjacent bombs are computed for all grids at once, in a stacked NumPy
+	array.
+
+	:num_grids: The number of grids.
+	:num_rows: The number of rows of the grids.
+	:num_columns: The number of columns of the grids.
+	:num_bombs: The number of bombs of each grid.
+	:rng: The random number generator (a NumPy Generator). If None, then the 'numpy.random' module is used.
+	:return: The grids with mask (a MaskedGridBatch object, whose grids are ArrayMaskedGrid objects created when they
+		are read).
+	"""
+
+	if not(0 <= num_bombs <= (num_rows * num_columns)):
+		raise ValueError("Error: the number of bombs ({}) must be between 0 and the number of tiles ({})!".format(
+			num_bombs, (num_rows * num_columns)))
 
-	return MaskedGrid(num_rows, num_columns, bomb_position_list)
+	bombs = generate_bombs(num_grids, num_rows, num_columns, num_bombs, rng)
+	tiles = np.where(bombs, np.int8(BOMB_VALUE), count_adjacent(bombs)).astype(np.int8, copy=False)
 
-def generate_subgrid(subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid, num_bombs_grid):
+	return MaskedGridBatch(tiles)
+
+def generate_subgrid(subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid, num_bombs_grid, rng=None):
 	"""
 	Generate a random subgrid. This function generates a "good" number of bombs and the "good" thickness of walls
 	("good" for realistic).
@@ -30,9 +83,12 @@ def generate_subgrid(subgrid_radius, bomb_middle_tile, num_rows_grid, num_column
 	:num_rows_grid: The number of rows of the original grid.
 	:num_columns_grid: The number of columns of the original grid.
 	:num_bombs_grid: The number of bombs of the original grid.
+	:rng: The random number generator (a random.Random object). If None, then the 'random' module is used.
 	:return: A random subgrid.
 	"""
 
+	rng = get_rng(rng)
+
 	# This funtion generates a (('num_rows_subgrid' + 2) x ('num_columns_subgrid' + 2)) subgrid ('larger_subgrid') and
 	# extract then the ('num_rows_subgrid' x 'num_columns_subgrid') subgrid ('subgrid').
 
@@ -46,7 +102,7 @@ def generate_subgrid(subgrid_radius, bomb_middle_tile, num_rows_grid, num_column
 
 	# Wall tichness.
 	(left_wall_lg_sg, right_wall_lg_sg, top_wall_lg_sg, bottom_wall_lg_sg) = _compute_wall_thickness_subgrid(
-		radius_lg_sg, num_rows_grid, num_columns_grid)
+		radius_lg_sg, num_rows_grid, num_columns_grid, rng)
 
 	# Position of tiles that are not walls (of the larger subgrid).
 	tile_pos_list = get_positions(num_rows_lg_sg, num_columns_lg_sg, left_wall_lg_sg, right_wall_lg_sg, top_wall_lg_sg,
@@ -54,7 +110,8 @@ def generate_subgrid(subgrid_radius, bomb_middle_tile, num_rows_grid, num_column
 	num_tiles_lg_sg = len(tile_pos_list)
 
 	# Number of bombs.
-	num_bombs_lg_sg = _compute_num_bombs_subgrid(num_tiles_lg_sg, num_rows_grid, num_columns_grid, num_bombs_grid)
+	num_bombs_lg_sg = _compute_num_bombs_subgrid(num_tiles_lg_sg, num_rows_grid, num_columns_grid, num_bombs_grid,
+		rng)
 
 	# Creation of the larger subgrid.
 	middle_tile_pos = (radius_lg_sg, radius_lg_sg)
@@ -69,7 +126,7 @@ def generate_subgrid(subgrid_radius, bomb_middle_tile, num_rows_grid, num_column
 		if num_bombs_lg_sg == num_tiles_lg_sg:
 			num_bombs_lg_sg -= 1
 
-	bomb_position_list.extend(random.sample(tile_pos_list, num_bombs_lg_sg))
+	bomb_position_list.extend(rng.sample(tile_pos_list, num_bombs_lg_sg))
 
 	larger_subgrid = Grid(num_rows_lg_sg, num_columns_lg_sg, bomb_position_list, left_wall_lg_sg, right_wall_lg_sg,
 		top_wall_lg_sg, bottom_wall_lg_sg)
@@ -89,7 +146,7 @@ def generate_subgrid(subgrid_radius, bomb_middle_tile, num_rows_grid, num_column
 
 	# Grid.
 	grid = [
-		[larger_subgrid.tile_at(i, j) for j in range(1, (num_columns_lg_sg - 1))]
+		[larger_subgrid._tile_value(i, j) for j in range(1, (num_columns_lg_sg - 1))]
 		for i in range(1, (num_rows_lg_sg - 1))
 	]
 
@@ -101,13 +158,151 @@ def generate_subgrid(subgrid_radius, bomb_middle_tile, num_rows_grid, num_column
 
 	return subgrid
 
-def _compute_wall_thickness_subgrid(subgrid_radius, num_rows_grid, num_columns_grid):
+def generate_subgrids(num_subgrids, subgrid_radius, bomb_middle_tile, num_rows_grid, num_columns_grid, num_bombs_grid,
+	rng=None):
+	"""
+	Generate many random subgrids at once, with the same distribution as the 'generate_subgrid' function. The thickness
+	of the walls, the numbers of bombs (drawn from a binomial distribution) and the bombs of all subgrids are drawn in a
+	few calls, and the numbers of adjacent bombs are computed for all subgrids at once.
+
+	:num_subgrids: The number of subgrids.
+	:subgrid_radius: The radius of the subgrids. For example, with a radius of 2, the subgrids are 5 by 5 subgrids.
+	:bomb_middle_tile: If True, then the tile in the middle of the subgrids will contain a bomb. If False, then this
+		tile will not contain a bomb.
+	:num_rows_grid: The number of rows of the original grid.
+	:num_columns_grid: The number of columns of the original grid.
+	:num_bombs_grid: The number of bombs of the original grid.
+	:rng: The random number generator (a NumPy Generator). If None, then the 'numpy.random' module is used.
+	:return: The values of the tiles of the subgrids (a NumPy array of int8 of shape ('num_subgrids',
+		(1 + (2 * 'subgrid_radius')), (1 + (2 * 'subgrid_radius')))).
+	"""
+
+	rng = np.random if (rng is None) else rng
+
+	# As in 'generate_subgrid', a larger subgrid (with one more tile on each side) is generated and then cropped, so
+	# that the numbers of adjacent bombs of the tiles on the edges count the bombs outside the subgrid.
+	radius_lg_sg = subgrid_radius + 1 # 'lg_sg' for larger subgrid.
+	edge_size_lg_sg = 1 + (2 * radius_lg_sg)
+	num_tiles_lg_sg = edge_size_lg_sg * edge_size_lg_sg
+
+	# Wall thickness (see '_compute_wall_thickness_subgrid'). The first column is for the left and right walls, the
+	# second for the top and bottom walls.
+	prob_walls = np.array([(radius_lg_sg / num_columns_grid), (radius_lg_sg / num_rows_grid)])
+	random_nums = rng.random((num_subgrids, 2))
+	thicknesses = 1 + (rng.random((num_subgrids, 2)) * radius_lg_sg).astype(np.int64)
+	first_walls = np.where(random_nums < prob_walls, thicknesses, 0) # Left and top walls.
+	last_walls = np.where((prob_walls <= random_nums) & (random_nums < (2 * prob_walls)), thicknesses, 0)
+	# Right and bottom walls.
+
+	indices = np.arange(edge_size_lg_sg)
+	not_wall_columns = ((first_walls[:, 0, None] <= indices) & (indices < (edge_size_lg_sg - last_walls[:, 0, None])))
+	not_wall_rows = ((first_walls[:, 1, None] <= indices) & (indices < (edge_size_lg_sg - last_walls[:, 1, None])))
+	not_walls = not_wall_rows[:, :, None] & not_wall_columns[:, None, :]
+
+	# Number of bombs (see '_compute_num_bombs_subgrid'): each bomb of the original grid is in the subgrid with a
+	# probability equal to the ratio of the numbers of tiles (at most 1, when the subgrid is larger than the grid).
+	num_tiles = not_walls.sum(axis=(1, 2))
+	num_bombs = rng.binomial(num_bombs_grid, np.minimum(1.0, (num_tiles / (num_rows_grid * num_columns_grid))))
+	if bomb_middle_tile:
+		num_bombs = np.maximum((num_bombs - 1), 0)
+	else:
+		num_bombs = np.minimum(num_bombs, (num_tiles - 1))
+
+	# Bombs. The 'num_bombs' smallest of random keys of the tiles that are not walls (and not the middle tile) give a
+	# uniform sample of positions without replacement.
+	middle_index = (radius_lg_sg * edge_size_lg_sg) + radius_lg_sg
+	available_tiles = not_walls.reshape(num_subgrids, num_tiles_lg_sg).copy()
+	available_tiles[:, middle_index] = False
+	keys = np.where(available_tiles, rng.random((num_subgrids, num_tiles_lg_sg)), 2)
+	bombs = np.zeros((num_subgrids, num_tiles_lg_sg), dtype=bool)
+	np.put_along_axis(bombs, np.argsort(keys, axis=1), (np.arange(num_tiles_lg_sg) < num_bombs[:, None]), axis=1)
+	bombs[:, middle_index] = bomb_middle_tile
+	bombs = bombs.reshape(num_subgrids, edge_size_lg_sg, edge_size_lg_sg)
+
+	tiles = np.where(bombs, np.int8(BOMB_VALUE), count_adjacent(bombs)).astype(np.int8, copy=False)
+	tiles[~not_walls] = WALL_VALUE
+
+	return tiles[:, 1:-1, 1:-1]
+
+def generate_bombs(num_grids, num_rows, num_columns, num_bombs, rng=None):
+	"""
+	Generate the bombs of many grids. Each grid has 'num_bombs' bombs at random positions.
+
+	:num_grids: The number of grids.
+	:num_rows: The number of rows of the grids.
+	:num_columns: The number of columns of the grids.
+	:num_bombs: The number of bombs of each grid.
+	:rng: The random number generator (a NumPy Generator). If None, then the 'numpy.random' module is used.
+	:return: The bombs (a NumPy array of booleans of shape ('num_grids', 'num_rows', 'num_columns')).
+	"""
+
+	num_tiles = num_rows * num_columns
+	bombs = np.zeros((num_grids, num_tiles), dtype=bool)
+	if num_bombs > 0:
+		# The 'num_bombs' smallest of random keys give a uniform sample of positions without replacement.
+		keys = (np.random if (rng is None) else rng).random((num_grids, num_tiles))
+		bomb_positions = np.argpartition(keys, (num_bombs - 1), axis=1)[:, :num_bombs]
+		np.put_along_axis(bombs, bomb_positions, True, axis=1)
+
+	return bombs.reshape(num_grids, num_rows, num_columns)
+
+def adjacent_views(array):
+	"""
+	Get the eight views of the adjacent tiles of an array of grids (along its last two axes). The tiles outside the
+	grids are filled with zeros (or False).
+
+	:array: The array of grids.
+	:return: The eight views, in the order of ADJACENT_OFFSETS (a list of NumPy arrays of the shape of 'array').
+	"""
+
+	num_rows, num_columns = array.shape[-2:]
+	padded = np.zeros((array.shape[:-2] + ((num_rows + 2), (num_columns + 2))), dtype=array.dtype)
+	padded[..., 1:-1, 1:-1] = array
+
+	return [
+		padded[..., (1 + o1):(1 + o1 + num_rows), (1 + o2):(1 + o2 + num_columns)]
+		for o1, o2 in ADJACENT_OFFSETS
+	]
+
+def count_adjacent(bombs):
+	"""
+	Count the number of adjacent bombs of each tile of many grids.
+
+	:bombs: The bombs (a NumPy array of booleans).
+	:return: The number of adjacent bombs of each tile (a NumPy array of int8).
+	"""
+
+	num_adjacent_bombs = np.zeros(bombs.shape, dtype=np.int8)
+	for view in adjacent_views(bombs):
+		num_adjacent_bombs += view
+
+	return num_adjacent_bombs
+
+def _skip_indices(index, sorted_indices):
+	"""
+	Get the 'index'-th integer (from 0) that is not in a sorted list of integers.
+
+	:index: The index.
+	:sorted_indices: The sorted list of integers to skip.
+	:return: The 'index'-th integer that is not in 'sorted_indices'.
+	"""
+
+	for skipped_index in sorted_indices:
+		if index >= skipped_index:
+			index += 1
+		else:
+			break
+
+	return index
+
+def _compute_wall_thickness_subgrid(subgrid_radius, num_rows_grid, num_columns_grid, rng):
 	"""
 	Compute a random thickness of walls for the subgrids.
 
 	:subgrid_radius: The radius of the subgrid. For example, with a radius of 2, the subgrid is a 5 by 5 subgrid.
 	:num_rows_grid: The number of rows of the original grid.
 	:num_columns_grid: The number of columns of the original grid.
+	:rng: The random number generator (a random.Random object or the 'random' module).
 	:return: A random thickness of the left, right, top and bottom walls.
 	"""
 
@@ -121,21 +316,21 @@ def _compute_wall_thickness_subgrid(subgrid_radius, num_rows_grid, num_columns_g
 	prob_top_wall = subgrid_radius / num_rows_grid # Probability that there is a top wall.
 	prob_bottom_wall = prob_top_wall # Probability that there is a bottom wall.
 
-	random_num = random.random()
+	random_num = rng.random()
 	if random_num < prob_left_wall:
-		left_wall = random.randint(1, subgrid_radius)
+		left_wall = rng.randint(1, subgrid_radius)
 	elif random_num < (prob_left_wall + prob_right_wall):
-		right_wall = random.randint(1, subgrid_radius)
+		right_wall = rng.randint(1, subgrid_radius)
 
-	random_num = random.random()
+	random_num = rng.random()
 	if random_num < prob_top_wall:
-		top_wall = random.randint(1, subgrid_radius)
+		top_wall = rng.randint(1, subgrid_radius)
 	elif random_num < (prob_top_wall + prob_bottom_wall):
-		bottom_wall = random.randint(1, subgrid_radius)
+		bottom_wall = rng.randint(1, subgrid_radius)
 
 	return (left_wall, right_wall, top_wall, bottom_wall)
 
-def _compute_num_bombs_subgrid(num_tiles_subgrid, num_rows_grid, num_columns_grid, num_bombs_grid):
+def _compute_num_bombs_subgrid(num_tiles_subgrid, num_rows_grid, num_columns_grid, num_bombs_grid, rng):
 	"""
 	Compute a random number of bombs for the subgrids.
 
@@ -143,6 +338,7 @@ def _compute_num_bombs_subgrid(num_tiles_subgrid, num_rows_grid, num_columns_gri
 	:num_rows_grid: The number of rows of the original grid.
 	:num_columns_grid: The number of columns of the original grid.
 	:num_bombs_grid: The number of bombs of the original grid.
+	:rng: The random number generator (a random.Random object or the 'random' module).
 	:return: A random number of bombs between 0 and 'num_tiles_subgrid'.
 	"""
 
@@ -151,7 +347,7 @@ def _compute_num_bombs_subgrid(num_tiles_subgrid, num_rows_grid, num_columns_gri
 
 	num_bombs_subgrid = 0
 	for i in range(num_bombs_grid):
-		if random.random() < tile_ratio:
+		if rng.random() < tile_ratio:
 			num_bombs_subgrid += 1
 
 	return num_bombs_subgrid
@@ -169,3 +365,15 @@ if __name__ == "__main__":
 
 	g = generate_subgrid(2, True, num_rows, num_columns, num_bombs)
 	print(g)
+
+	grids = generate_masked_grids(1000, num_rows, num_columns, num_bombs)
+	print(grids[0])
+
+	subgrids = generate_subgrids(1000, 2, True, num_rows, num_columns, num_bombs)
+	print(subgrids[0])
+
+	# Both ways of generating subgrids accept the same parameters, also when the subgrids are larger than the grid.
+	for bomb_middle_tile in [False, True]:
+		subgrid = generate_subgrid(2, bomb_middle_tile, 3, 3, 8)
+		subgrids = generate_subgrids(1000, 2, bomb_middle_tile, 3, 3, 8)
+		assert subgrids.shape[1:] == (subgrid.num_rows, subgrid.num_columns)
@@ -1,6 +1,8 @@
-from minesweeper.grid import Tile, Grid, get_positions
+from minesweeper.grid import Tile, Grid, WALL_VALUE, get_positions, _TILES
+from minesweeper.random_streams import get_rng
 
 from enum import IntEnum
+import copy
 
 class MaskedTile(IntEnum):
 	"""
@@ -32,11 +34,19 @@ class MaskedTile(IntEnum):
 
 assert MaskedTile.MASKED not in Tile.__members__.values()
 
+# Values of the masked and flag tiles (plain integers, see BOMB_VALUE and WALL_VALUE).
+MASKED_VALUE = MaskedTile.MASKED.value
+FLAG_VALUE = MaskedTile.FLAG.value
+
+_MASKED_TILES = {**_TILES, MASKED_VALUE: MaskedTile.MASKED, FLAG_VALUE: MaskedTile.FLAG} # Tile members by value.
+
 class MaskedGrid(Grid):
 	"""
 	Grid with walls and mask (including the visibilities).
 	"""
 
+	__slots__ = ('_masked_grid', '_masked_tile_positions', '_flag_tile_positions', '_visible_hash')
+
 	def __init__(self, num_rows, num_columns, bomb_position_list, left_wall=0, right_wall=0, top_wall=0,
 		bottom_wall=0):
 		"""
@@ -54,35 +64,18 @@ class MaskedGrid(Grid):
 		super().__init__(num_rows, num_columns, bomb_position_list, left_wall, right_wall,
 			top_wall, bottom_wall)
 
-		tile_at = super().tile_at
 		# '_masked_grid' is the mask of the grid: True if the tile at position (i, j) is masked, False othewise.
 		# By default, all tiles is masked except the walls.
-		self._masked_grid = [
-			[(tile_at(i, j) != Tile.WALL) for j in range(self.num_columns)]
-			for i in range(self.num_rows)
-		]
+		self._masked_grid = self._create_mask()
 
 		self._masked_tile_positions = set(get_positions(num_rows, num_columns, left_wall, right_wall, top_wall,
 			bottom_wall))
 		self._flag_tile_positions = set()
 
-	@property
-	def grid(self):
-		"""
-		Grid with mask (what the user see).
-		"""
-
-		grid = super().grid
-		for i, row in enumerate(self._masked_grid):
-			for j, masked in enumerate(row):
-				if masked:
-					grid[i][j] = MaskedTile.MASKED
-
-		for i, j in self._flag_tile_positions:
-			grid[i][j] = MaskedTile.FLAG
+		# '_visible_hash' is the Zobrist hash of the grid with mask (what the user see), relative to the initial grid with
+		# mask (see the '_initial_visible_hash' method).
+		self._visible_hash = self._initial_visible_hash()
 
-		return grid
-	
 	@property
 	def num_masked_tiles(self):
 		"""
@@ -119,17 +112,18 @@ class MaskedGrid(Grid):
 		return super().__str__()
 
 	def __eq__(self, other):
-		return self.grid == other.grid
+		if (self._visible_hash != other._visible_hash) or (self.num_rows != other.num_rows) or \
+			(self.num_columns != other.num_columns):
 
-	def __hash__(self):
-		return hash(tuple(map(tuple, self.grid)))
+			return False
 
-	def __iter__(self):
-		"""
-		Iterate on rows of the grid.
-		"""
+		return all(
+			(self.tile_at(i, j) == other.tile_at(i, j))
+			for i in range(self.num_rows) for j in range(self.num_columns)
+		)
 
-		return (row for row in self.grid)
+	def __hash__(self):
+		return self._visible_hash
 
 	def tile_at(self, i, j):
 		"""
@@ -150,6 +144,39 @@ class MaskedGrid(Grid):
 
 		return super().tile_at(i, j)
 
+	def explored_bounds(self, margin=0):
+		"""
+		Get the bounds of the explored part of the grid, enlarged by 'margin' tiles on each side (and limited to the
+		grid). The explored part of this grid is the whole grid (see ChunkedMaskedGrid for grids where it is not).
+
+		:margin: The number of tiles to add on each side.
+		:return: The index of the first row, the index of the row after the last row, the index of the first column and
+			the index of the column after the last column of the explored part.
+		"""
+
+		return (0, self.num_rows, 0, self.num_columns)
+
+	def random_masked_tile_position(self, rng=None):
+		"""
+		Get the position of a random masked tile.
+
+		:rng: The random number generator (a random.Random object). If None, then the 'random' module is used.
+		:return: The position of a random masked tile.
+		"""
+
+		return get_rng(rng).choice(self.masked_tile_positions)
+
+	def unmask_tiles(self, position_list):
+		"""
+		Unmask the tiles at the positions of a list, without unmasking the empty tiles around (unlike the 'unmask_tile'
+		method), for example to restore a saved grid with mask. The tiles that are already unmasked or that contain a
+		flag are not unmasked.
+
+		:position_list: The list of positions.
+		"""
+
+		self._unmask_tiles(position_list)
+
 	def unmask_tile(self, i, j):
 		"""
 		Unmask on a tile and all the empty tiles around.
@@ -160,35 +187,45 @@ class MaskedGrid(Grid):
 		"""
 
 		unmasked_tiles = set()
-		tile = super().tile_at(i, j)
+		tile = self._tile_value(i, j)
 
 		was_unmasked = self._unmask_tile(i, j)
 		if not was_unmasked:
-			print(self._masked_tile_positions)
-			if not ((i, j) in self._masked_tile_positions):
-				raise ValueError("Error: the tile (at {}, {}) is already unmasked or is a wall!".format(i, j))
-
-			if (i, j) in self._flag_tile_positions:
+			if self.tile_at(i, j) is MaskedTile.FLAG:
 				raise ValueError("Error: the tile (at {}, {}) contains a flag!".format(i, j))
 
+			raise ValueError("Error: the tile (at {}, {}) is already unmasked or is a wall!".format(i, j))
+
 		unmasked_tiles.add((i, j))
 
 		# In this step, tile is not masked and does not contain a flag.
 
-		if (tile != MaskedTile.EMPTY) or (tile > 0):
+		if tile != 0: # If 'tile' has adjacent bombs or contains a bomb.
+			return unmasked_tiles
+
+		empty_tiles, border_tiles = self.empty_region(i, j)
+		if self._count_masked_tiles_without_flag(empty_tiles) == (len(empty_tiles) - 1):
+			# If the empty region of 'tile' is unexplored (all its tiles but 'tile' are masked and do not contain a
+			# flag), then unmask the whole empty region and its border at once.
+			self._unmask_tiles(empty_tiles)
+			self._unmask_tiles(border_tiles)
+			unmasked_tiles.update(empty_tiles)
+			unmasked_tiles.update(border_tiles)
+
 			return unmasked_tiles
 
-		# Explore and unmask the empty tiles around 'tile'.
+		# Explore and unmask the empty tiles around 'tile' (some flags or unmasked tiles stop the exploration).
+		adjacent_positions = self._neighbour_table.positions
 		tiles_to_explore = set()
-		tiles_to_explore.update(self.adjacent_tiles(i, j))
+		tiles_to_explore.update(adjacent_positions[(i * self.num_columns) + j])
 		while tiles_to_explore: # While 'tiles_to_explore' contains positions.
 			i_temp, j_temp = tiles_to_explore.pop()
-			tile_temp = super().tile_at(i_temp, j_temp) # 'tile_temp' is an empty tile.
+			tile_temp = self._tile_value(i_temp, j_temp) # 'tile_temp' is an empty tile.
 
 			was_unmasked = self._unmask_tile(i_temp, j_temp)
 			unmasked_tiles.add((i_temp, j_temp))
 			if was_unmasked and (tile_temp == 0):
-				tiles_to_explore.update(self.adjacent_tiles(i_temp, j_temp))
+				tiles_to_explore.update(adjacent_positions[(i_temp * self.num_columns) + j_temp])
 
 		return unmasked_tiles
 
@@ -213,8 +250,9 @@ class MaskedGrid(Grid):
 		:return: True if the flag was added, False otherwise.
 		"""
 
-		if self.tile_at(i, j) == MaskedTile.MASKED:
+		if self.tile_at(i, j) is MaskedTile.MASKED:
 			self._flag_tile_positions.add((i, j))
+			self._visible_hash ^= self._zobrist_table.key_change((i * self.num_columns) + j, MASKED_VALUE, FLAG_VALUE)
 
 			return True
 
@@ -251,6 +289,9 @@ class MaskedGrid(Grid):
 		except KeyError:
 			return False
 
+		self._visible_hash ^= self._zobrist_table.key_change((i * self.num_columns) + j, FLAG_VALUE,
+			MASKED_VALUE)
+
 		return True
 
 	def remove_all_flags(self):
@@ -258,8 +299,119 @@ class MaskedGrid(Grid):
 		Remove all flags.
 		"""
 
+		for i, j in self._flag_tile_positions:
+			self._visible_hash ^= self._zobrist_table.key_change((i * self.num_columns) + j, FLAG_VALUE,
+				MASKED_VALUE)
+
 		self._flag_tile_positions.clear()
 
+	def snapshot(self):
+		"""
+		Take a snapshot of the mask (including the flags). Only the mask is copied: the grid of numbers never changes.
+
+		:return: The snapshot, to give to the 'restore' method.
+		"""
+
+		return self._copy_mask_state(self._mask_state())
+
+	def restore(self, snapshot):
+		"""
+		Restore the mask (including the flags) from a snapshot. A snapshot can be restored several times.
+
+		:snapshot: The snapshot (see the 'snapshot' method).
+		"""
+
+		self._set_mask_state(self._copy_mask_state(snapshot))
+
+	def fork(self):
+		"""
+		Copy the grid with mask. The copy shares the bombs and the grid of numbers (which never change) with this grid,
+		only the mask (including the flags) is copied.
+
+		:return: The copy of the grid with mask.
+		"""
+
+		forked_grid = copy.copy(self)
+		forked_grid._set_mask_state(self._copy_mask_state(self._mask_state()))
+
+		return forked_grid
+
+	def _mask_state(self):
+		"""
+		Get the state of the mask (the attributes that change when tiles are unmasked and when flags are inserted or
+		removed). The attributes are not copied.
+
+		:return: The state of the mask (a tuple).
+		"""
+
+		return (self._masked_grid, self._masked_tile_positions, self._flag_tile_positions, self._visible_hash)
+
+	def _set_mask_state(self, mask_state):
+		"""
+		Set the state of the mask (see the '_mask_state' method). The attributes are not copied.
+
+		:mask_state: The state of the mask.
+		"""
+
+		(self._masked_grid, self._masked_tile_positions, self._flag_tile_positions, self._visible_hash) = mask_state
+
+	def _copy_mask_state(self, mask_state):
+		"""
+		Copy a state of the mask (see the '_mask_state' method).
+
+		:mask_state: The state of the mask.
+		:return: The copy of the state of the mask.
+		"""
+
+		masked_grid, masked_tile_positions, flag_tile_positions, visible_hash = mask_state
+
+		return ([list(row) for row in masked_grid], set(masked_tile_positions), set(flag_tile_positions), visible_hash)
+
+	def _create_mask(self):
+		"""
+		Create the mask of the grid. All tiles are masked except the walls.
+
+		:return: The mask of the grid (a list of lists of booleans).
+		"""
+
+		return [[(tile != WALL_VALUE) for tile in row] for row in self._grid]
+
+	def _initial_visible_hash(self):
+		"""
+		Compute the Zobrist hash of the initial grid with mask (all tiles are masked except the walls). The hash of a
+		grid with mask is only updated with the keys of the tiles that change (see ZobristTable), starting from 0 for the
+		initial grid with mask instead of hashing all its tiles. Since the initial grid with mask only depends on the
+		shape and the walls, equal grids with mask still have equal hashes.
+
+		:return: The Zobrist hash of the initial grid with mask (0).
+		"""
+
+		return 0
+
+	def _count_masked_tiles_without_flag(self, position_list):
+		"""
+		Count the number of tiles that are masked and that do not contain a flag among a list of positions.
+
+		:position_list: The list of positions.
+		:return: The number of tiles that are masked and that do not contain a flag.
+		"""
+
+		masked_grid = self._masked_grid
+		flag_tile_positions = self._flag_tile_positions
+
+		return sum(1 for i, j in position_list if masked_grid[i][j] and ((i, j) not in flag_tile_positions))
+
+	def _unmask_tiles(self, position_list):
+		"""
+		Unmask the tiles at the positions of a list. The tiles that are already unmasked or that contain a flag are not
+		unmasked (see the '_unmask_tile' method).
+
+		:position_list: The list of positions.
+		"""
+
+		for i, j in position_list:
+			self._unmask_tile(i, j)
+
 	def _unmask_tile(self, i, j):
 		"""
 		Unmask one tile at position 'i' and 'j'. It reveals the tile in this position and decrements by one the
@@ -277,6 +429,8 @@ class MaskedGrid(Grid):
 
 		self._masked_grid[i][j] = False
 		self._masked_tile_positions.remove((i, j))
+		self._visible_hash ^= self._zobrist_table.key_change((i * self.num_columns) + j, MASKED_VALUE,
+			self._tile_value(i, j))
 
 		return True
 
@@ -1,7 +1,11 @@
 from minesweeper.masked_grid import MaskedTile, MaskedGrid
 from minesweeper.grid_generation import generate_masked_grid
+from minesweeper.replay_log import Move, ReplayLog
+from minesweeper.random_streams import get_rng
 
 from enum import Enum
+import random
+import copy
 
 class State(Enum):
 	CONTINUE = 0 # Unfinished game.
@@ -22,19 +26,64 @@ class Minesweeper:
 	Minesweeper game.
 	"""
 
-	def __init__(self, num_rows, num_columns, num_bombs):
+	__slots__ = ('_grid', '_state', '_score', '_replay_log', '_deferred_bombs')
+
+	def __init__(self, num_rows, num_columns, num_bombs, grid_class=MaskedGrid, record_replay=False, rng=None,
+		first_click_safe=False, safe_radius=0):
 		"""
 		Create a minesweeper game.
 
 		:num_rows: The number of rows of the grid.
 		:num_columns: The number of columns of the grid.
 		:num_bombs: The number of bombs of the grid.
-		"""
-
-		self._grid = generate_masked_grid(num_rows, num_columns, num_bombs)
+		:grid_class: The class of the grid with mask to create (MaskedGrid or a subclass, for example ArrayMaskedGrid to
+			store the grid in NumPy arrays).
+		:record_replay: If True, then the layout of the grid and the moves are recorded in a replay log (see the
+			'replay_log' property).
+		:rng: The random number generator of the bombs (a random.Random object). If None, then the 'random' module is
+			used.
+		:first_click_safe: If True, then the bombs are inserted when the first tile is played, and not around this tile
+			(see 'safe_radius'), so that the first turn can not be lost. Until then, the grid has no bombs.
+		:safe_radius: The radius of the safe tiles around the first played tile if 'first_click_safe' is True. With a
+			radius of 0, only the played tile is safe, and with a radius of 1, the 3 by 3 tiles centered on it are safe.
+		"""
+
+		if first_click_safe:
+			self._grid = grid_class(num_rows, num_columns, [])
+			# The seed of the bombs is drawn now, so that the bombs only depend on the first played tile (and not on the
+			# uses of 'rng' until then), also in the forks and the restored snapshots of the game.
+			self._deferred_bombs = (num_bombs, grid_class, get_rng(rng).getrandbits(64), safe_radius)
+		else:
+			self._grid = generate_masked_grid(num_rows, num_columns, num_bombs, grid_class=grid_class, rng=rng)
+			self._deferred_bombs = None
 
 		self._state = State.CONTINUE
 		self._score = 0
+		self._replay_log = ReplayLog.from_grid(self._grid) if record_replay else None
+
+	@classmethod
+	def from_grid(cls, grid, record_replay=False, state=State.CONTINUE, score=0):
+		"""
+		Create a minesweeper game from a grid with mask (for example a ProceduralMaskedGrid, which is not created from a
+		number of bombs).
+
+		:grid: The grid with mask (a MaskedGrid object). It is not copied.
+		:record_replay: If True, then the layout of the grid and the moves are recorded in a replay log (see the
+			'replay_log' property). The grid must not have been played yet and all its bombs must be known (it can not
+			be a ProceduralMaskedGrid, see the 'from_grid' method of ReplayLog).
+		:state: The state of the game (for example to restore a saved game).
+		:score: The score of the game.
+		:return: The minesweeper game.
+		"""
+
+		minesweeper = cls.__new__(cls)
+		minesweeper._grid = grid
+		minesweeper._state = state
+		minesweeper._score = score
+		minesweeper._replay_log = ReplayLog.from_grid(grid) if record_replay else None
+		minesweeper._deferred_bombs = None
+
+		return minesweeper
 
 	@property
 	def num_rows(self):
@@ -58,6 +107,9 @@ class Minesweeper:
 		Number of bombs of the grid.
 		"""
 
+		if self._deferred_bombs is not None:
+			return self._deferred_bombs[0]
+
 		return self._grid.num_bombs
 
 	@property
@@ -95,11 +147,29 @@ class Minesweeper:
 	@property
 	def grid(self):
 		"""
-		Grid.
+		Grid (a read-only view of the grid with mask). Use the 'copy_grid' method to get a mutable copy.
 		"""
 
 		return self._grid.grid
 
+	@property
+	def masked_grid(self):
+		"""
+		Grid with mask of the game (a MaskedGrid object). It is not copied and it must not be changed (use the methods
+		of the game to play).
+		"""
+
+		return self._grid
+
+	@property
+	def bombs_inserted(self):
+		"""
+		True if the bombs are inserted in the grid, False if they will be inserted when the first tile is played (see
+		the 'first_click_safe' parameter of the constructor).
+		"""
+
+		return self._deferred_bombs is None
+
 	@property
 	def state(self):
 		"""
@@ -116,6 +186,14 @@ class Minesweeper:
 
 		return self._score
 
+	@property
+	def replay_log(self):
+		"""
+		Replay log of the game (a ReplayLog object), or None if the moves are not recorded.
+		"""
+
+		return self._replay_log
+
 	@property
 	def max_score(self):
 		"""
@@ -138,6 +216,37 @@ class Minesweeper:
 
 		return self._grid.within_boundaries(i, j)
 
+	def copy_grid(self):
+		"""
+		Copy the grid.
+
+		:return: A copy of the grid with mask.
+		"""
+
+		return self._grid.copy_grid()
+
+	def explored_bounds(self, margin=0):
+		"""
+		Get the bounds of the explored part of the grid, enlarged by 'margin' tiles on each side (see the
+		'explored_bounds' method of MaskedGrid).
+
+		:margin: The number of tiles to add on each side.
+		:return: The index of the first row, the index of the row after the last row, the index of the first column and
+			the index of the column after the last column of the explored part.
+		"""
+
+		return self._grid.explored_bounds(margin)
+
+	def random_masked_tile_position(self, rng=None):
+		"""
+		Get the position of a random masked tile.
+
+		:rng: The random number generator (a random.Random object). If None, then the 'random' module is used.
+		:return: The position of a random masked tile.
+		"""
+
+		return self._grid.random_masked_tile_position(rng)
+
 	def tile_at(self, i, j):
 		"""
 		Get tile at a position. The returned value is either MaskedTile.MASKED, MaskedTile.BOMB or the number of
@@ -164,9 +273,14 @@ class Minesweeper:
 		if self.state == State.FINISHED:
 			return (self.state, self.score)
 
+		if (self._deferred_bombs is not None) and (self._grid.tile_at(i, j) is MaskedTile.MASKED):
+			self._insert_deferred_bombs(safe_position=(i, j))
+
 		old_num_masked_tiles = self.num_masked_tiles
 
 		played_tiles = self._grid.unmask_tile(i, j)
+		if self._replay_log is not None:
+			self._replay_log.append(Move.PLAY, i, j)
 
 		# Updating of the state.
 		if self.tile_at(i, j) == MaskedTile.BOMB:
@@ -181,13 +295,61 @@ class Minesweeper:
 
 		return played_tiles
 
+	def snapshot(self):
+		"""
+		Take a snapshot of the game (the mask of the grid, including the flags, the state and the score). The bombs and
+		the grid of numbers are not copied since they never change (if the bombs are not inserted yet, see the
+		'first_click_safe' parameter of the constructor, then they will not be inserted in the restored game either).
+
+		:return: The snapshot, to give to the 'restore' method.
+		"""
+
+		num_moves = len(self._replay_log) if (self._replay_log is not None) else 0
+
+		return (self._grid, self._grid.snapshot(), self._state, self._score, self._deferred_bombs, self._replay_log,
+			num_moves)
+
+	def restore(self, snapshot):
+		"""
+		Restore the game from a snapshot. A snapshot can be restored several times. The moves played after the snapshot
+		are removed from the replay log.
+
+		:snapshot: The snapshot (see the 'snapshot' method).
+		"""
+
+		(self._grid, grid_snapshot, self._state, self._score, self._deferred_bombs, self._replay_log,
+			num_moves) = snapshot
+		self._grid.restore(grid_snapshot)
+		if self._replay_log is not None:
+			self._replay_log.truncate(num_moves)
+
+	def fork(self):
+		"""
+		Copy the game. The copy shares the bombs and the grid of numbers with this game (see the 'fork' method of
+		MaskedGrid), so that forking is cheap. Playing in the copy does not change this game.
+
+		:return: The copy of the game.
+		"""
+
+		forked_game = copy.copy(self)
+		forked_game._grid = self._grid.fork()
+		if self._replay_log is not None:
+			forked_game._replay_log = self._replay_log.copy()
+
+		return forked_game
+
 	def reveal_all_tiles(self):
 		"""
 		Reveal all tiles. The 'num_masked_tiles' counter is equal to 0 and the state is set to State.LOSS after calling
 		this function.
 		"""
 
+		if self._deferred_bombs is not None:
+			self._insert_deferred_bombs()
+
 		self._grid.unmask_all_tiles()
+		if self._replay_log is not None:
+			self._replay_log.append(Move.REVEAL_ALL_TILES)
 		if self._state == State.CONTINUE:
 			self._state = State.LOSS
 
@@ -201,7 +363,11 @@ class Minesweeper:
 		:return: True if the flag was added, False otherwise.
 		"""
 
-		return self._grid.insert_flag(i, j)
+		flag_added = self._grid.insert_flag(i, j)
+		if flag_added and (self._replay_log is not None):
+			self._replay_log.append(Move.INSERT_FLAG, i, j)
+
+		return flag_added
 
 	def remove_flag(self, i, j):
 		"""
@@ -213,7 +379,11 @@ class Minesweeper:
 		:return: True if the flag was removed, False otherwise.
 		"""
 
-		return self._grid.remove_flag(i, j)
+		flag_removed = self._grid.remove_flag(i, j)
+		if flag_removed and (self._replay_log is not None):
+			self._replay_log.append(Move.REMOVE_FLAG, i, j)
+
+		return flag_removed
 
 	def insert_flags(self, position_list):
 		"""
@@ -224,7 +394,15 @@ class Minesweeper:
 		:return: True if the all flags were added, False otherwise (some flags were not added).
 		"""
 
-		return self._grid.insert_flags(position_list)
+		if self._replay_log is None:
+			return self._grid.insert_flags(position_list)
+
+		# The flags are inserted one by one to log the flags that are added.
+		all_flags_added = True
+		for i, j in position_list:
+			all_flags_added &= self.insert_flag(i, j)
+
+		return all_flags_added
 
 	def remove_all_flags(self):
 		"""
@@ -232,3 +410,27 @@ class Minesweeper:
 		"""
 
 		self._grid.remove_all_flags()
+		if self._replay_log is not None:
+			self._replay_log.append(Move.REMOVE_ALL_FLAGS)
+
+	def _insert_deferred_bombs(self, safe_position=None):
+		"""
+		Insert the bombs whose insertion was deferred to the first played tile (see the 'first_click_safe' parameter of
+		the constructor). The grid without bombs is replaced by a new grid with the bombs, and the flags are kept.
+
+		:safe_position: The position of the first played tile (a tuple (i, j)), or None if all tiles are revealed.
+		"""
+
+		num_bombs, grid_class, seed, safe_radius = self._deferred_bombs
+		self._deferred_bombs = None
+
+		flag_tile_positions = self._grid.flag_tile_positions
+		self._grid = generate_masked_grid(self.num_rows, self.num_columns, num_bombs, grid_class=grid_class,
+			rng=random.Random(seed), safe_position=safe_position, safe_radius=safe_radius)
+		self._grid.insert_flags(flag_tile_positions)
+
+		if self._replay_log is not None:
+			# The moves already logged (flags) are kept.
+			replay_log = ReplayLog.from_grid(self._grid)
+			replay_log.extend(self._replay_log)
+			self._replay_log = replay_log
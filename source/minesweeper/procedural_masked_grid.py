@@ -0,0 +1,167 @@
+from minesweeper.chunked_masked_grid import ChunkedMaskedGrid, CHUNK_SIZE
+from minesweeper.random_streams import get_rng
+
+import numpy as np
+from collections import Counter
+
+class ProceduralMaskedGrid(ChunkedMaskedGrid):
+	"""
+	Grid with walls and mask whose bombs are generated procedurally, for unbounded grids (the number of rows and columns
+	can be huge). The bombs of a chunk (see ChunkedMaskedGrid) are generated the first time the chunk is read, by a
+	counter-based random generator (Philox) whose key is the seed and whose counter starts at the position of the chunk.
+	Therefore, the memory used is proportional to the explored part of the grid, and the same seed always gives the same
+	grid.
+	Each chunk contains round('bomb_density' * 'num_tiles_chunk') bombs, where 'num_tiles_chunk' is its number of tiles
+	that are not walls, so that the number of bombs of the grid is known without generating all chunks.
+	"""
+
+	__slots__ = ('_seed', '_bomb_density')
+
+	def __init__(self, num_rows, num_columns, bomb_density, seed=None, left_wall=0, right_wall=0, top_wall=0,
+		bottom_wall=0, chunk_size=CHUNK_SIZE, rng=None):
+		"""
+		Create a grid with mask.
+
+		:num_rows: The number of rows of the grid.
+		:num_columns: The number of columns of the grid.
+		:bomb_density: The proportion of tiles containing a bomb (between 0 and 1).
+		:seed: The seed of the grid (a non-negative integer). If None, then a random seed is drawn.
+		:left_wall: The thickness of the left wall.
+		:right_wall: The thickness of the right wall.
+		:top_wall: The thickness of the top wall.
+		:bottom_wall: The thickness of the bottom wall.
+		:chunk_size: The number of rows and columns of the chunks.
+		:rng: The random number generator of the seed if it is None (a random.Random object). If None, then the
+			'random' module is used.
+		"""
+
+		if not(0 <= bomb_density <= 1):
+			raise ValueError("Error: the density of bombs ({}) must be between 0 and 1!".format(bomb_density))
+
+		super().__init__(num_rows, num_columns, [], left_wall, right_wall, top_wall, bottom_wall, chunk_size)
+
+		self._seed = get_rng(rng).getrandbits(64) if (seed is None) else seed
+		self._bomb_density = bomb_density
+
+	@property
+	def seed(self):
+		"""
+		Seed of the grid.
+		"""
+
+		return self._seed
+
+	@property
+	def bomb_density(self):
+		"""
+		Proportion of tiles containing a bomb.
+		"""
+
+		return self._bomb_density
+
+	@property
+	def num_bombs(self):
+		"""
+		Number of bombs of the grid (computed without generating the chunks).
+		"""
+
+		# The chunks with the same number of rows and the same number of columns that are not walls have the same number
+		# of bombs.
+		row_counts = self._count_chunks_by_size(self.top_wall, (self.num_rows - self.bottom_wall))
+		column_counts = self._count_chunks_by_size(self.left_wall, (self.num_columns - self.right_wall))
+
+		return sum(
+			num_chunk_rows * num_chunk_columns * self._num_bombs_of_chunk(num_rows * num_columns)
+			for num_rows, num_chunk_rows in row_counts.items() for num_columns, num_chunk_columns in column_counts.items()
+		)
+
+	@property
+	def bomb_position_list(self):
+		"""
+		List of positions of bombs of the chunks that are already generated.
+		"""
+
+		return super().bomb_position_list
+
+	def _bombs_of_chunk(self, ci, cj):
+		"""
+		Get the bombs of a chunk. They are generated the first time the chunk is read.
+
+		:ci: The index of the row of the chunk.
+		:cj: The index of the column of the chunk.
+		:return: The bombs of the chunk (a NumPy array of int8, 1 if the tile contains a bomb), or None if the chunk is
+			outside the grid.
+		"""
+
+		try:
+			return self._bomb_chunks[(ci, cj)]
+		except KeyError:
+			pass
+
+		chunk_size = self._chunk_size
+		if not((0 <= (ci * chunk_size) < self.num_rows) and (0 <= (cj * chunk_size) < self.num_columns)):
+			return None
+
+		# The chunk is in the high words of the counter, so that the streams of two chunks never overlap (the low words
+		# are incremented by the generator).
+		random_generator = np.random.Generator(np.random.Philox(key=self._seed, counter=[0, 0, ci, cj]))
+		tile_indices = np.flatnonzero(~self._walls_of_chunk(ci, cj))
+		bomb_indices = random_generator.choice(tile_indices, self._num_bombs_of_chunk(len(tile_indices)), replace=False)
+
+		bombs = np.zeros((chunk_size * chunk_size), dtype=np.int8)
+		bombs[bomb_indices] = 1
+		bombs = bombs.reshape(chunk_size, chunk_size)
+		self._bomb_chunks[(ci, cj)] = bombs
+
+		return bombs
+
+	def _num_bombs_of_chunk(self, num_tiles):
+		"""
+		Compute the number of bombs of a chunk.
+
+		:num_tiles: The number of tiles of the chunk that are not walls.
+		:return: The number of bombs of the chunk.
+		"""
+
+		return int((self._bomb_density * num_tiles) + 0.5)
+
+	def _count_chunks_by_size(self, start, stop):
+		"""
+		Count the rows (or the columns) of chunks by number of rows (or columns) that are not walls.
+
+		:start: The index of the first row (or column) that is not a wall.
+		:stop: The index of the row (or column) after the last row (or column) that is not a wall.
+		:return: The number of rows (or columns) of chunks for each number of rows (or columns) that are not walls (a
+			Counter).
+		"""
+
+		chunk_size = self._chunk_size
+		first_chunk, last_chunk = start // chunk_size, (stop - 1) // chunk_size
+		if first_chunk == last_chunk:
+			return Counter({(stop - start): 1})
+
+		counts = Counter({(chunk_size - (start % chunk_size)): 1})
+		counts[((stop - 1) % chunk_size) + 1] += 1
+		counts[chunk_size] += last_chunk - first_chunk - 1
+
+		return counts
+
+if __name__ == "__main__":
+	from minesweeper.minesweeper import Minesweeper
+
+	g = ProceduralMaskedGrid(10, 20, 0.15, seed=42, chunk_size=8)
+	g.unmask_tile(5, 10)
+	print(g)
+
+	same_seed_grid = ProceduralMaskedGrid(10, 20, 0.15, seed=42, chunk_size=8)
+	same_seed_grid.unmask_tile(5, 10)
+	print(g == same_seed_grid)
+
+	print("\n\n\n")
+
+	ms = Minesweeper.from_grid(ProceduralMaskedGrid(10 ** 9, 10 ** 9, 0.1, seed=42))
+	for k in range(100):
+		ms.play_tile(*ms.random_masked_tile_position())
+	print("Number of bombs: {}.".format(ms.num_bombs))
+	print("State: {}, score: {}.".format(ms.state, ms.score))
+	print("Generated chunks: {}.".format(len(ms._grid._bomb_chunks)))
@@ -0,0 +1,70 @@
+import numpy as np
+import random
+
+# Random number generators (RNG) of the games, the generators of grids and the artificial intelligences. Each function
+# using randomness takes an optional 'rng' parameter, a random.Random object (or a NumPy Generator for the NumPy
+# functions). If it is None, then the global 'random' module (or 'numpy.random') is used, as before.
+# To run games in parallel reproducibly, each game (or each worker) uses its own child stream, which only depends on a
+# root seed and on the index of the stream (see the 'child_rng' function), and not on the number of workers.
+
+def get_rng(rng=None):
+	"""
+	Get the random number generator to use.
+
+	:rng: A random number generator (a random.Random object) or None.
+	:return: 'rng', or the global 'random' module if 'rng' is None (it has the same methods as random.Random).
+	"""
+
+	return random if (rng is None) else rng
+
+def child_seed(seed, index):
+	"""
+	Compute the seed of a child stream. The seeds of the child streams of a root seed are independent (see NumPy
+	SeedSequence).
+
+	:seed: The root seed (a non-negative integer).
+	:index: The index of the child stream (a non-negative integer).
+	:return: The seed of the child stream (a 128-bit integer).
+	"""
+
+	state = np.random.SeedSequence(seed, spawn_key=(index,)).generate_state(4, dtype=np.uint32)
+
+	return int.from_bytes(state.astype('<u4').tobytes(), 'little')
+
+def child_rng(seed, index):
+	"""
+	Create the random number generator of a child stream (see the 'child_seed' function).
+
+	:seed: The root seed (a non-negative integer).
+	:index: The index of the child stream (a non-negative integer).
+	:return: The random number generator (a random.Random object).
+	"""
+
+	return random.Random(child_seed(seed, index))
+
+def child_numpy_rng(seed, index):
+	"""
+	Create the NumPy random number generator of a child stream (see the 'child_seed' function).
+
+	:seed: The root seed (a non-negative integer).
+	:index: The index of the child stream (a non-negative integer).
+	:return: The random number generator (a NumPy Generator).
+	"""
+
+	return np.random.default_rng(child_seed(seed, index))
+
+def spawn_rngs(seed, num_streams):
+	"""
+	Create the random number generators of the first child streams of a root seed.
+
+	:seed: The root seed (a non-negative integer).
+	:num_streams: The number of child streams.
+	:return: The list of random number generators (random.Random objects).
+	"""
+
+	return [child_rng(seed, index) for index in range(num_streams)]
+
+if __name__ == "__main__":
+	rngs = spawn_rngs(42, 3)
+	print([rng.random() for rng in rngs])
+	print(child_rng(42, 2).random() == spawn_rngs(42, 3)[2].random())
@@ -0,0 +1,93 @@
+from minesweeper.minesweeper import Minesweeper
+from minesweeper.masked_grid import MaskedGrid
+from minesweeper.replay_log import Move
+
+# Re-simulation of games from their replay logs (see the 'replay_log' module). The moves are played again through the
+# methods of Minesweeper, so that old runs can be re-scored, or replayed against changes of the engine, without
+# playing the artificial intelligence again.
+
+def replay(replay_log, grid_class=MaskedGrid):
+	"""
+	Re-simulate a game from its replay log.
+
+	:replay_log: The replay log (a ReplayLog object).
+	:grid_class: The class of the grid with mask to create (MaskedGrid or a subclass).
+	:return: The game after all moves of the log (a Minesweeper object).
+	"""
+
+	grid = grid_class(replay_log.num_rows, replay_log.num_columns, replay_log.bomb_position_list,
+		replay_log.left_wall, replay_log.right_wall, replay_log.top_wall, replay_log.bottom_wall)
+	ms = Minesweeper.from_grid(grid)
+
+	play_tile, insert_flag, remove_flag = ms.play_tile, ms.insert_flag, ms.remove_flag
+	for move, i, j in replay_log:
+		if move == Move.PLAY:
+			play_tile(i, j)
+		elif move == Move.INSERT_FLAG:
+			insert_flag(i, j)
+		elif move == Move.REMOVE_FLAG:
+			remove_flag(i, j)
+		elif move == Move.REMOVE_ALL_FLAGS:
+			ms.remove_all_flags()
+		elif move == Move.REVEAL_ALL_TILES:
+			ms.reveal_all_tiles()
+		else:
+			raise ValueError("Error: unknown move ({})!".format(move))
+
+	return ms
+
+def replay_many(replay_logs, grid_class=MaskedGrid):
+	"""
+	Re-simulate games from their replay logs (see the 'replay' function).
+
+	:replay_logs: The replay logs.
+	:grid_class: The class of the grids with mask to create (MaskedGrid or a subclass).
+	:return: The list of games after all moves of their logs.
+	"""
+
+	return [replay(replay_log, grid_class) for replay_log in replay_logs]
+
+def rescore(replay_logs, grid_class=MaskedGrid):
+	"""
+	Compute the scores of games from their replay logs (see the 'replay' function).
+
+	:replay_logs: The replay logs.
+	:grid_class: The class of the grids with mask to create (MaskedGrid or a subclass).
+	:return: The list of scores.
+	"""
+
+	return [replay(replay_log, grid_class).score for replay_log in replay_logs]
+
+if __name__ == "__main__":
+	from minesweeper.bit_masked_grid import BitMaskedGrid
+	from minesweeper.replay_log import dump_replay_logs, load_replay_logs
+
+	import os
+	import random
+	import tempfile
+	import time
+
+	random.seed(42)
+
+	games = []
+	for k in range(1000):
+		ms = Minesweeper(10, 10, 10, record_replay=True)
+		while ms.state == ms.state.CONTINUE:
+			i, j = ms.random_masked_tile_position()
+			if random.random() < 0.1:
+				ms.insert_flag(i, j)
+			elif (i, j) not in ms.flag_tile_positions:
+				ms.play_tile(i, j)
+			else:
+				ms.remove_all_flags()
+		games.append(ms)
+
+	file_name = os.path.join(tempfile.mkdtemp(), "replays.bin")
+	dump_replay_logs([ms.replay_log for ms in games], file_name)
+	replay_logs = load_replay_logs(file_name)
+
+	start = time.time()
+	score_list = rescore(replay_logs, grid_class=BitMaskedGrid)
+	print("{} games replayed in {:.2f} seconds.".format(len(replay_logs), (time.time() - start)))
+
+	print(score_list == [ms.score for ms in games])
@@ -0,0 +1,264 @@
+from enum import IntEnum
+import copy
+import numpy as np
+import os
+import struct
+
+# Binary encoding of replay logs. A file starts with a header (the magic number and the version of the encoding)
+# followed by the replay logs, so that logs can be appended to an existing file. Each replay log is encoded as:
+# - a header: the number of rows, the number of columns, the thickness of the walls, the number of bombs and the number
+#	of moves,
+# - the positions of the bombs (two int32 per bomb),
+# - the moves (three int32 per move: the kind of move and the position).
+
+MAGIC_NUMBER = b'MSRL'
+VERSION = 1
+
+_FILE_HEADER = struct.Struct('<4sH') # Magic number and version.
+_LOG_HEADER = struct.Struct('<IIIIIIII') # Number of rows and of columns, walls, number of bombs and number of moves.
+
+class Move(IntEnum):
+	PLAY = 0 # Play on a tile (see the 'play_tile' method of Minesweeper).
+	INSERT_FLAG = 1
+	REMOVE_FLAG = 2
+	REMOVE_ALL_FLAGS = 3 # The position of the move is (-1, -1).
+	REVEAL_ALL_TILES = 4 # The position of the move is (-1, -1).
+
+class ReplayLog:
+	"""
+	Replay log of a minesweeper game: the layout of the grid (its dimensions, its walls and its bombs) and the list of
+	moves played on it, in order. Moves are only appended, so that the game can be re-simulated from its log (see the
+	'replay' function of the 'replay' module).
+	"""
+
+	__slots__ = ('_num_rows', '_num_columns', '_left_wall', '_right_wall', '_top_wall', '_bottom_wall',
+		'_bomb_position_list', '_moves')
+
+	def __init__(self, num_rows, num_columns, bomb_position_list, left_wall=0, right_wall=0, top_wall=0,
+		bottom_wall=0):
+		"""
+		Create an empty replay log.
+
+		:num_rows: The number of rows of the grid.
+		:num_columns: The number of columns of the grid.
+		:bomb_position_list: A list of positions of bombs.
+		:left_wall: The thickness of the left wall.
+		:right_wall: The thickness of the right wall.
+		:top_wall: The thickness of the top wall.
+		:bottom_wall: The thickness of the bottom wall.
+		"""
+
+		self._num_rows = num_rows
+		self._num_columns = num_columns
+		self._left_wall = left_wall
+		self._right_wall = right_wall
+		self._top_wall = top_wall
+		self._bottom_wall = bottom_wall
+		self._bomb_position_list = list(bomb_position_list)
+
+		self._moves = [] # List of tuples (move, i, j), where 'move' is the value of a Move member.
+
+	@classmethod
+	def from_grid(cls, grid):
+		"""
+		Create an empty replay log from the layout of a grid with mask. The grid must not have been played yet (all
+		tiles are masked), since only the moves played after are logged. All its bombs must be known: the grids whose
+		bombs are generated when they are explored (see ProceduralMaskedGrid) can not be logged, since their list of
+		positions of bombs is incomplete.
+
+		:grid: The grid with mask (a MaskedGrid object).
+		:return: The replay log.
+		"""
+
+		bomb_position_list = grid.bomb_position_list
+		if len(bomb_position_list) != grid.num_bombs:
+			raise ValueError("Error: only {} bombs of the grid are known out of {}, the grid can not be logged!".format(
+				len(bomb_position_list), grid.num_bombs))
+
+		return cls(grid.num_rows, grid.num_columns, bomb_position_list, grid.left_wall, grid.right_wall,
+			grid.top_wall, grid.bottom_wall)
+
+	@property
+	def num_rows(self):
+		"""
+		Number of rows of the grid.
+		"""
+
+		return self._num_rows
+
+	@property
+	def num_columns(self):
+		"""
+		Number of columns of the grid.
+		"""
+
+		return self._num_columns
+
+	@property
+	def left_wall(self):
+		"""
+		Thickness of the left wall.
+		"""
+
+		return self._left_wall
+
+	@property
+	def right_wall(self):
+		"""
+		Thickness of the right wall.
+		"""
+
+		return self._right_wall
+
+	@property
+	def top_wall(self):
+		"""
+		Thickness of the top wall.
+		"""
+
+		return self._top_wall
+
+	@property
+	def bottom_wall(self):
+		"""
+		Thickness of the bottom wall.
+		"""
+
+		return self._bottom_wall
+
+	@property
+	def bomb_position_list(self):
+		"""
+		List of positions of bombs.
+		"""
+
+		return self._bomb_position_list
+
+	def __len__(self):
+		return len(self._moves)
+
+	def __iter__(self):
+		"""
+		Iterate over the moves, in order. Each move is a tuple (move, i, j), where 'move' is a Move member.
+		"""
+
+		for move, i, j in self._moves:
+			yield (Move(move), i, j)
+
+	def __eq__(self, other):
+		return ((self._num_rows, self._num_columns, self._left_wall, self._right_wall, self._top_wall,
+			self._bottom_wall) == (other._num_rows, other._num_columns, other._left_wall, other._right_wall,
+			other._top_wall, other._bottom_wall)) and (set(self._bomb_position_list) == set(other._bomb_position_list)) \
+			and (self._moves == other._moves)
+
+	__hash__ = None # The replay logs are mutable (moves are appended), so they are not hashable.
+
+	def append(self, move, i=-1, j=-1):
+		"""
+		Append a move to the log.
+
+		:move: The kind of move (a Move member).
+		:i: The index of the row of the tile.
+		:j: The index of the column of the tile.
+		"""
+
+		self._moves.append((int(move), int(i), int(j)))
+
+	def extend(self, moves):
+		"""
+		Append moves to the log, in order.
+
+		:moves: The moves (an iterable of tuples (move, i, j), where 'move' is a Move member, for example another
+			replay log).
+		"""
+
+		self._moves.extend((int(move), int(i), int(j)) for move, i, j in moves)
+
+	def truncate(self, num_moves):
+		"""
+		Remove the moves after the 'num_moves' first moves (used when a game is restored from a snapshot).
+
+		:num_moves: The number of moves to keep.
+		"""
+
+		del self._moves[num_moves:]
+
+	def copy(self):
+		"""
+		Copy the log. The layout of the grid is shared since it never changes.
+
+		:return: The copy of the log.
+		"""
+
+		log_copy = copy.copy(self)
+		log_copy._moves = list(self._moves)
+
+		return log_copy
+
+def encode_replay_log(replay_log):
+	"""
+	Encode a replay log in binary.
+
+	:replay_log: The replay log.
+	:return: The encoded replay log (bytes).
+	"""
+
+	header = _LOG_HEADER.pack(replay_log.num_rows, replay_log.num_columns, replay_log.left_wall,
+		replay_log.right_wall, replay_log.top_wall, replay_log.bottom_wall, len(replay_log.bomb_position_list),
+		len(replay_log))
+	bombs = np.array(replay_log.bomb_position_list, dtype='<i4').reshape(-1, 2)
+	moves = np.array(replay_log._moves, dtype='<i4').reshape(-1, 3)
+
+	return b''.join([header, bombs.tobytes(), moves.tobytes()])
+
+def dump_replay_logs(replay_logs, file_name, append=False):
+	"""
+	Write replay logs to a binary file.
+
+	:replay_logs: The replay logs.
+	:file_name: The file name.
+	:append: If True and the file exists, then the logs are appended to the file. Otherwise, the file is overwritten.
+	"""
+
+	append = append and os.path.exists(file_name)
+	with open(file_name, 'ab' if append else 'wb') as file:
+		if not append:
+			file.write(_FILE_HEADER.pack(MAGIC_NUMBER, VERSION))
+		for replay_log in replay_logs:
+			file.write(encode_replay_log(replay_log))
+
+def load_replay_logs(file_name):
+	"""
+	Read replay logs from a binary file (see the 'dump_replay_logs' function).
+
+	:file_name: The file name.
+	:return: The list of replay logs.
+	"""
+
+	with open(file_name, 'rb') as file:
+		data = memoryview(file.read())
+
+	magic_number, version = _FILE_HEADER.unpack_from(data, 0)
+	if magic_number != MAGIC_NUMBER:
+		raise ValueError("Error: the file '{}' does not contain replay logs!".format(file_name))
+	if version != VERSION:
+		raise ValueError("Error: the version of the encoding ({}) is not supported!".format(version))
+
+	replay_logs = []
+	offset = _FILE_HEADER.size
+	while offset < len(data):
+		(num_rows, num_columns, left_wall, right_wall, top_wall, bottom_wall, num_bombs,
+			num_moves) = _LOG_HEADER.unpack_from(data, offset)
+		offset += _LOG_HEADER.size
+
+		bombs = np.frombuffer(data, dtype='<i4', count=(2 * num_bombs), offset=offset).reshape(-1, 2)
+		offset += bombs.nbytes
+		moves = np.frombuffer(data, dtype='<i4', count=(3 * num_moves), offset=offset).reshape(-1, 3)
+		offset += moves.nbytes
+
+		replay_log = ReplayLog(num_rows, num_columns, [tuple(position) for position in bombs.tolist()], left_wall,
+			right_wall, top_wall, bottom_wall)
+		replay_log._moves = [tuple(move) for move in moves.tolist()]
+		replay_logs.append(replay_log)
+
+	return replay_logs
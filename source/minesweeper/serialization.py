@@ -0,0 +1,233 @@
+from minesweeper.grid import WALL_VALUE, BOMB_VALUE
+from minesweeper.masked_grid import MaskedGrid
+from minesweeper.minesweeper import Minesweeper, State
+
+import numpy as np
+import struct
+
+# Binary encoding of games (Minesweeper objects) and grids with mask (MaskedGrid objects).
+# A file starts with a header (the magic number, the version of the encoding and the number of games) followed by the
+# games. Each game is encoded as:
+# - a header: the kind of game (grid with mask or minesweeper game), the state, the number of rows, the number of
+#	columns, the thickness of the walls and the score (the state and the score are 0 for a grid with mask),
+# - the tiles of the grid of numbers, row by row, packed by two in a byte (4 bits per tile, the value of the tile minus
+#	'WALL_VALUE'),
+# - the mask, row by row, packed by eight in a byte (1 bit per tile, set if the tile is masked),
+# - the flags, row by row, packed by eight in a byte (1 bit per tile, set if the tile contains a flag).
+
+MAGIC_NUMBER = b'MSWP'
+VERSION = 1
+
+_FILE_HEADER = struct.Struct('<4sHI') # Magic number, version and number of games.
+_GAME_HEADER = struct.Struct('<BBxxIIIIIIQ') # Kind, state, number of rows and of columns, walls and score.
+
+_GRID_KIND = 0 # Grid with mask.
+_MINESWEEPER_KIND = 1 # Minesweeper game.
+
+def encode_game(game):
+	"""
+	Encode a game in binary.
+
+	:game: The game (a Minesweeper object or a MaskedGrid object). The bombs of a game must be inserted, that is, a game
+		created with 'first_click_safe' can only be encoded once a tile has been played.
+	:return: The encoded game (bytes).
+	"""
+
+	if isinstance(game, Minesweeper):
+		if not game.bombs_inserted:
+			raise ValueError("Error: the bombs of the game are not inserted yet (no tile has been played), the game can "
+				"not be encoded!")
+		kind, state, score = _MINESWEEPER_KIND, game.state.value, game.score
+		grid = game.masked_grid
+	else:
+		kind, state, score = _GRID_KIND, 0, 0
+		grid = game
+
+	num_tiles = grid.num_rows * grid.num_columns
+	tiles = (np.array(grid.tile_values(), dtype=np.int16) - WALL_VALUE).astype(np.uint8)
+	if (num_tiles % 2) == 1:
+		tiles = np.append(tiles, np.uint8(0))
+	packed_tiles = (tiles[0::2] << 4) | tiles[1::2]
+
+	header = _GAME_HEADER.pack(kind, state, grid.num_rows, grid.num_columns, grid.left_wall, grid.right_wall,
+		grid.top_wall, grid.bottom_wall, score)
+
+	return b''.join([
+		header, packed_tiles.tobytes(),
+		_pack_positions(grid.masked_tile_positions, grid.num_rows, grid.num_columns).tobytes(),
+		_pack_positions(grid.flag_tile_positions, grid.num_rows, grid.num_columns).tobytes()
+	])
+
+def decode_game(data, grid_class=MaskedGrid):
+	"""
+	Decode a game encoded in binary (see the 'encode_game' function).
+
+	:data: The encoded game (bytes).
+	:grid_class: The class of the grid with mask to create (MaskedGrid or a subclass).
+	:return: The game (a Minesweeper object or a MaskedGrid object, like the encoded game).
+	"""
+
+	game, _ = _decode_game(memoryview(data), 0, grid_class)
+
+	return game
+
+def encode_games(games):
+	"""
+	Encode games in binary, with a header.
+
+	:games: The games (Minesweeper objects or MaskedGrid objects).
+	:return: The encoded games (bytes).
+	"""
+
+	encoded_games = [encode_game(game) for game in games]
+
+	return _FILE_HEADER.pack(MAGIC_NUMBER, VERSION, len(encoded_games)) + b''.join(encoded_games)
+
+def decode_games(data, grid_class=MaskedGrid):
+	"""
+	Decode games encoded in binary (see the 'encode_games' function).
+
+	:data: The encoded games (bytes).
+	:grid_class: The class of the grids with mask to create (MaskedGrid or a subclass).
+	:return: The list of games.
+	"""
+
+	data = memoryview(data)
+
+	magic_number, version, num_games = _FILE_HEADER.unpack_from(data, 0)
+	if magic_number != MAGIC_NUMBER:
+		raise ValueError("Error: the data are not encoded games!")
+	if version != VERSION:
+		raise ValueError("Error: the version of the encoding ({}) is not supported!".format(version))
+
+	games = []
+	offset = _FILE_HEADER.size
+	for k in range(num_games):
+		game, offset = _decode_game(data, offset, grid_class)
+		games.append(game)
+
+	return games
+
+def dump_many(games, file_name):
+	"""
+	Write games to a binary file (see the 'encode_games' function).
+
+	:games: The games (Minesweeper objects or MaskedGrid objects).
+	:file_name: The file name.
+	"""
+
+	with open(file_name, 'wb') as file:
+		file.write(encode_games(games))
+
+def load_many(file_name, grid_class=MaskedGrid):
+	"""
+	Read games from a binary file (see the 'dump_many' function).
+
+	:file_name: The file name.
+	:grid_class: The class of the grids with mask to create (MaskedGrid or a subclass).
+	:return: The list of games.
+	"""
+
+	with open(file_name, 'rb') as file:
+		return decode_games(file.read(), grid_class)
+
+def _decode_game(data, offset, grid_class):
+	"""
+	Decode a game encoded in binary.
+
+	:data: The encoded games (a memoryview).
+	:offset: The offset of the game in 'data'.
+	:grid_class: The class of the grid with mask to create (MaskedGrid or a subclass).
+	:return: The game and the offset of the next game in 'data'.
+	"""
+
+	(kind, state, num_rows, num_columns, left_wall, right_wall, top_wall, bottom_wall,
+		score) = _GAME_HEADER.unpack_from(data, offset)
+	offset += _GAME_HEADER.size
+
+	num_tiles = num_rows * num_columns
+	num_tile_bytes = (num_tiles + 1) // 2
+	num_bitplane_bytes = (num_tiles + 7) // 8
+
+	packed_tiles = np.frombuffer(data, dtype=np.uint8, count=num_tile_bytes, offset=offset)
+	offset += num_tile_bytes
+	tiles = np.empty((2 * num_tile_bytes), dtype=np.int8)
+	tiles[0::2] = packed_tiles >> 4
+	tiles[1::2] = packed_tiles & 0x0F
+	tiles = tiles[:num_tiles] + np.int8(WALL_VALUE)
+
+	masked_tiles = _unpack_bitplane(data, offset, num_tiles)
+	offset += num_bitplane_bytes
+	flag_tiles = _unpack_bitplane(data, offset, num_tiles)
+	offset += num_bitplane_bytes
+
+	bomb_position_list = [divmod(int(index), num_columns) for index in np.flatnonzero(tiles == BOMB_VALUE)]
+	grid = grid_class(num_rows, num_columns, bomb_position_list, left_wall, right_wall, top_wall, bottom_wall)
+
+	unmasked_tiles = ~masked_tiles & (tiles != WALL_VALUE)
+	grid.unmask_tiles([divmod(int(index), num_columns) for index in np.flatnonzero(unmasked_tiles)])
+	grid.insert_flags([divmod(int(index), num_columns) for index in np.flatnonzero(flag_tiles)])
+
+	if kind == _MINESWEEPER_KIND:
+		game = Minesweeper.from_grid(grid, state=State(state), score=score)
+	else:
+		game = grid
+
+	return game, offset
+
+def _pack_positions(position_list, num_rows, num_columns):
+	"""
+	Pack positions in a bitplane (1 bit per tile, set if the tile is at one of the positions).
+
+	:position_list: The list of positions.
+	:num_rows: The number of rows of the grid.
+	:num_columns: The number of columns of the grid.
+	:return: The bitplane (a NumPy array of uint8).
+	"""
+
+	bits = np.zeros((num_rows * num_columns), dtype=bool)
+	if position_list:
+		rows, columns = zip(*position_list)
+		bits[(np.array(rows) * num_columns) + np.array(columns)] = True
+
+	return np.packbits(bits)
+
+def _unpack_bitplane(data, offset, num_tiles):
+	"""
+	Unpack a bitplane (see the '_pack_positions' function).
+
+	:data: The encoded games (a memoryview).
+	:offset: The offset of the bitplane in 'data'.
+	:num_tiles: The number of tiles of the grid.
+	:return: The bits of the tiles (a NumPy array of booleans).
+	"""
+
+	packed_bits = np.frombuffer(data, dtype=np.uint8, count=((num_tiles + 7) // 8), offset=offset)
+
+	return np.unpackbits(packed_bits, count=num_tiles).astype(bool)
+
+if __name__ == "__main__":
+	import os
+	import tempfile
+	import time
+
+	games = [Minesweeper(10, 10, 10) for k in range(10000)]
+	for game in games:
+		game.play_tile(*game.random_masked_tile_position())
+
+	file_name = os.path.join(tempfile.mkdtemp(), "games.bin")
+
+	start = time.time()
+	dump_many(games, file_name)
+	print("{} games written in {:.2f} seconds ({} bytes).".format(len(games), (time.time() - start),
+		os.path.getsize(file_name)))
+
+	start = time.time()
+	loaded_games = load_many(file_name)
+	print("{} games read in {:.2f} seconds.".format(len(loaded_games), (time.time() - start)))
+
+	print(all(
+		(game.masked_grid == loaded_game.masked_grid) and (game.state == loaded_game.state) and
+		(game.score == loaded_game.score)
+		for game, loaded_game in zip(games, loaded_games)
+	))